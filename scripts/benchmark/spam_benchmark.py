@@ -21,10 +21,21 @@ import pandas as pd
 import requests
 # import questionary # Removed interactive dependency
 
+# Shared Ollama client lives in src/ (no config.py import, so no accounts.yaml needed)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src"))
+from ollama_client import OllamaClient
+from llm_verdict import (
+    OUTPUT_FORMATS, VERDICT_SCHEMA, JSON_NUM_PREDICT, find_verdict, parse_json_verdict,
+    batch_schema, build_batch_prompt, parse_batch_verdicts
+)
+from body_cleanup import clean_body, estimate_tokens
+from prompt_templates import build_prompt, build_payload, prompt_eval_stats
+
 # Configuration
 # DEFAULT_MODELS will be fetched dynamically from Ollama if not specified
 DEFAULT_MODELS = [] 
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 # OLLAMA_TAGS_URL = "http://localhost:11434/api/tags" # Not needed here anymore
 # Store benchmark data in the root benchmark folder
 BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "benchmark")
@@ -37,6 +48,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# One pooled HTTP session for all requests (connection reuse, keep_alive on every call)
+ollama_client = OllamaClient(OLLAMA_API_URL, keep_alive=OLLAMA_KEEP_ALIVE)
+
 # Default Test Data
 DEFAULT_TEST_EMAILS = [
     # SPAM (10)
@@ -85,6 +99,17 @@ def ensure_benchmark_dir(output_dir: str):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+# Prompt evaluation of a failed request
+NO_PROMPT_EVAL = (0, 0.0)
+
+def prompt_eval_of(data: Dict) -> Tuple[int, float]:
+    """
+    Returns (prompt_eval_count, prompt_eval_ms) of an Ollama response.
+    A low count on repeated requests means Ollama reused the cached prompt prefix.
+    """
+    count, seconds = prompt_eval_stats(data)
+    return count or 0, (seconds or 0.0) * 1000
+
 def load_test_emails(filepath: str) -> pd.DataFrame:
     """
     Loads test emails from a CSV file. If the file doesn't exist,
@@ -99,125 +124,205 @@ def load_test_emails(filepath: str) -> pd.DataFrame:
     logger.info(f"Loading test emails from {filepath}...")
     return pd.read_csv(filepath)
 
-def call_ollama(model: str, subject: str, content: str, use_thinking: bool = False) -> Tuple[str, float, int, str]:
+def call_ollama(model: str, subject: str, content: str, use_thinking: bool = False,
+                output_format: str = "text") -> Tuple[str, float, int, str, Tuple[int, float]]:
     """
     Calls the Ollama API to classify an email.
-    Returns: (prediction, response_time_ms, total_tokens, confidence)
+    output_format "json" requests a schema-constrained {verdict, confidence, short_reason} object.
+    Uses the same prompt templates as the spam filter (static prefix, email fields at the end).
+    Returns: (prediction, response_time_ms, total_tokens, confidence, (prompt_eval_count, prompt_eval_ms))
     """
-    prompt = (
-        f"Klassifiziere diese E-Mail als SPAM oder HAM. "
-        f"Antworte NUR mit 'SPAM' oder 'HAM' und einer kurzen Begründung (max 15 Wörter).\n\n"
-        f"Betreff: {subject}\n\nInhalt: {content}"
-    )
+    structured = output_format == "json"
+    prompt = build_prompt("", subject, content, structured)
     
     # Adjust parameters based on thinking mode
     # Thinking models need room to think. Standard models should be concise.
     # We limit standard models to 150 tokens to prevent verbosity (like Ministral's 600+ tokens)
     # while ensuring enough space for the classification and short justification.
-    num_predict = 2000 if use_thinking else 150
+    # The compact JSON object needs far fewer tokens than a free-text justification.
+    num_predict = JSON_NUM_PREDICT if structured else 150
     timeout = 300 if use_thinking else 120
     
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0.1,
-            "num_predict": num_predict
-        }
-    }
-
-    # Optimization for Ministral: Use a lightweight system prompt to reduce input tokens
-    # (The default system prompt is ~600 tokens long due to tool definitions)
-    if "ministral" in model.lower():
-        payload["system"] = (
-            f"You are an intelligent Spam Detection System. "
-            f"Analyze the email content and metadata critically. "
-            f"Legitimate emails (HAM) can come from unknown senders. "
-            f"Only mark as SPAM if there are clear indicators like phishing, scams, unsolicited offers, or malicious content. "
-            f"The current date is {datetime.datetime.now().strftime('%Y-%m-%d')}."
-        )
-    
-    # Only add 'think' parameter if explicitly requested (to enable/disable)
-    # If use_thinking is True, we don't set 'think': False. 
-    # If use_thinking is False, we set 'think': False to suppress it on reasoning models.
-    if not use_thinking:
-        payload["think"] = False
+    # Ministral gets the lightweight system prompt, thinking is disabled unless requested
+    payload = build_payload(prompt, model, num_predict, use_thinking, VERDICT_SCHEMA if structured else None)
     
     start_time = time.time()
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
+        data = ollama_client.generate(payload, timeout=timeout)
         end_time = time.time()
         
         response_time_ms = (end_time - start_time) * 1000
         response_text = data.get("response", "").strip()
         total_tokens = data.get("eval_count", 0) + data.get("prompt_eval_count", 0)
+        prompt_eval = prompt_eval_of(data)
         
         # Check if model ran out of context
         if data.get("done_reason") == "length":
             logger.warning(f"Model {model} hit token limit (num_predict). Response might be incomplete.")
 
-        # Extract prediction
-        prediction = "UNKNOWN"
-        if "SPAM" in response_text.upper():
-            prediction = "SPAM"
-        elif "HAM" in response_text.upper():
-            prediction = "HAM"
+        # JSON mode: the model reports its own confidence
+        parsed = parse_json_verdict(response_text) if structured else None
+        if parsed is not None:
+            is_spam, score, _ = parsed
+            return ("SPAM" if is_spam else "HAM"), response_time_ms, total_tokens, f"{score:.2f}", prompt_eval
+        
+        # Extract prediction (first standalone SPAM/HAM, then any occurrence)
+        prediction = find_verdict(response_text) or "UNKNOWN"
+        if prediction == "UNKNOWN":
+            if "SPAM" in response_text.upper():
+                prediction = "SPAM"
+            elif "HAM" in response_text.upper():
+                prediction = "HAM"
             
         # Simple confidence estimation (placeholder as Ollama doesn't give confidence score directly in this mode easily)
         confidence = "high" # Placeholder
         
-        return prediction, response_time_ms, total_tokens, confidence
+        return prediction, response_time_ms, total_tokens, confidence, prompt_eval
 
     except requests.exceptions.Timeout:
-        return "TIMEOUT", -1, 0, "none"
+        return "TIMEOUT", -1, 0, "none", NO_PROMPT_EVAL
     except requests.exceptions.ConnectionError:
-        return "ERROR", -1, 0, "none"
+        return "ERROR", -1, 0, "none", NO_PROMPT_EVAL
     except Exception as e:
         logger.error(f"Error calling Ollama: {e}")
-        return "ERROR", -1, 0, "none"
+        return "ERROR", -1, 0, "none", NO_PROMPT_EVAL
 
-def test_model(model: str, emails: pd.DataFrame, use_thinking: bool = False) -> List[Dict]:
+def call_ollama_batch(model: str, rows: List[Dict], use_thinking: bool = False) -> List[Tuple[str, float, int, str, Tuple[int, float]]]:
+    """
+    Classifies several emails with a single request (JSON array, one verdict per email).
+    Falls back to one call_ollama per email if the response is malformed.
+    Returns one (prediction, response_time_ms, total_tokens, confidence, prompt_eval) per email;
+    time, tokens and prompt evaluation of the shared request are split evenly.
+    """
+    count = len(rows)
+    prompt = build_batch_prompt([("", row['subject'], row['content']) for row in rows])
+    payload = build_payload(prompt, model, JSON_NUM_PREDICT * count, use_thinking, batch_schema(count))
+    
+    start_time = time.time()
+    try:
+        data = ollama_client.generate(payload, timeout=(300 if use_thinking else 120) + 30 * count)
+    except requests.exceptions.Timeout:
+        return [("TIMEOUT", -1, 0, "none", NO_PROMPT_EVAL)] * count
+    except requests.exceptions.ConnectionError:
+        return [("ERROR", -1, 0, "none", NO_PROMPT_EVAL)] * count
+    except Exception as e:
+        logger.error(f"Error calling Ollama: {e}")
+        return [("ERROR", -1, 0, "none", NO_PROMPT_EVAL)] * count
+    
+    per_mail_ms = (time.time() - start_time) * 1000 / count
+    per_mail_tokens = (data.get("eval_count", 0) + data.get("prompt_eval_count", 0)) // count
+    prompt_tokens, prompt_ms = prompt_eval_of(data)
+    per_mail_prompt_eval = (prompt_tokens // count, prompt_ms / count)
+    
+    parsed = parse_batch_verdicts(data.get("response", ""), count)
+    if parsed is None:
+        logger.warning(f"Malformed batch response from {model}, falling back to single-email requests.")
+        fallback = [call_ollama(model, row['subject'], row['content'], use_thinking, "json") for row in rows]
+        # The failed batch request still counts towards the time spent on these emails
+        return [(p, d + per_mail_ms if d > 0 else d, t, c, pe) for p, d, t, c, pe in fallback]
+    
+    return [
+        ("SPAM" if is_spam else "HAM", per_mail_ms, per_mail_tokens, f"{score:.2f}", per_mail_prompt_eval)
+        for is_spam, score, _ in parsed
+    ]
+
+def call_cascade(small_model: str, large_model: str, subject: str, content: str, threshold: float,
+                 use_thinking: bool = False, output_format: str = "text") -> Tuple[str, float, int, str, Tuple[int, float], str]:
+    """
+    Model cascade: the small model answers first (JSON with confidence); only emails
+    below the confidence threshold are escalated to the large model.
+    Returns: (prediction, response_time_ms, total_tokens, confidence, prompt_eval, stage)
+    """
+    prediction, duration, tokens, confidence, prompt_eval = call_ollama(small_model, subject, content, False, "json")
+    try:
+        confident = prediction in ("SPAM", "HAM") and float(confidence) >= threshold
+    except ValueError:
+        confident = False
+    if confident:
+        return prediction, duration, tokens, confidence, prompt_eval, "fast"
+    
+    # The time spent on the small model counts towards the escalated email
+    large = call_ollama(large_model, subject, content, use_thinking, output_format)
+    spent = max(duration, 0) + large[1] if large[1] > 0 else large[1]
+    combined_prompt_eval = (prompt_eval[0] + large[4][0], prompt_eval[1] + large[4][1])
+    return large[0], spent, tokens + large[2], large[3], combined_prompt_eval, "large"
+
+def test_model(model: str, emails: pd.DataFrame, use_thinking: bool = False,
+               output_format: str = "text", batch_size: int = 1,
+               cascade_model: Optional[str] = None, cascade_threshold: float = 0.85) -> List[Dict]:
     """
     Tests a single model against the dataframe of emails.
+    With batch_size > 1, emails are classified in groups of batch_size per request.
+    With cascade_model, each email goes to cascade_model first and is only escalated
+    to model below cascade_threshold (batch_size is ignored).
     """
     results = []
     total = len(emails)
     correct_count = 0
+    rows = emails.to_dict("records")
     
     # Progress bar simulation
-    sys.stdout.write(f"Testing {model} (Thinking: {use_thinking})... [")
+    sys.stdout.write(f"Testing {model} (Thinking: {use_thinking}, Batch: {batch_size})... [")
     sys.stdout.flush()
     
-    for i, row in emails.iterrows():
-        prediction, duration, tokens, confidence = call_ollama(model, row['subject'], row['content'], use_thinking)
+    if cascade_model:
+        batch_size = 1
+    
+    start_time = time.time()
+    for start in range(0, total, batch_size):
+        chunk = rows[start:start + batch_size]
+        if cascade_model:
+            outcomes = [call_cascade(cascade_model, model, chunk[0]['subject'], chunk[0]['content'],
+                                     cascade_threshold, use_thinking, output_format)]
+        elif batch_size > 1:
+            outcomes = [outcome + ("single",) for outcome in call_ollama_batch(model, chunk, use_thinking)]
+        else:
+            outcomes = [call_ollama(model, chunk[0]['subject'], chunk[0]['content'], use_thinking, output_format) + ("single",)]
         
-        is_correct = (prediction == row['category'])
-        if is_correct:
-            correct_count += 1
-            
-        result = {
-            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "model": model,
-            "email_id": row['email_id'],
-            "expected": row['category'],
-            "predicted": prediction,
-            "correct": is_correct,
-            "response_time_ms": round(duration, 2),
-            "response_tokens": tokens,
-            "confidence": confidence
-        }
-        results.append(result)
+        for row, (prediction, duration, tokens, confidence, prompt_eval, stage) in zip(chunk, outcomes):
+            is_correct = (prediction == row['category'])
+            if is_correct:
+                correct_count += 1
+                
+            result = {
+                "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "model": model,
+                "email_id": row['email_id'],
+                "expected": row['category'],
+                "predicted": prediction,
+                "correct": is_correct,
+                "response_time_ms": round(duration, 2),
+                "response_tokens": tokens,
+                "prompt_eval_count": prompt_eval[0],
+                "prompt_eval_ms": round(prompt_eval[1], 2),
+                "confidence": confidence,
+                "stage": stage
+            }
+            results.append(result)
         
         # Update progress bar
-        progress = int((i + 1) / total * 20)
-        sys.stdout.write("\r" + f"Testing {model} (Thinking: {use_thinking})... [{'█' * progress}{' ' * (20 - progress)}] {i + 1}/{total}")
+        done = min(start + batch_size, total)
+        progress = int(done / total * 20)
+        sys.stdout.write("\r" + f"Testing {model} (Thinking: {use_thinking}, Batch: {batch_size})... [{'█' * progress}{' ' * (20 - progress)}] {done}/{total}")
         sys.stdout.flush()
 
+    elapsed = time.time() - start_time
     accuracy = (correct_count / total) * 100
-    sys.stdout.write(f" ({accuracy:.1f}% accuracy)\n")
+    mails_per_sec = total / elapsed if elapsed > 0 else 0
+    sys.stdout.write(f" ({accuracy:.1f}% accuracy, {mails_per_sec:.2f} mails/s)\n")
+    
+    if cascade_model:
+        for stage, label in (("fast", cascade_model), ("large", model)):
+            stage_results = [r for r in results if r["stage"] == stage]
+            if not stage_results:
+                continue
+            stage_correct = sum(1 for r in stage_results if r["correct"])
+            stage_ms = [r["response_time_ms"] for r in stage_results if r["response_time_ms"] > 0]
+            avg_ms = sum(stage_ms) / len(stage_ms) if stage_ms else 0
+            print(
+                f"   {stage:<5} {label}: {len(stage_results)}/{total} emails, "
+                f"{stage_correct / len(stage_results) * 100:.1f}% accuracy, avg {avg_ms:.0f} ms"
+            )
     
     return results
 
@@ -236,11 +341,18 @@ def calculate_score(model_results: pd.DataFrame, total_emails: int) -> Dict:
     avg_response_ms = valid_results['response_time_ms'].mean() if not valid_results.empty else 0
     total_tokens = model_results['response_tokens'].sum()
     
+    # Prompt evaluation per email (drops when Ollama reuses the cached prompt prefix)
+    avg_prompt_eval_count = valid_results['prompt_eval_count'].mean() if not valid_results.empty else 0
+    avg_prompt_eval_ms = valid_results['prompt_eval_ms'].mean() if not valid_results.empty else 0
+    
     # Calculate TPS (Tokens Per Second)
     # Sum of all tokens / Sum of all durations (in seconds)
     total_duration_sec = valid_results['response_time_ms'].sum() / 1000
     avg_tps = (total_tokens / total_duration_sec) if total_duration_sec > 0 else 0
     
+    # Throughput in emails per second (batch runs split the request time across their emails)
+    mails_per_sec = (len(valid_results) / total_duration_sec) if total_duration_sec > 0 else 0
+    
     false_positives = len(model_results[(model_results['expected'] == 'HAM') & (model_results['predicted'] == 'SPAM')])
     false_negatives = len(model_results[(model_results['expected'] == 'SPAM') & (model_results['predicted'] == 'HAM')])
     
@@ -265,9 +377,12 @@ def calculate_score(model_results: pd.DataFrame, total_emails: int) -> Dict:
         "accuracy_pct": round(accuracy_pct, 2),
         "avg_response_ms": round(avg_response_ms, 2),
         "avg_tps": round(avg_tps, 2),
+        "mails_per_sec": round(mails_per_sec, 2),
         "false_positives": false_positives,
         "false_negatives": false_negatives,
         "total_tokens": total_tokens,
+        "avg_prompt_eval_count": round(avg_prompt_eval_count, 1),
+        "avg_prompt_eval_ms": round(avg_prompt_eval_ms, 2),
         "score": round(final_score, 2)
     }
 
@@ -342,14 +457,16 @@ def generate_recommendation(scores_df: pd.DataFrame, output_path: str):
         # --- 2. DETAILED LEADERBOARD ---
         f.write("📊 LEADERBOARD (Sorted by Weighted Score):\n")
         # Header
-        header = f"{'Rank':<4} | {'Model':<25} | {'Score':<6} | {'Acc %':<6} | {'TPS':<6} | {'Rating'}"
+        header = f"{'Rank':<4} | {'Model':<25} | {'Score':<6} | {'Acc %':<6} | {'TPS':<6} | {'Mail/s':<6} | {'Rating'}"
         f.write(header + "\n")
-        f.write("-" * 80 + "\n")
+        f.write("-" * 89 + "\n")
         
         for i, row in scores_df.iterrows():
             rank = f"#{i+1}"
             rating = row['rating'].strip()
-            f.write(f"{rank:<4} | {row['model']:<25} | {row['score']:<6} | {row['accuracy_pct']:<6} | {row['avg_tps']:<6.1f} | {rating}\n")
+            mails_per_sec = row.get('mails_per_sec', 0)
+            mails_per_sec = 0 if pd.isna(mails_per_sec) else mails_per_sec
+            f.write(f"{rank:<4} | {row['model']:<25} | {row['score']:<6} | {row['accuracy_pct']:<6} | {row['avg_tps']:<6.1f} | {mails_per_sec:<6.2f} | {rating}\n")
             
         f.write("\n")
         f.write("ℹ️  Rating Key:\n")
@@ -371,12 +488,10 @@ def check_reasoning_support(model: str) -> bool:
         "options": {"num_predict": 10}
     }
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=30)
-        if response.status_code == 200:
-            data = response.json()
-            has_thinking = "thinking" in data and data["thinking"]
-            print(f" {'YES' if has_thinking else 'NO'}")
-            return has_thinking
+        data = ollama_client.generate(payload, timeout=30)
+        has_thinking = "thinking" in data and data["thinking"]
+        print(f" {'YES' if has_thinking else 'NO'}")
+        return has_thinking
     except Exception:
         pass
     print(" NO (Error/Timeout)")
@@ -388,7 +503,24 @@ def main():
     parser.add_argument("--quick", action="store_true", help="Run a quick test with only 5 emails")
     parser.add_argument("--input", help="Path to custom test emails CSV")
     parser.add_argument("--output", default=BENCHMARK_DIR, help="Output directory")
+    parser.add_argument("--keep-loaded", action="store_true", help="Do not unload models after testing")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="text",
+                        help="Response format: free text or JSON schema (verdict, confidence, short_reason)")
+    parser.add_argument("--cascade", metavar="SMALL_MODEL",
+                        help="Also test a cascade: SMALL_MODEL first, escalate to --model below the confidence threshold")
+    parser.add_argument("--cascade-threshold", type=float, default=0.85,
+                        help="Minimum confidence of the small model in the cascade (default: 0.85)")
+    parser.add_argument("--batch-sizes", default="1",
+                        help="Comma-separated emails per request to compare, e.g. 1,4,8 (K > 1 always uses JSON)")
+    parser.add_argument("--clean-body", type=int, metavar="TOKEN_BUDGET", nargs="?", const=250,
+                        help="Clean bodies like the spam filter (BODY_CLEANUP) with this token budget (default: 250); "
+                             "compare response_tokens with a run without this flag")
     args = parser.parse_args()
+    
+    try:
+        batch_sizes = sorted({max(1, int(k)) for k in args.batch_sizes.split(",") if k.strip()})
+    except ValueError:
+        parser.error("--batch-sizes expects comma-separated integers, e.g. 1,4,8")
 
     ensure_benchmark_dir(args.output)
     
@@ -405,6 +537,14 @@ def main():
     else:
         print(f"Loading test emails... ✓ {len(emails_df)} emails loaded")
     
+    if args.clean_body:
+        raw_tokens = emails_df["content"].astype(str).map(estimate_tokens).sum()
+        emails_df["content"] = emails_df["content"].astype(str).map(lambda text: clean_body(text, args.clean_body))
+        print(
+            f"Cleaning bodies... ✓ ~{raw_tokens} → ~{emails_df['content'].map(estimate_tokens).sum()} "
+            f"estimated tokens (budget {args.clean_body} per email)"
+        )
+    
     # Determine models to test
     if args.model:
         models_to_test = [args.model]
@@ -419,7 +559,20 @@ def main():
     
     print("")
     
+    # The cascade's small model stays loaded for all tested models
+    if args.cascade:
+        try:
+            ollama_client.preload(args.cascade, timeout=300)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not preload {args.cascade}: {e}")
+    
     for model in models_to_test:
+        # Preload the model so the first email does not include the load time
+        try:
+            ollama_client.preload(model, timeout=300)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not preload {model}: {e}")
+        
         # Determine test configurations based on reasoning support
         test_configs = []
         
@@ -430,22 +583,54 @@ def main():
             test_configs.append({"thinking": False, "label": model})
             
         for config in test_configs:
-            display_model_name = config["label"]
             use_thinking = config["thinking"]
             
-            model_results = test_model(model, emails_df, use_thinking)
-            
-            # Update model name in results
+            for batch_size in batch_sizes:
+                display_model_name = config["label"]
+                if batch_size > 1:
+                    display_model_name += f" [K={batch_size}]"
+                elif args.format != "text":
+                    display_model_name += f" [{args.format}]"
+                
+                model_results = test_model(model, emails_df, use_thinking, args.format, batch_size)
+                
+                # Update model name in results
+                for res in model_results:
+                    res['model'] = display_model_name
+                    
+                all_detailed_results.extend(model_results)
+                
+                # Calculate score for this model configuration
+                df_results = pd.DataFrame(model_results)
+                score_data = calculate_score(df_results, len(emails_df))
+                model_scores.append(score_data)
+        
+        # Cascade: small model first, this model only for uncertain emails
+        if args.cascade:
+            display_model_name = f"{args.cascade} → {model} (≥{args.cascade_threshold:.2f})"
+            model_results = test_model(model, emails_df, False, args.format,
+                                       cascade_model=args.cascade, cascade_threshold=args.cascade_threshold)
             for res in model_results:
                 res['model'] = display_model_name
-                
             all_detailed_results.extend(model_results)
             
-            # Calculate score for this model configuration
-            df_results = pd.DataFrame(model_results)
-            score_data = calculate_score(df_results, len(emails_df))
+            score_data = calculate_score(pd.DataFrame(model_results), len(emails_df))
+            score_data['escalated'] = sum(1 for res in model_results if res['stage'] == "large")
             model_scores.append(score_data)
         
+        # Free memory before the next model is loaded
+        if not args.keep_loaded:
+            try:
+                ollama_client.unload(model)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Could not unload {model}: {e}")
+    
+    if args.cascade and not args.keep_loaded:
+        try:
+            ollama_client.unload(args.cascade)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not unload {args.cascade}: {e}")
+                
     # Save Detailed Results (Append mode logic could be complex for detailed results, 
     # but user asked specifically for model_scores.csv persistence. 
     # For detailed results, we might want to keep them per run or append. 
@@ -511,6 +696,12 @@ def main():
 
     print(f"\n✅ Results saved to {args.output}/")
     
+    client_stats = ollama_client.get_stats()
+    print(
+        f"🔌 Ollama requests: {client_stats['requests']} over "
+        f"{client_stats['connections']} connection(s) ({client_stats['reused']} reused)"
+    )
+    
     # Console Output Summary
     if not final_scores_df.empty:
         top_model = final_scores_df.iloc[0]
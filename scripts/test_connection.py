@@ -13,7 +13,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 import requests
 import imaplib
-from config import EMAIL_ACCOUNTS, OLLAMA_URL, SPAM_MODEL
+from config import EMAIL_ACCOUNTS, OLLAMA_URLS, SPAM_MODEL
+from ollama_client import base_url_from, generate_url_from
+
+# Basis-URLs aller konfigurierten Ollama-Hosts
+OLLAMA_BASE_URLS = [base_url_from(generate_url_from(url)) for url in OLLAMA_URLS]
 
 def print_header(text):
     """Formatierte Überschrift"""
@@ -30,37 +34,50 @@ def print_test(name, success, details=""):
         print(f"   {details}")
 
 def test_ollama_connection():
-    """Test 1: Ollama-Verbindung"""
+    """Test 1: Ollama-Verbindung (alle Hosts aus OLLAMA_URLS)"""
     print_header("Test 1: Ollama-Verbindung")
     
-    try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        if response.status_code == 200:
-            print_test("Ollama erreichbar", True, "http://localhost:11434")
-            return True
-        else:
-            print_test("Ollama erreichbar", False, f"Status Code: {response.status_code}")
+    all_success = True
+    
+    for base_url in OLLAMA_BASE_URLS:
+        try:
+            response = requests.get(f"{base_url}/api/tags", timeout=5)
+            if response.status_code == 200:
+                print_test("Ollama erreichbar", True, base_url)
+            else:
+                all_success = False
+                print_test("Ollama erreichbar", False, f"{base_url} - Status Code: {response.status_code}")
+                print("\n💡 Lösung:")
+                print("   - Starte Ollama: ollama serve")
+                print("   - Oder als Dienst: brew services start ollama")
+        except requests.ConnectionError:
+            all_success = False
+            print_test("Ollama erreichbar", False, f"{base_url} - Verbindung fehlgeschlagen")
             print("\n💡 Lösung:")
-            print("   - Starte Ollama: ollama serve")
-            print("   - Oder als Dienst: brew services start ollama")
-            return False
-    except requests.ConnectionError:
-        print_test("Ollama erreichbar", False, "Verbindung fehlgeschlagen")
-        print("\n💡 Lösung:")
-        print("   - Ollama ist nicht gestartet")
-        print("   - Starte in neuem Terminal: ollama serve")
-        print("   - Oder installiere Ollama: brew install ollama")
-        return False
-    except Exception as e:
-        print_test("Ollama erreichbar", False, str(e))
-        return False
+            print("   - Ollama ist nicht gestartet")
+            print("   - Starte in neuem Terminal: ollama serve")
+            print("   - Oder installiere Ollama: brew install ollama")
+        except Exception as e:
+            all_success = False
+            print_test("Ollama erreichbar", False, f"{base_url} - {e}")
+    
+    return all_success
 
 def test_ollama_model():
-    """Test 2: LLM-Modell verfügbar"""
+    """Test 2: LLM-Modell verfügbar (auf jedem Host)"""
     print_header(f"Test 2: LLM-Modell '{SPAM_MODEL}'")
     
+    results = []
+    for base_url in OLLAMA_BASE_URLS:
+        if len(OLLAMA_BASE_URLS) > 1:
+            print(f"\n🖥️  {base_url}")
+        results.append(test_ollama_model_on(base_url))
+    return all(results)
+
+def test_ollama_model_on(base_url):
+    """Prüft das LLM-Modell auf einem Ollama-Host"""
     try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
+        response = requests.get(f"{base_url}/api/tags", timeout=5)
         if response.status_code != 200:
             print_test("Modell-Liste abrufen", False, "Ollama antwortet nicht")
             return False
@@ -5,6 +5,9 @@ Unspam - Stellt fälschlich als Spam markierte E-Mails wieder her
 Durchsucht Spam-Ordner nach E-Mails von Absendern auf der Whitelist
 und verschiebt diese zurück in den Posteingang.
 
+Wiederhergestellte E-Mails werden dem lokalen Vor-Klassifikator als
+Korrektur (HAM, erhöhtes Gewicht) beigebracht (USE_LOCAL_CLASSIFIER=true).
+
 Usage:
     python unspam.py                    # Interaktiv: zeigt Vorschau
     python unspam.py --auto             # Automatisch: ohne Nachfrage
@@ -27,9 +30,13 @@ from dotenv import load_dotenv
 # Füge src/ zum Python-Path hinzu
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from config import EMAIL_ACCOUNTS, LOG_PATH
+from config import EMAIL_ACCOUNTS, LOG_PATH, FETCH_CHUNK_SIZE, FETCH_BODY_BYTES, USE_LOCAL_CLASSIFIER
 from list_manager import get_list_manager
-from spam_filter import decode_header_safe
+from spam_filter import decode_header_safe, extract_body_preview, init_local_classifier
+from imap_fetch import fetch_messages
+
+# Gewicht einer Unspam-Korrektur im Training des lokalen Klassifikators
+CORRECTION_WEIGHT = 3.0
 
 # Logging
 logging.basicConfig(
@@ -80,7 +87,7 @@ def find_whitelisted_spam(account: Dict[str, str], dry_run: bool = False) -> Lis
         
         # Suche alle E-Mails im Spam-Ordner
         print("🔍 Durchsuche Spam-Ordner...")
-        status, data = mail.search(None, 'ALL')
+        status, data = mail.uid('SEARCH', None, 'ALL')
         
         if status != 'OK':
             print("❌ Suche fehlgeschlagen")
@@ -97,17 +104,19 @@ def find_whitelisted_spam(account: Dict[str, str], dry_run: bool = False) -> Lis
         # Lade ListManager für Whitelist-Check
         list_manager = get_list_manager()
         
-        # Prüfe jede E-Mail
-        for email_id in email_ids:
+        # Prüfe jede E-Mail (nur Header werden geholt, gebündelt per UID FETCH).
+        # Der lokale Klassifikator braucht für Korrekturen auch den Body-Anfang.
+        fetch_mode = 'partial' if USE_LOCAL_CLASSIFIER else 'headers'
+        messages = fetch_messages(
+            mail, email_ids, chunk_size=FETCH_CHUNK_SIZE, mode=fetch_mode, body_bytes=FETCH_BODY_BYTES
+        )
+        
+        for email_id, msg in messages:
+            if msg is None:
+                # Nicht geholt (FETCH fehlgeschlagen), bleibt im Spam-Ordner
+                continue
+            
             try:
-                # Hole E-Mail
-                status, msg_data = mail.fetch(email_id, '(RFC822)')
-                if status != 'OK':
-                    continue
-                
-                # Parse E-Mail
-                msg = email.message_from_bytes(msg_data[0][1])
-                
                 # Extrahiere Absender
                 sender = email.utils.parseaddr(msg.get('From', ''))[1] or "Unbekannt"
                 subject = decode_header_safe(msg.get('Subject', 'Kein Betreff'))
@@ -127,11 +136,12 @@ def find_whitelisted_spam(account: Dict[str, str], dry_run: bool = False) -> Lis
                         'sender': sender,
                         'subject': subject,
                         'date': date,
-                        'reason': reason
+                        'reason': reason,
+                        'body': extract_body_preview(msg) if USE_LOCAL_CLASSIFIER else ''
                     })
                 
             except Exception as e:
-                logging.error(f"Fehler beim Prüfen von E-Mail ID {email_id}: {e}")
+                logging.error(f"Fehler beim Prüfen von E-Mail UID {email_id}: {e}")
                 continue
         
         mail.close()
@@ -158,6 +168,7 @@ def restore_emails(account: Dict[str, str], emails: List[Dict]) -> int:
         return 0
     
     restored_count = 0
+    classifier = init_local_classifier()
     
     try:
         print(f"\n🔄 Stelle {len(emails)} E-Mail(s) wieder her...\n")
@@ -171,17 +182,22 @@ def restore_emails(account: Dict[str, str], emails: List[Dict]) -> int:
                 email_id = email_data['id']
                 
                 # Kopiere zurück in INBOX
-                status, _ = mail.copy(email_id, 'INBOX')
+                status, _ = mail.uid('COPY', email_id, 'INBOX')
                 
                 if status == 'OK':
                     # Lösche aus Spam-Ordner
-                    mail.store(email_id, '+FLAGS', '\\Deleted')
+                    mail.uid('STORE', email_id, '+FLAGS', '\\Deleted')
                     
                     print(f"✅ Wiederhergestellt: {email_data['sender']}")
                     print(f"   Betreff: {email_data['subject'][:60]}{'...' if len(email_data['subject']) > 60 else ''}")
                     
                     logging.info(f"E-Mail wiederhergestellt: {email_data['subject']} von {email_data['sender']} ({account['name']})")
                     restored_count += 1
+                    
+                    # Korrektur für den lokalen Vor-Klassifikator (fälschlich SPAM → HAM)
+                    if classifier is not None:
+                        classifier.learn(email_data['sender'], email_data['subject'], email_data['body'],
+                                         is_spam=False, weight=CORRECTION_WEIGHT)
                 else:
                     print(f"⚠️  Fehler bei: {email_data['sender']}")
                     
@@ -198,6 +214,12 @@ def restore_emails(account: Dict[str, str], emails: List[Dict]) -> int:
         print(f"❌ Fehler: {e}")
         logging.error(f"Fehler bei restore_emails ({account['name']}): {e}", exc_info=True)
     
+    if classifier is not None:
+        learned = classifier.train_pending()
+        classifier.save()
+        if learned:
+            print(f"🧮 Lokaler Klassifikator: {learned} Korrektur(en) gelernt")
+    
     return restored_count
 
 def main():
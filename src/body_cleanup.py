@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Body-Bereinigung für Ollama Spam Guard
+Kürzt den E-Mail-Body vor dem Prompt auf ein Token-Budget
+
+Bisher ging der Body als starre Zeichen-Vorschau (500 bzw. 1000 Zeichen)
+in den Prompt. Zitierte Antwortverläufe, Signaturen, lange Tracking-URLs
+und Leerzeichen-Folgen kosten dabei Prompt-Tokens (und Prompt-Eval-Zeit),
+ohne bei der Spam-Erkennung zu helfen. Vor dem Prompt werden daher:
+
+1. zitierte Verläufe entfernt (alles ab "Am ... schrieb ...:", "On ... wrote:",
+   "-----Original Message-----", Outlook-Kopfblock; "> ..."-Zeilen nur in
+   erkannten Antworten, da Spam ">" auch für angebliche Zitate nutzt)
+2. Signaturen abgeschnitten ("-- " und "Von meinem iPhone gesendet")
+3. URLs auf ihre Domain reduziert ("[URL paypal.com]")
+4. Leerzeichen und Leerzeilen zusammengefasst
+5. auf ein Token-Budget gekürzt (an einer Wortgrenze)
+
+Die Token-Zahl ist eine Schätzung (~4 Zeichen pro Token); die tatsächliche
+Prompt-Länge liefert Ollama als prompt_eval_count.
+
+Autor: Ollama Spam Guard
+"""
+
+import re
+from typing import Dict, Optional
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Zeichen pro Token (grobe Schätzung für deutsch/englische E-Mails)
+CHARS_PER_TOKEN = 4
+
+# Maximale Länge des dekodierten Rohtexts vor der Bereinigung
+MAX_INPUT_CHARS = 20000
+
+# Beginn eines zitierten Verlaufs (alles ab dieser Zeile wird entfernt)
+QUOTE_HEADER_RE = re.compile(
+    r'^\s*(?:'
+    r'-{2,}\s*(?:Original Message|Ursprüngliche Nachricht|Forwarded message|Weitergeleitete Nachricht)\s*-{2,}'
+    r'|On\s.{0,200}\swrote:'
+    r'|Am\s.{0,200}\sschrieb.{0,100}:'
+    r'|(?:Von|From):\s.+\n\s*(?:Gesendet|Sent|Datum|Date):\s.+'
+    r')\s*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Beginn einer Signatur
+SIGNATURE_RE = re.compile(
+    r'^(?:-- ?|__+)\s*$'
+    r'|^\s*(?:Sent from my \w+|Von meinem \w+ gesendet|Gesendet von meinem \w+)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# URLs (http/https/www) mit Domain als Gruppe
+URL_RE = re.compile(r'(?:https?://|www\.)(?:[^\s/@<>"\']*@)?([^\s/:?#<>"\']+)[^\s<>"\']*', re.IGNORECASE)
+
+# ============================================
+# Bereinigungsschritte
+# ============================================
+
+def strip_quoted(text: str) -> str:
+    """
+    Entfernt zitierte Verläufe ab der Antwort-Kopfzeile.
+    
+    "> "-Zeilen werden nur entfernt, wenn eine Antwort-Kopfzeile erkannt
+    wurde (eingestreute Zitate einer echten Antwort). Ohne Kopfzeile
+    bleiben sie erhalten, da Spam ">" für angebliche Angebote oder
+    weitergeleitete Inhalte nutzt.
+    
+    Args:
+        text: E-Mail-Body
+    
+    Returns:
+        str: Body ohne Zitat
+    """
+    match = QUOTE_HEADER_RE.search(text)
+    if not match or match.start() == 0:
+        return text
+    
+    text = text[:match.start()]
+    return '\n'.join(line for line in text.split('\n') if not line.lstrip().startswith('>'))
+
+def strip_signature(text: str) -> str:
+    """Schneidet die Signatur ab (nur wenn davor noch Text steht)."""
+    match = SIGNATURE_RE.search(text)
+    if match and text[:match.start()].strip():
+        return text[:match.start()]
+    return text
+
+def collapse_urls(text: str) -> str:
+    """Ersetzt URLs durch ihre Domain (Tracking-Parameter kosten nur Tokens)."""
+    return URL_RE.sub(lambda match: f"[URL {match.group(1).lower().rstrip('.,;)')}]", text)
+
+def normalize_whitespace(text: str) -> str:
+    """Fasst Leerzeichen-Folgen und mehrfache Leerzeilen zusammen."""
+    text = re.sub(r'[ \t\u00a0\u200b]+', ' ', text.replace('\r\n', '\n').replace('\r', '\n'))
+    text = re.sub(r' ?\n ?', '\n', text)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+def estimate_tokens(text: str) -> int:
+    """Geschätzte Anzahl Tokens (Zeichen / CHARS_PER_TOKEN, aufgerundet)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def truncate_to_tokens(text: str, token_budget: int) -> str:
+    """
+    Kürzt auf das Token-Budget (an der letzten Wortgrenze).
+    
+    Args:
+        text: Bereinigter Text
+        token_budget: Maximale Anzahl (geschätzter) Tokens
+    
+    Returns:
+        str: Gekürzter Text (mit " …" markiert)
+    """
+    max_chars = token_budget * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    
+    cut = text[:max_chars]
+    boundary = max(cut.rfind(' '), cut.rfind('\n'))
+    if boundary > max_chars // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + ' …'
+
+# ============================================
+# Pipeline
+# ============================================
+
+def new_cleanup_stats() -> Dict[str, int]:
+    """Erzeugt leere Bereinigungs-Statistik."""
+    return {'bodies': 0, 'chars_before': 0, 'chars_after': 0, 'tokens_before': 0, 'tokens_after': 0}
+
+def clean_body(text: str, token_budget: int = 250, stats: Optional[Dict[str, int]] = None) -> str:
+    """
+    Bereinigt einen E-Mail-Body für den Prompt.
+    
+    Args:
+        text: Dekodierter Body (text/plain)
+        token_budget: Maximale Anzahl (geschätzter) Tokens
+        stats: Optionale Statistik (siehe new_cleanup_stats), wird ergänzt
+    
+    Returns:
+        str: Bereinigter, gekürzter Body
+    """
+    raw = text[:MAX_INPUT_CHARS]
+    cleaned = normalize_whitespace(collapse_urls(strip_signature(strip_quoted(raw))))
+    cleaned = truncate_to_tokens(cleaned, token_budget)
+    
+    if stats is not None:
+        stats['bodies'] += 1
+        stats['chars_before'] += len(raw)
+        stats['chars_after'] += len(cleaned)
+        stats['tokens_before'] += estimate_tokens(raw)
+        stats['tokens_after'] += estimate_tokens(cleaned)
+    return cleaned
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Checkpoint-Store für Ollama Spam Guard
+Merkt sich pro Account UIDVALIDITY und höchste verarbeitete UID
+
+Folgeläufe suchen per "UID SEARCH UID n+1:*" nur noch neue E-Mails,
+statt das komplette Fenster (LIMIT bzw. DAYS_BACK) erneut ans LLM zu schicken.
+Ändert sich die UIDVALIDITY des Ordners, wird der Checkpoint verworfen
+und das normale Fenster erneut verarbeitet (Resync).
+
+Autor: Ollama Spam Guard
+"""
+
+import os
+import json
+import logging
+import imaplib
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def checkpoint_key(account: Dict[str, str], folder: str = 'INBOX') -> str:
+    """
+    Erzeugt eindeutigen Schlüssel für Account + Ordner.
+    
+    Args:
+        account: Account-Konfiguration
+        folder: IMAP-Ordner
+    
+    Returns:
+        str: z.B. "max@gmx.de@imap.gmx.net/INBOX"
+    """
+    return f"{account['user']}@{account['server']}/{folder}"
+
+def get_uidvalidity(mail: imaplib.IMAP4, folder: str = 'INBOX') -> Optional[int]:
+    """
+    Ermittelt die UIDVALIDITY des selektierten Ordners.
+    
+    Nutzt die Antwort des SELECT-Kommandos, fällt sonst auf STATUS zurück.
+    
+    Args:
+        mail: Verbundenes IMAP-Objekt (Ordner bereits selektiert)
+        folder: IMAP-Ordner (für STATUS-Fallback)
+    
+    Returns:
+        int oder None falls nicht ermittelbar
+    """
+    try:
+        _, data = mail.response('UIDVALIDITY')
+        if data and data[-1]:
+            return int(data[-1])
+        
+        status, data = mail.status(folder, '(UIDVALIDITY)')
+        if status == 'OK' and data and data[0]:
+            raw = data[0].decode(errors='ignore')
+            return int(raw.split('UIDVALIDITY')[1].strip(' )'))
+    except Exception as e:
+        logging.warning(f"UIDVALIDITY konnte nicht ermittelt werden: {e}")
+    
+    return None
+
+def filter_new_uids(uids: List[bytes], last_uid: int) -> List[bytes]:
+    """
+    Filtert UIDs oberhalb des Checkpoints.
+    
+    "UID n+1:*" liefert laut RFC 3501 immer mindestens die höchste UID,
+    auch wenn diese <= n ist. Deshalb wird clientseitig nachgefiltert.
+    
+    Args:
+        uids: UIDs aus UID SEARCH
+        last_uid: Höchste bereits verarbeitete UID
+    
+    Returns:
+        List[bytes]: Nur neue UIDs (aufsteigend sortiert)
+    """
+    return sorted((uid for uid in uids if int(uid) > last_uid), key=int)
+
+def limit_uids(uids: List[bytes], limit: int, resume: bool) -> List[bytes]:
+    """
+    Begrenzt die UIDs eines Laufs auf LIMIT (FILTER_MODE=count).
+    
+    Ohne Checkpoint bilden die neuesten LIMIT E-Mails das Fenster. Mit
+    Checkpoint werden die ältesten neuen UIDs zuerst verarbeitet: der
+    Checkpoint bleibt so unter den übrigen, die der nächste Lauf holt
+    (sonst würde er über nie klassifizierte E-Mails hinweg springen).
+    
+    Args:
+        uids: UIDs aufsteigend sortiert
+        limit: Maximale Anzahl (<= 0 = unbegrenzt)
+        resume: True, wenn ein gültiger Checkpoint besteht
+    
+    Returns:
+        List[bytes]: Zu verarbeitende UIDs
+    """
+    if limit <= 0 or len(uids) <= limit:
+        return uids
+    return uids[:limit] if resume else uids[-limit:]
+
+# ============================================
+# Checkpoint Store
+# ============================================
+
+class CheckpointStore:
+    """
+    Persistenter Checkpoint-Store (JSON-Datei).
+    
+    Format:
+        {
+          "max@gmx.de@imap.gmx.net/INBOX": {
+            "uidvalidity": 1700000000,
+            "last_uid": 4711,
+            "updated": "2026-10-17T08:00:00"
+          }
+        }
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialisiert den Store und lädt vorhandene Checkpoints.
+        
+        Args:
+            path: Pfad zur JSON-Datei (None = nur im Speicher, z.B. für den Daemon)
+        """
+        self.path = Path(path) if path else None
+        self.checkpoints: Dict[str, dict] = self._load()
+        self._lock = threading.RLock()  # Daemon: ein Thread pro Account
+    
+    def _load(self) -> Dict[str, dict]:
+        """Lädt Checkpoints aus JSON-Datei."""
+        if self.path and self.path.exists():
+            try:
+                return json.loads(self.path.read_text(encoding='utf-8'))
+            except Exception as e:
+                logging.error(f"Fehler beim Laden der Checkpoints ({self.path}): {e}")
+        return {}
+    
+    def save(self) -> None:
+        """Speichert Checkpoints atomar (temporäre Datei + Umbenennen)."""
+        if self.path is None:
+            return
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with self._lock:
+                tmp_path.write_text(
+                    json.dumps(self.checkpoints, indent=2, ensure_ascii=False),
+                    encoding='utf-8'
+                )
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern der Checkpoints: {e}")
+    
+    def get_last_uid(self, key: str, uidvalidity: Optional[int]) -> Optional[int]:
+        """
+        Liefert die höchste verarbeitete UID, falls der Checkpoint gültig ist.
+        
+        Bei abweichender UIDVALIDITY wird der Checkpoint verworfen (Resync).
+        
+        Args:
+            key: Checkpoint-Schlüssel (siehe checkpoint_key)
+            uidvalidity: Aktuelle UIDVALIDITY des Ordners
+        
+        Returns:
+            int oder None (kein bzw. ungültiger Checkpoint)
+        """
+        with self._lock:
+            checkpoint = self.checkpoints.get(key)
+            if not checkpoint or uidvalidity is None:
+                return None
+            
+            if checkpoint.get('uidvalidity') != uidvalidity:
+                logging.warning(
+                    f"UIDVALIDITY geändert für {key} "
+                    f"({checkpoint.get('uidvalidity')} → {uidvalidity}), Checkpoint verworfen"
+                )
+                print(f"⚠️  UIDVALIDITY hat sich geändert - führe Resync durch")
+                del self.checkpoints[key]
+                self.save()
+                return None
+            
+            return int(checkpoint.get('last_uid', 0))
+    
+    def update(self, key: str, uidvalidity: Optional[int], last_uid: int) -> None:
+        """
+        Setzt den Checkpoint (nur vorwärts) und speichert ihn.
+        
+        Args:
+            key: Checkpoint-Schlüssel
+            uidvalidity: UIDVALIDITY des Ordners
+            last_uid: Höchste verarbeitete UID
+        """
+        if uidvalidity is None:
+            return
+        
+        with self._lock:
+            current = self.checkpoints.get(key, {})
+            if current.get('uidvalidity') == uidvalidity and current.get('last_uid', 0) >= last_uid:
+                return
+            
+            self.checkpoints[key] = {
+                'uidvalidity': uidvalidity,
+                'last_uid': last_uid,
+                'updated': datetime.now().isoformat()
+            }
+            self.save()
+        logging.info(f"Checkpoint aktualisiert: {key} → UID {last_uid}")
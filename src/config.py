@@ -74,8 +74,73 @@ EMAIL_ACCOUNTS = load_accounts_from_yaml(ACCOUNTS_FILE)
 
 # Ollama-Settings
 OLLAMA_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434/api/generate')
+
+# Mehrere Ollama-Hosts (kommagetrennt, z.B. 'http://box1:11434,http://box2:11434'),
+# Standard: nur OLLAMA_URL. Anfragen gehen an den Host mit den wenigsten offenen Anfragen.
+OLLAMA_URLS = [url.strip() for url in os.getenv('OLLAMA_URLS', '').split(',') if url.strip()] or [OLLAMA_URL]
 SPAM_MODEL = os.getenv('SPAM_MODEL', 'ministral-3:14b')
 
+# Modell-Kaskade: kleines Modell entscheidet zuerst, nur unsichere E-Mails gehen an SPAM_MODEL
+# (leer = aus, z.B. 'llama3.2:3b')
+CASCADE_MODEL = os.getenv('CASCADE_MODEL', '').strip()
+
+# Mindest-Konfidenz (0.0-1.0), ab der die Entscheidung des kleinen Modells übernommen wird
+CASCADE_CONFIDENCE = float(os.getenv('CASCADE_CONFIDENCE', '0.85'))
+
+# Entscheidungen des kleinen Modells auch in SimHash-Index, lokalen Klassifikator und
+# Embedding-Index übernehmen (Standard: nur Verdict-Cache, damit Fehler des kleinen
+# Modells nicht über die lokalen Stufen verstärkt werden)
+CASCADE_TRAIN_LOCAL = os.getenv('CASCADE_TRAIN_LOCAL', 'false').lower() == 'true'
+
+# Haltezeit des Modells im Speicher (wird bei jeder Anfrage gesendet, z.B. "30m", "-1" = unbegrenzt)
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+
+# Modell nach dem Lauf sofort entladen (gibt RAM/VRAM frei)
+OLLAMA_UNLOAD_AFTER_RUN = os.getenv('OLLAMA_UNLOAD_AFTER_RUN', 'false').lower() == 'true'
+
+# Antwortformat des LLM: 'text' (Freitext) oder 'json' (JSON-Schema über Ollamas format-Parameter)
+OLLAMA_OUTPUT_FORMAT = os.getenv('OLLAMA_OUTPUT_FORMAT', 'text').lower()
+
+# Batch-Modus: Anzahl E-Mails pro LLM-Anfrage (1 = jede E-Mail einzeln)
+LLM_BATCH_SIZE = int(os.getenv('LLM_BATCH_SIZE', '1'))
+
+# Body vor dem Prompt bereinigen (Zitate, Signaturen, URLs, Leerzeichen) und auf ein Token-Budget kürzen
+BODY_CLEANUP = os.getenv('BODY_CLEANUP', 'true').lower() == 'true'
+BODY_TOKEN_BUDGET = int(os.getenv('BODY_TOKEN_BUDGET', '250'))
+
+# Streaming: Antwort stückweise lesen und abbrechen, sobald SPAM/HAM feststeht (opt-in:
+# früh beendete Streams liefern keine Messwerte wie prompt_eval_count/eval_count)
+OLLAMA_STREAM = os.getenv('OLLAMA_STREAM', 'false').lower() == 'true'
+
+# Nach der Entscheidung noch X Zeichen Begründung fürs Log lesen (0 = sofort abbrechen)
+OLLAMA_STREAM_REASON_CHARS = int(os.getenv('OLLAMA_STREAM_REASON_CHARS', '100'))
+
+# Maximale Anzahl gleichzeitiger LLM-Anfragen pro Ollama-Host (über alle Accounts)
+OLLAMA_MAX_CONCURRENT = int(os.getenv('OLLAMA_MAX_CONCURRENT', '1'))
+
+# Maximale LLM-Anfragen pro Sekunde (0 = unbegrenzt)
+OLLAMA_RATE_LIMIT = float(os.getenv('OLLAMA_RATE_LIMIT', '0'))
+
+# Obergrenze des LLM-Timeouts pro E-Mail in Sekunden (bisher fest 120s)
+OLLAMA_TIMEOUT_MAX = float(os.getenv('OLLAMA_TIMEOUT_MAX', '120'))
+
+# Adaptive Timeouts: Vielfaches eines Latenz-Perzentils erfolgreicher Anfragen
+OLLAMA_ADAPTIVE_TIMEOUT = os.getenv('OLLAMA_ADAPTIVE_TIMEOUT', 'true').lower() == 'true'
+OLLAMA_TIMEOUT_PERCENTILE = float(os.getenv('OLLAMA_TIMEOUT_PERCENTILE', '95'))
+OLLAMA_TIMEOUT_MULTIPLIER = float(os.getenv('OLLAMA_TIMEOUT_MULTIPLIER', '3.0'))
+OLLAMA_TIMEOUT_MIN = float(os.getenv('OLLAMA_TIMEOUT_MIN', '10'))
+
+# Circuit Breaker: nach X Fehlern in Folge keine Anfragen für Y Sekunden (0 = aus)
+CIRCUIT_BREAKER_FAILURES = int(os.getenv('CIRCUIT_BREAKER_FAILURES', '3'))
+CIRCUIT_BREAKER_COOLDOWN = float(os.getenv('CIRCUIT_BREAKER_COOLDOWN', '300'))
+
+# Anzahl gleichzeitig laufender Klassifizierungen pro Account (Standard: OLLAMA_MAX_CONCURRENT)
+# Ergebnisse werden trotzdem in Original-Reihenfolge angewendet
+CLASSIFY_IN_FLIGHT = int(os.getenv('CLASSIFY_IN_FLIGHT', str(OLLAMA_MAX_CONCURRENT)))
+
+# Anzahl parallel verarbeiteter Accounts (1 = nacheinander)
+ACCOUNT_WORKERS = int(os.getenv('ACCOUNT_WORKERS', '1'))
+
 # Filter-Settings
 FILTER_MODE = os.getenv('FILTER_MODE', 'count')  # 'count' oder 'days'
 LIMIT = int(os.getenv('LIMIT', '5'))  # Anzahl E-Mails (bei FILTER_MODE=count)
@@ -101,3 +166,124 @@ LISTS_CACHE_DIR = os.getenv('LISTS_CACHE_DIR', 'data/lists')
 
 # Erzwinge Update beim Start (ignoriert Cache, lädt alle Listen neu)
 FORCE_LIST_UPDATE = os.getenv('FORCE_LIST_UPDATE', 'false').lower() == 'true'
+
+# IP des ersten externen Hops (Received-Header) gegen die IP-Blacklists prüfen
+USE_RECEIVED_IP_CHECK = os.getenv('USE_RECEIVED_IP_CHECK', 'true').lower() == 'true'
+
+# Eigene Mailserver/Relays (kommagetrennte IPs oder CIDR-Netze), werden beim Received-Check übersprungen
+RECEIVED_TRUSTED_NETWORKS = [
+    network.strip() for network in os.getenv('RECEIVED_TRUSTED_NETWORKS', '').split(',') if network.strip()
+]
+
+# ============================================
+# IMAP-Fetch Settings
+# ============================================
+
+# Anzahl E-Mails pro UID FETCH-Kommando (weniger Roundtrips bei hoher Latenz)
+FETCH_CHUNK_SIZE = int(os.getenv('FETCH_CHUNK_SIZE', '50'))
+
+# Fetch-Modus: 'partial' (Header + Body-Anfang) oder 'full' (komplette Nachricht)
+FETCH_MODE = os.getenv('FETCH_MODE', 'partial')
+
+# Maximale Body-Länge im partial-Modus (Bytes)
+FETCH_BODY_BYTES = int(os.getenv('FETCH_BODY_BYTES', '16384'))
+
+# Anzahl Entscheidungen, nach denen SPAM-Verschiebungen und HAM-Markierungen
+# gebündelt ausgeführt werden (UID MOVE bzw. ein UID STORE pro Batch)
+ACTION_BATCH_SIZE = int(os.getenv('ACTION_BATCH_SIZE', '25'))
+
+# ============================================
+# UID-Checkpoints
+# ============================================
+
+# Merkt sich pro Account die höchste verarbeitete UID (Folgeläufe verarbeiten nur neue E-Mails)
+USE_CHECKPOINTS = os.getenv('USE_CHECKPOINTS', 'true').lower() == 'true'
+
+# Speicherort der Checkpoints (relativ zum Projekt-Root)
+CHECKPOINT_FILE = os.getenv('CHECKPOINT_FILE', 'data/state/checkpoints.json')
+
+# ============================================
+# Verdict-Cache
+# ============================================
+
+# LLM-Entscheidungen cachen (gleiche E-Mails werden nicht erneut ans LLM geschickt)
+USE_VERDICT_CACHE = os.getenv('USE_VERDICT_CACHE', 'true').lower() == 'true'
+
+# Speicherort des Caches (SQLite, relativ zum Projekt-Root)
+VERDICT_CACHE_FILE = os.getenv('VERDICT_CACHE_FILE', 'data/state/verdicts.sqlite')
+
+# Gültigkeit eines Eintrags in Stunden (0 = unbegrenzt)
+VERDICT_CACHE_TTL_HOURS = float(os.getenv('VERDICT_CACHE_TTL_HOURS', '168'))
+
+# Maximale Anzahl Einträge (älteste ungenutzte werden verdrängt)
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv('VERDICT_CACHE_MAX_ENTRIES', '10000'))
+
+# ============================================
+# Near-Duplicate-Erkennung (SimHash)
+# ============================================
+
+# Ähnliche E-Mails (z.B. Spam-Kampagnen mit variierenden IDs) übernehmen die LLM-Entscheidung
+USE_SIMHASH_INDEX = os.getenv('USE_SIMHASH_INDEX', 'true').lower() == 'true'
+
+# Speicherort des Index (relativ zum Projekt-Root)
+SIMHASH_INDEX_FILE = os.getenv('SIMHASH_INDEX_FILE', 'data/state/simhash_index.json')
+
+# Maximale Hamming-Distanz (Bits von 64) für einen Treffer
+SIMHASH_MAX_DISTANCE = int(os.getenv('SIMHASH_MAX_DISTANCE', '3'))
+
+# Maximale Anzahl Fingerprints (älteste werden verdrängt)
+SIMHASH_MAX_ENTRIES = int(os.getenv('SIMHASH_MAX_ENTRIES', '5000'))
+
+# ============================================
+# Lokaler Vor-Klassifikator (Naive Bayes)
+# ============================================
+
+# Lernt aus LLM-Entscheidungen und entscheidet selbst bei extremer Wahrscheinlichkeit
+USE_LOCAL_CLASSIFIER = os.getenv('USE_LOCAL_CLASSIFIER', 'false').lower() == 'true'
+
+# Speicherort des Modells (relativ zum Projekt-Root)
+LOCAL_CLASSIFIER_FILE = os.getenv('LOCAL_CLASSIFIER_FILE', 'data/state/local_classifier.npz')
+
+# Mindest-Wahrscheinlichkeit für eine Entscheidung ohne LLM (SPAM >= x, HAM <= 1 - x)
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', '0.995'))
+
+# Mindestanzahl gelernter E-Mails pro Klasse, bevor der Klassifikator entscheidet
+LOCAL_CLASSIFIER_MIN_DOCS = int(os.getenv('LOCAL_CLASSIFIER_MIN_DOCS', '100'))
+
+# ============================================
+# Embedding-kNN (Ollama-Embeddings)
+# ============================================
+
+# Ähnliche, bereits klassifizierte E-Mails (Embedding-Nachbarn) entscheiden ohne generatives LLM
+USE_EMBEDDING_KNN = os.getenv('USE_EMBEDDING_KNN', 'false').lower() == 'true'
+
+# Embedding-Modell in Ollama
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'nomic-embed-text')
+
+# Verzeichnis des Vektor-Index (relativ zum Projekt-Root)
+EMBEDDING_INDEX_DIR = os.getenv('EMBEDDING_INDEX_DIR', 'data/state/embeddings')
+
+# Anzahl Nachbarn
+EMBEDDING_KNN_K = int(os.getenv('EMBEDDING_KNN_K', '7'))
+
+# Minimale Kosinus-Ähnlichkeit eines Nachbarn
+EMBEDDING_KNN_MIN_SIMILARITY = float(os.getenv('EMBEDDING_KNN_MIN_SIMILARITY', '0.85'))
+
+# Minimaler Anteil übereinstimmender Nachbarn für eine Entscheidung
+EMBEDDING_KNN_AGREEMENT = float(os.getenv('EMBEDDING_KNN_AGREEMENT', '0.9'))
+
+# Mindestanzahl gespeicherter Vektoren, bevor kNN entscheidet
+EMBEDDING_KNN_MIN_ENTRIES = int(os.getenv('EMBEDDING_KNN_MIN_ENTRIES', '200'))
+
+# ============================================
+# Daemon-Modus (IMAP IDLE)
+# ============================================
+
+# IDLE wird nach X Sekunden neu gestartet (Server beenden IDLE nach 29 Minuten)
+DAEMON_IDLE_TIMEOUT = int(os.getenv('DAEMON_IDLE_TIMEOUT', '1500'))
+
+# Polling-Intervall (Sekunden) für Server ohne IDLE-Unterstützung
+DAEMON_POLL_INTERVAL = int(os.getenv('DAEMON_POLL_INTERVAL', '60'))
+
+# Maximale Wartezeit (Sekunden) zwischen Reconnect-Versuchen
+DAEMON_RECONNECT_MAX = int(os.getenv('DAEMON_RECONNECT_MAX', '300'))
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Ollama Spam Guard - Daemon-Modus mit IMAP IDLE
+
+Hält pro aktiviertem Account eine angemeldete IMAP-Verbindung offen und
+klassifiziert neue E-Mails wenige Sekunden nach Eingang, statt auf den
+nächsten Cron-Lauf zu warten.
+
+- IMAP IDLE (RFC 2177), Neustart vor dem 29-Minuten-Timeout des Servers
+- NOOP-Polling für Server ohne IDLE-Unterstützung
+- Reconnect mit exponentiellem Backoff
+- Verarbeitung über process_mailbox() inkl. UID-Checkpoints
+
+Usage:
+    python src/daemon.py
+
+Autor: Ollama Spam Guard
+"""
+
+import time
+import socket
+import select
+import logging
+import imaplib
+import threading
+from typing import Dict
+
+from config import (
+    EMAIL_ACCOUNTS, SPAM_MODEL, USE_CHECKPOINTS,
+    DAEMON_IDLE_TIMEOUT, DAEMON_POLL_INTERVAL, DAEMON_RECONNECT_MAX
+)
+from checkpoint_store import CheckpointStore
+from spam_filter import (
+    connect_imap, process_mailbox, check_ollama,
+    init_list_manager, init_checkpoint_store, init_ollama_dispatcher, init_verdict_cache,
+    init_simhash_index, init_local_classifier, init_embedding_index, log_path
+)
+
+# Minimale Wartezeit vor einem Reconnect (Sekunden)
+RECONNECT_MIN = 5
+
+# ============================================
+# IMAP IDLE
+# ============================================
+
+def supports_idle(mail: imaplib.IMAP4) -> bool:
+    """Prüft ob der Server IDLE in CAPABILITY ankündigt (nach dem Login aktualisiert, siehe connect_imap)."""
+    return 'IDLE' in mail.capabilities
+
+def _has_new_mail(line: bytes) -> bool:
+    """Erkennt untagged EXISTS/RECENT-Antworten (neue E-Mail)."""
+    return line.startswith(b'*') and (line.rstrip().endswith(b'EXISTS') or line.rstrip().endswith(b'RECENT'))
+
+def idle_wait(mail: imaplib.IMAP4, timeout: float, stop_event: threading.Event) -> bool:
+    """
+    Wartet per IDLE auf neue E-Mails.
+    
+    imaplib (Python < 3.14) kennt kein IDLE, daher wird das Kommando direkt
+    über die Verbindung gesendet und mit DONE beendet.
+    
+    Args:
+        mail: Verbundenes IMAP-Objekt (INBOX selektiert)
+        timeout: Maximale IDLE-Dauer in Sekunden (< 29 Minuten)
+        stop_event: Beendet das Warten vorzeitig
+    
+    Returns:
+        bool: True wenn neue E-Mails gemeldet wurden
+    
+    Raises:
+        imaplib.IMAP4.abort: Bei Verbindungsabbruch oder BYE
+    """
+    tag = mail._new_tag()
+    mail.send(tag + b' IDLE\r\n')
+    
+    line = mail.readline()
+    if not line.startswith(b'+'):
+        raise imaplib.IMAP4.error(f"IDLE abgelehnt: {line.decode(errors='ignore').strip()}")
+    
+    sock = mail.socket()
+    deadline = time.monotonic() + timeout
+    new_mail = False
+    
+    while not new_mail and not stop_event.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        
+        # Kurze Intervalle, damit stop_event zeitnah greift
+        pending = getattr(sock, 'pending', lambda: 0)()
+        if not pending:
+            readable, _, _ = select.select([sock], [], [], min(remaining, 5))
+            if not readable:
+                continue
+        
+        line = mail.readline()
+        if not line or line.startswith(b'* BYE'):
+            raise imaplib.IMAP4.abort("Verbindung während IDLE geschlossen")
+        new_mail = _has_new_mail(line)
+    
+    # IDLE beenden und auf Abschluss warten
+    mail.send(b'DONE\r\n')
+    while True:
+        line = mail.readline()
+        if not line:
+            raise imaplib.IMAP4.abort("Verbindung während DONE geschlossen")
+        if line.startswith(tag):
+            break
+        new_mail = new_mail or _has_new_mail(line)
+    
+    return new_mail
+
+def poll_wait(mail: imaplib.IMAP4, interval: float, stop_event: threading.Event) -> bool:
+    """
+    Fallback ohne IDLE: wartet und fragt per NOOP nach neuen E-Mails.
+    
+    Args:
+        mail: Verbundenes IMAP-Objekt (INBOX selektiert)
+        interval: Polling-Intervall in Sekunden
+        stop_event: Beendet das Warten vorzeitig
+    
+    Returns:
+        bool: True wenn neue E-Mails gemeldet wurden
+    """
+    if stop_event.wait(interval):
+        return False
+    
+    mail.noop()
+    _, exists = mail.response('EXISTS')
+    _, recent = mail.response('RECENT')
+    return any(exists) or any(recent)
+
+# ============================================
+# Account-Worker
+# ============================================
+
+def run_account(account: Dict[str, str], checkpoint_store: CheckpointStore,
+                stop_event: threading.Event) -> None:
+    """
+    Dauerschleife für einen Account: verbinden, verarbeiten, auf neue E-Mails warten.
+    
+    Args:
+        account: Account-Konfiguration
+        checkpoint_store: Gemeinsamer CheckpointStore
+        stop_event: Signal zum Beenden
+    """
+    backoff = RECONNECT_MIN
+    
+    while not stop_event.is_set():
+        mail = None
+        try:
+            mail = connect_imap(account)
+            use_idle = supports_idle(mail)
+            mode = "IDLE" if use_idle else f"NOOP-Polling alle {DAEMON_POLL_INTERVAL}s"
+            print(f"👂 {account['name']}: Warte auf neue E-Mails ({mode})")
+            logging.info(f"Daemon verbunden: {account['name']} ({mode})")
+            backoff = RECONNECT_MIN
+            
+            # Beim (Re-)Connect alles seit dem letzten Checkpoint nachholen
+            new_mail = True
+            retry = False
+            
+            while not stop_event.is_set():
+                if new_mail or retry:
+                    stats = process_mailbox(mail, account, checkpoint_store=checkpoint_store)
+                    # EXPUNGE/EXISTS-Antworten der eigenen Verschiebungen verwerfen
+                    mail.response('EXISTS')
+                    mail.response('RECENT')
+                    
+                    if stats['spam'] or stats['ham'] or stats['deferred']:
+                        deferred = f", {stats['deferred']} zurückgestellt" if stats['deferred'] else ''
+                        print(f"📊 {account['name']}: {stats['spam']} SPAM, {stats['ham']} HAM{deferred}")
+                    
+                    # Zurückgestellte E-Mails liegen unter dem Checkpoint: nach jedem
+                    # IDLE-Timeout bzw. Polling-Zyklus erneut versuchen, auch ohne neue E-Mail
+                    retry = stats['deferred'] > 0
+                
+                # IDLE wird nach DAEMON_IDLE_TIMEOUT neu gestartet (Server-Timeout: 29 Minuten)
+                if use_idle:
+                    new_mail = idle_wait(mail, DAEMON_IDLE_TIMEOUT, stop_event)
+                else:
+                    new_mail = poll_wait(mail, DAEMON_POLL_INTERVAL, stop_event)
+        
+        except (imaplib.IMAP4.error, OSError, socket.timeout) as e:
+            if stop_event.is_set():
+                break
+            print(f"⚠️  {account['name']}: Verbindung verloren ({e}), neuer Versuch in {backoff}s")
+            logging.warning(f"Daemon {account['name']}: {e} - Reconnect in {backoff}s")
+            stop_event.wait(backoff)
+            backoff = min(backoff * 2, DAEMON_RECONNECT_MAX)
+        except Exception as e:
+            logging.error(f"Daemon {account['name']}: Unerwarteter Fehler: {e}", exc_info=True)
+            stop_event.wait(backoff)
+            backoff = min(backoff * 2, DAEMON_RECONNECT_MAX)
+        finally:
+            if mail is not None:
+                try:
+                    mail.logout()
+                except Exception:
+                    pass
+
+# ============================================
+# Main Entry Point
+# ============================================
+
+def main():
+    """Startet einen Worker-Thread pro aktiviertem Account."""
+    
+    print("\n" + "="*60)
+    print("🤖 LLM-basierter IMAP Spam-Filter (Daemon-Modus)")
+    print("="*60)
+    print(f"   Modell: {SPAM_MODEL}")
+    print(f"   Accounts: {len(EMAIL_ACCOUNTS)}")
+    print(f"   IDLE-Neustart: alle {DAEMON_IDLE_TIMEOUT}s")
+    print(f"   Log: {log_path}")
+    print("="*60 + "\n")
+    
+    if not check_ollama():
+        return
+    
+    # Gemeinsame Ressourcen vor dem Start der Threads initialisieren
+    init_list_manager()
+    init_verdict_cache()
+    init_simhash_index()
+    init_local_classifier()
+    init_embedding_index()
+    init_ollama_dispatcher()
+    checkpoint_store = init_checkpoint_store() if USE_CHECKPOINTS else CheckpointStore()
+    
+    stop_event = threading.Event()
+    threads = []
+    
+    for account in EMAIL_ACCOUNTS:
+        thread = threading.Thread(
+            target=run_account,
+            args=(account, checkpoint_store, stop_event),
+            name=f"daemon-{account['name']}",
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    
+    logging.info(f"Daemon gestartet ({len(threads)} Accounts)")
+    
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n\n⏸️  Daemon wird beendet...")
+        logging.info("Daemon durch Benutzer beendet")
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=10)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Domain-Suffix-Index für Ollama Spam Guard
+Domain-Einträge mit oder ohne Subdomains, Lookup über die Label-Suffixe
+
+Ein Eintrag "spammer.com" soll auch "mail.spammer.com" treffen. Statt alle
+Einträge zu durchsuchen, wird die geprüfte Domain in ihre Suffixe zerlegt
+und jedes Suffix im Hash-Set nachgeschlagen:
+
+    mail.news.spammer.com → mail.news.spammer.com, news.spammer.com, spammer.com, com
+
+Ein Lookup kostet also höchstens so viele Set-Zugriffe wie die Domain
+Labels hat, unabhängig von der Listengröße (auch bei Millionen Einträgen
+aus blacklist_sources.yaml). Der Speicherbedarf entspricht einem normalen
+Set der Einträge.
+
+Syntax in whitelist.txt/blacklist.txt:
+- "*.example.com" / ".example.com": Domain und alle Subdomains
+- "=example.com": nur exakt diese Domain (keine Subdomains)
+- "example.com" / "@example.com": Blacklist inkl. Subdomains, Whitelist nur
+  exakt (wie bisher, damit bestehende Whitelists nicht stillschweigend
+  Subdomains Dritter freigeben)
+
+Autor: Ollama Spam Guard
+"""
+
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Präfix für exakte Einträge (ohne Subdomains)
+EXACT_PREFIX = '='
+
+# Präfixe für Einträge mit Subdomains (unabhängig von der Liste)
+SUFFIX_PREFIXES = ('*.', '.')
+
+# Präfix ohne eigene Bedeutung (gleichbedeutend mit der nackten Domain)
+AT_PREFIX = '@'
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def normalize_domain(domain: str) -> str:
+    """Kleinschreibung, ohne Leerzeichen und ohne Punkt am Anfang/Ende."""
+    return domain.strip().strip('.').lower()
+
+def parse_domain_entry(entry: str, bare_exact: bool = False) -> Tuple[str, bool]:
+    """
+    Zerlegt einen Listeneintrag in Domain und Modus.
+    
+    Args:
+        entry: z.B. "example.com", "*.example.com", "@example.com" oder "=example.com"
+        bare_exact: Einträge ohne "*."/"." nur exakt werten (Whitelist)
+    
+    Returns:
+        (Domain, exact): exact=True für "=example.com" (bzw. nackte Domains mit bare_exact)
+    """
+    entry = entry.strip()
+    if entry.startswith(EXACT_PREFIX):
+        return normalize_domain(entry[len(EXACT_PREFIX):]), True
+    
+    for prefix in SUFFIX_PREFIXES:
+        if entry.startswith(prefix):
+            return normalize_domain(entry[len(prefix):]), False
+    
+    if entry.startswith(AT_PREFIX):
+        entry = entry[len(AT_PREFIX):]
+    return normalize_domain(entry), bare_exact
+
+def domain_suffixes(domain: str) -> Iterator[str]:
+    """
+    Liefert die Domain und alle übergeordneten Domains (spezifischste zuerst).
+    
+    Args:
+        domain: z.B. "mail.spammer.com"
+    
+    Yields:
+        "mail.spammer.com", "spammer.com", "com"
+    """
+    position = 0
+    while True:
+        yield domain[position:]
+        dot = domain.find('.', position)
+        if dot < 0:
+            return
+        position = dot + 1
+
+# ============================================
+# Domain Index
+# ============================================
+
+class DomainIndex:
+    """
+    Menge von Domains mit Subdomain-Treffern über Suffix-Lookups.
+    
+    Verwendung:
+        index = DomainIndex()
+        index.add("spammer.com")                 # inkl. Subdomains
+        index.add("amazon.de", exact=True)       # nur amazon.de
+        index.match("mail.spammer.com")          # "spammer.com"
+        index.match("news.amazon.de")            # None
+    """
+    
+    def __init__(self):
+        # Domains, die auch ihre Subdomains abdecken
+        self.suffixes: Set[str] = set()
+        # Domains ohne Subdomains ("=example.com")
+        self.exact: Set[str] = set()
+    
+    def __len__(self) -> int:
+        """Anzahl Einträge (beide Modi)."""
+        return len(self.suffixes) + len(self.exact)
+    
+    def __contains__(self, domain: str) -> bool:
+        return self.match(domain) is not None
+    
+    def add(self, domain: str, exact: bool = False) -> bool:
+        """
+        Fügt eine Domain hinzu.
+        
+        Args:
+            domain: Domain (wird normalisiert)
+            exact: Nur diese Domain, keine Subdomains
+        
+        Returns:
+            bool: False bei leerer Domain
+        """
+        domain = normalize_domain(domain)
+        if not domain:
+            return False
+        (self.exact if exact else self.suffixes).add(domain)
+        return True
+    
+    def add_entry(self, entry: str, bare_exact: bool = False) -> bool:
+        """
+        Fügt einen Listeneintrag mit Syntax hinzu (siehe parse_domain_entry).
+        
+        Returns:
+            bool: False bei leerer Domain
+        """
+        domain, exact = parse_domain_entry(entry, bare_exact=bare_exact)
+        return self.add(domain, exact=exact)
+    
+    def update(self, domains: Iterable[str], exact: bool = False) -> int:
+        """
+        Fügt mehrere Domains im selben Modus hinzu (z.B. externe Listen).
+        
+        Returns:
+            int: Anzahl neuer Einträge (ohne Duplikate)
+        """
+        target = self.exact if exact else self.suffixes
+        before = len(target)
+        target.update(filter(None, map(normalize_domain, domains)))
+        return len(target) - before
+    
+    def match(self, domain: str) -> Optional[str]:
+        """
+        Sucht den spezifischsten Eintrag, der die Domain abdeckt.
+        
+        Args:
+            domain: Absender-Domain, z.B. "mail.spammer.com"
+        
+        Returns:
+            str: Getroffener Eintrag ("=amazon.de" für exakte Einträge) oder None
+        """
+        domain = normalize_domain(domain)
+        if not domain:
+            return None
+        
+        if domain in self.exact:
+            return f"{EXACT_PREFIX}{domain}"
+        
+        for suffix in domain_suffixes(domain):
+            if suffix in self.suffixes:
+                return suffix
+        return None
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Embedding-Index für Ollama Spam Guard
+kNN-Klassifizierung über Ollama-Embeddings in einer memory-mapped NumPy-Matrix
+
+Jede vom LLM klassifizierte E-Mail wird als normalisierter Embedding-Vektor
+mit Label (SPAM/HAM) gespeichert. Neue E-Mails werden per Kosinus-Ähnlichkeit
+gegen alle gespeicherten Vektoren verglichen (ein Matrixprodukt pro Batch).
+Nur wenn die nächsten Nachbarn ähnlich genug und sich einig sind, fällt die
+Entscheidung ohne generatives LLM.
+
+Dateien (im Index-Verzeichnis):
+- vectors.f32: Vektoren, zeilenweise float32 (np.memmap, nur lesend gemappt)
+- labels.u8:   Label pro Zeile (1 = SPAM, 0 = HAM)
+- meta.json:   Modell, Dimension und Anzahl gültiger Zeilen
+
+Neue Vektoren werden an die Dateien angehängt (kein Neuaufbau). meta.json
+wird erst danach atomar geschrieben, ein abgebrochener Append wird beim
+nächsten Mal überschrieben.
+
+Autor: Ollama Spam Guard
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normalisiert Zeilen auf Länge 1 (Skalarprodukt = Kosinus-Ähnlichkeit)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def new_embedding_stats() -> Dict[str, int]:
+    """Erzeugt leere Index-Statistik."""
+    return {'queries': 0, 'decided': 0, 'added': 0}
+
+# ============================================
+# Embedding Index
+# ============================================
+
+class EmbeddingIndex:
+    """
+    Append-only Vektor-Index mit kNN-Abstimmung.
+    
+    Verwendung:
+        index = EmbeddingIndex(Path("data/state/embeddings"), model="nomic-embed-text")
+        votes = index.vote(vectors, k=7, min_similarity=0.85, agreement=0.9)
+        index.add(vector, is_spam=True)
+        index.flush()
+    """
+    
+    def __init__(self, directory: Path, model: str):
+        """
+        Öffnet (bzw. erstellt) den Index.
+        
+        Args:
+            directory: Verzeichnis für Vektoren, Labels und Metadaten
+            model: Embedding-Modell (anderes Modell → Index wird neu begonnen)
+        """
+        self.directory = Path(directory)
+        self.model = model
+        self.vectors_path = self.directory / 'vectors.f32'
+        self.labels_path = self.directory / 'labels.u8'
+        self.meta_path = self.directory / 'meta.json'
+        self.stats = new_embedding_stats()
+        
+        self.dim: Optional[int] = None
+        self.count = 0
+        
+        self._matrix: Optional[np.ndarray] = None
+        self._labels: Optional[np.ndarray] = None
+        self._pending_vectors: List[np.ndarray] = []
+        self._pending_labels: List[int] = []
+        self._lock = threading.RLock()
+        
+        self._load_meta()
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def _load_meta(self) -> None:
+        """Liest meta.json und prüft Modell und Dateigrößen."""
+        if not self.meta_path.exists():
+            return
+        
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logging.error(f"Fehler beim Laden des Embedding-Index ({self.meta_path}): {e}")
+            return
+        
+        if meta.get('model') != self.model:
+            logging.warning(
+                f"Embedding-Index wurde mit '{meta.get('model')}' erstellt, "
+                f"aktuelles Modell '{self.model}' → Index wird neu begonnen"
+            )
+            return
+        
+        self.dim = int(meta['dim'])
+        count = int(meta['count'])
+        
+        # Nur vollständig geschriebene Zeilen verwenden
+        row_bytes = self.dim * 4
+        vector_rows = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+        label_rows = self.labels_path.stat().st_size if self.labels_path.exists() else 0
+        self.count = min(count, vector_rows, label_rows)
+    
+    def _write_meta(self) -> None:
+        """Schreibt meta.json atomar."""
+        tmp_path = self.meta_path.with_suffix('.json.tmp')
+        tmp_path.write_text(
+            json.dumps({'model': self.model, 'dim': self.dim, 'count': self.count}), encoding='utf-8'
+        )
+        os.replace(tmp_path, self.meta_path)
+    
+    def _open(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Mappt Vektoren (nur lesend) und lädt Labels, falls noch nicht geschehen."""
+        if self._matrix is None and self.count:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(self.count, self.dim))
+            self._labels = np.fromfile(self.labels_path, dtype=np.uint8, count=self.count)
+        return self._matrix, self._labels
+    
+    def vote(self, vectors: np.ndarray, k: int = 7, min_similarity: float = 0.85,
+             agreement: float = 0.9) -> List[Optional[Tuple[bool, float, float]]]:
+        """
+        kNN-Abstimmung für einen Batch von Embeddings.
+        
+        Gezählt werden nur Nachbarn mit Ähnlichkeit >= min_similarity. Eine
+        Entscheidung fällt, wenn mindestens die Hälfte der k Nachbarn so nah
+        ist und davon mindestens der Anteil agreement dasselbe Label hat.
+        
+        Args:
+            vectors: Embeddings der neuen E-Mails (n × dim)
+            k: Anzahl Nachbarn
+            min_similarity: Minimale Kosinus-Ähnlichkeit eines Nachbarn
+            agreement: Minimaler Anteil übereinstimmender Nachbarn
+        
+        Returns:
+            Pro E-Mail (is_spam, Anteil, mittlere Ähnlichkeit) oder None (uneindeutig)
+        """
+        queries = normalize_rows(vectors)
+        
+        with self._lock:
+            matrix, labels = self._open()
+            self.stats['queries'] += len(queries)
+            
+            if matrix is None or queries.shape[1] != self.dim:
+                return [None] * len(queries)
+            
+            k = max(1, min(k, self.count))
+            similarities = queries @ matrix.T
+            neighbours = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        
+        neighbour_similarities = np.take_along_axis(similarities, neighbours, axis=1)
+        neighbour_labels = labels[neighbours]
+        
+        close = neighbour_similarities >= min_similarity
+        close_count = close.sum(axis=1)
+        spam_count = (close & (neighbour_labels == 1)).sum(axis=1)
+        mean_similarity = np.where(close, neighbour_similarities, 0).sum(axis=1) / np.maximum(close_count, 1)
+        
+        results: List[Optional[Tuple[bool, float, float]]] = []
+        for row in range(len(queries)):
+            if close_count[row] * 2 < k:
+                results.append(None)
+                continue
+            
+            spam_share = spam_count[row] / close_count[row]
+            if spam_share >= agreement:
+                results.append((True, float(spam_share), float(mean_similarity[row])))
+            elif 1 - spam_share >= agreement:
+                results.append((False, float(1 - spam_share), float(mean_similarity[row])))
+            else:
+                results.append(None)
+        
+        with self._lock:
+            self.stats['decided'] += sum(1 for result in results if result is not None)
+        return results
+    
+    def add(self, vector: Sequence[float], is_spam: bool) -> None:
+        """
+        Merkt einen gelabelten Vektor für das nächste flush() vor (thread-sicher).
+        
+        Args:
+            vector: Embedding der E-Mail
+            is_spam: Entscheidung des LLM
+        """
+        with self._lock:
+            self._pending_vectors.append(normalize_rows(np.asarray(vector))[0])
+            self._pending_labels.append(int(is_spam))
+    
+    def flush(self) -> int:
+        """
+        Hängt alle vorgemerkten Vektoren an die Dateien an (kein Neuaufbau).
+        
+        Returns:
+            int: Anzahl angehängter Vektoren
+        """
+        with self._lock:
+            if not self._pending_vectors:
+                return 0
+            
+            vectors = np.vstack(self._pending_vectors).astype(np.float32)
+            labels = np.asarray(self._pending_labels, dtype=np.uint8)
+            self._pending_vectors, self._pending_labels = [], []
+            
+            if self.dim is None or self.count == 0:
+                self.dim = vectors.shape[1]
+            if vectors.shape[1] != self.dim:
+                logging.error(f"Embedding-Dimension {vectors.shape[1]} passt nicht zum Index ({self.dim})")
+                return 0
+            
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                
+                # Ab der letzten gültigen Zeile schreiben (überschreibt abgebrochene Appends)
+                for path, data, row_bytes in (
+                    (self.vectors_path, vectors, self.dim * 4),
+                    (self.labels_path, labels, 1)
+                ):
+                    with open(path, 'r+b' if path.exists() else 'wb') as f:
+                        f.seek(self.count * row_bytes)
+                        f.write(data.tobytes())
+                        f.truncate()
+                
+                self.count += len(vectors)
+                self._write_meta()
+            except Exception as e:
+                logging.error(f"Fehler beim Schreiben des Embedding-Index: {e}")
+                return 0
+            
+            # Mapping beim nächsten vote() mit neuer Größe öffnen
+            self._matrix, self._labels = None, None
+            self.stats['added'] += len(vectors)
+            return len(vectors)
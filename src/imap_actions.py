@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+IMAP-Aktionen für Ollama Spam Guard
+Sammelt Entscheidungen (SPAM verschieben, HAM als gelesen markieren)
+und führt sie gebündelt mit wenigen Kommandos pro Batch aus
+
+- SPAM: UID MOVE (RFC 6851), falls vom Server angekündigt,
+  sonst UID COPY + UID STORE \\Deleted + UID EXPUNGE (RFC 4315, UIDPLUS)
+- HAM: Ein UID STORE +FLAGS.SILENT (\\Seen) für alle UIDs des Batches
+- Zurückgestellt (nicht geholt oder nicht klassifiziert): keine Aktion, der
+  Checkpoint bleibt unterhalb der UID, damit der nächste Lauf sie erneut prüft
+
+Ein Absturz verliert so höchstens die Entscheidungen eines Batches.
+
+Autor: Ollama Spam Guard
+"""
+
+import logging
+import imaplib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from imap_fetch import compress_uid_set
+
+# imaplib kennt MOVE nicht als (UID-)Kommando
+imaplib.Commands.setdefault('MOVE', ('SELECTED',))
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def refresh_capabilities(mail: imaplib.IMAP4) -> Tuple[str, ...]:
+    """
+    Fragt CAPABILITY nach dem Login erneut ab und aktualisiert mail.capabilities.
+    
+    imaplib liest die Fähigkeiten nur aus der Begrüßung vor dem Login. Viele
+    Server (z.B. Dovecot) kündigen MOVE, UIDPLUS oder IDLE erst nach der
+    Anmeldung an.
+    
+    Args:
+        mail: Angemeldetes IMAP-Objekt
+    
+    Returns:
+        Tuple[str, ...]: Aktuelle Fähigkeiten (bei Fehler die bisherigen)
+    """
+    try:
+        status, data = mail.capability()
+    except imaplib.IMAP4.error as e:
+        logging.warning(f"CAPABILITY nach dem Login fehlgeschlagen: {e}")
+        return tuple(mail.capabilities)
+    
+    if status != 'OK':
+        return tuple(mail.capabilities)
+    
+    capabilities = set()
+    for line in data:
+        if isinstance(line, bytes):
+            line = line.decode('ascii', errors='ignore')
+        capabilities.update(str(line or '').upper().split())
+    capabilities.discard('CAPABILITY')
+    
+    if capabilities:
+        mail.capabilities = tuple(sorted(capabilities))
+    return tuple(mail.capabilities)
+
+def new_action_stats() -> Dict[str, int]:
+    """Erzeugt leere Aktions-Statistik."""
+    return {'moved': 0, 'seen': 0, 'deferred': 0, 'commands': 0, 'flushes': 0, 'failed': 0}
+
+# ============================================
+# Aktions-Batch
+# ============================================
+
+class MailActions:
+    """
+    Sammelt IMAP-Aktionen und führt sie gebündelt aus.
+    
+    Verwendung:
+        actions = MailActions(mail, account['spam_folder'], batch_size=25)
+        actions.move_to_spam(uid)
+        actions.mark_seen(uid)
+        actions.flush()  # Rest am Ende ausführen
+    """
+    
+    def __init__(self, mail: imaplib.IMAP4, spam_folder: str, batch_size: int = 25,
+                 stats: Optional[Dict[str, int]] = None,
+                 on_flush: Optional[Callable[[int], None]] = None):
+        """
+        Initialisiert den Aktions-Batch.
+        
+        Args:
+            mail: Verbundenes IMAP-Objekt (INBOX selektiert)
+            spam_folder: Ziel-Ordner für SPAM
+            batch_size: Anzahl Entscheidungen bis zum automatischen Flush
+            stats: Optionales Dict für Statistiken (siehe new_action_stats)
+            on_flush: Callback mit höchster erfolgreich ausgeführter UID (z.B. Checkpoint)
+        """
+        self.mail = mail
+        self.spam_folder = spam_folder
+        self.batch_size = max(1, batch_size)
+        self.stats = stats if stats is not None else new_action_stats()
+        self.on_flush = on_flush
+        
+        capabilities = getattr(mail, 'capabilities', ())
+        self.has_move = 'MOVE' in capabilities
+        self.has_uidplus = 'UIDPLUS' in capabilities
+        
+        self.spam_uids: List[bytes] = []
+        self.seen_uids: List[bytes] = []
+        
+        # Niedrigste fehlgeschlagene oder zurückgestellte UID (Checkpoint bleibt darunter)
+        self.failed_floor: Optional[int] = None
+    
+    def move_to_spam(self, uid: bytes) -> None:
+        """Merkt UID zum Verschieben in den Spam-Ordner vor."""
+        self.spam_uids.append(uid)
+        self._maybe_flush()
+    
+    def mark_seen(self, uid: bytes) -> None:
+        """Merkt UID zum Markieren als gelesen vor."""
+        self.seen_uids.append(uid)
+        self._maybe_flush()
+    
+    def defer(self, uid: bytes) -> None:
+        """Stellt UID zurück (bleibt ungelesen, Checkpoint wird nicht darüber fortgeschrieben)."""
+        self.stats['deferred'] += 1
+        self.failed_floor = int(uid) if self.failed_floor is None else min(self.failed_floor, int(uid))
+    
+    def _maybe_flush(self) -> None:
+        """Führt Batch aus, sobald batch_size erreicht ist."""
+        if len(self.spam_uids) + len(self.seen_uids) >= self.batch_size:
+            self.flush()
+    
+    def _command(self, *args) -> bool:
+        """Führt ein UID-Kommando aus und zählt es."""
+        self.stats['commands'] += 1
+        status, data = self.mail.uid(*args)
+        if status != 'OK':
+            logging.error(f"UID {args[0]} fehlgeschlagen: {status} {data}")
+            return False
+        return True
+    
+    def _move(self, uids: List[bytes]) -> bool:
+        """
+        Verschiebt UIDs in den Spam-Ordner.
+        
+        Args:
+            uids: Zu verschiebende UIDs
+        
+        Returns:
+            bool: True bei Erfolg
+        """
+        uid_set = compress_uid_set(uids)
+        
+        if self.has_move:
+            return self._command('MOVE', uid_set, self.spam_folder)
+        
+        if not self._command('COPY', uid_set, self.spam_folder):
+            return False
+        if not self._command('STORE', uid_set, '+FLAGS.SILENT', '(\\Deleted)'):
+            return False
+        
+        if self.has_uidplus:
+            # Nur genau diese UIDs löschen
+            return self._command('EXPUNGE', uid_set)
+        
+        # Ohne UIDPLUS bleibt nur das globale EXPUNGE
+        self.stats['commands'] += 1
+        status, _ = self.mail.expunge()
+        return status == 'OK'
+    
+    def flush(self) -> None:
+        """Führt alle vorgemerkten Aktionen aus."""
+        if not self.spam_uids and not self.seen_uids:
+            return
+        
+        spam_uids, self.spam_uids = self.spam_uids, []
+        seen_uids, self.seen_uids = self.seen_uids, []
+        done: List[bytes] = []
+        failed: List[bytes] = []
+        
+        if spam_uids:
+            try:
+                if self._move(spam_uids):
+                    self.stats['moved'] += len(spam_uids)
+                    done.extend(spam_uids)
+                    logging.info(f"{len(spam_uids)} SPAM-E-Mail(s) nach '{self.spam_folder}' verschoben")
+                else:
+                    failed.extend(spam_uids)
+                    print(f"   ⚠️  Verschiebung von {len(spam_uids)} E-Mail(s) fehlgeschlagen")
+            except imaplib.IMAP4.error as e:
+                failed.extend(spam_uids)
+                logging.error(f"Spam-Verschiebung fehlgeschlagen: {e}")
+                print(f"   ⚠️  Verschiebung fehlgeschlagen: {e}")
+        
+        if seen_uids:
+            try:
+                if self._command('STORE', compress_uid_set(seen_uids), '+FLAGS.SILENT', '(\\Seen)'):
+                    self.stats['seen'] += len(seen_uids)
+                    done.extend(seen_uids)
+                else:
+                    failed.extend(seen_uids)
+            except imaplib.IMAP4.error as e:
+                failed.extend(seen_uids)
+                logging.error(f"Markieren als gelesen fehlgeschlagen: {e}")
+        
+        self.stats['flushes'] += 1
+        self.stats['failed'] += len(failed)
+        
+        if failed:
+            lowest = min(int(uid) for uid in failed)
+            self.failed_floor = lowest if self.failed_floor is None else min(self.failed_floor, lowest)
+        
+        if self.on_flush:
+            # Checkpoint nie über eine fehlgeschlagene UID hinaus fortschreiben
+            safe = [int(uid) for uid in done if self.failed_floor is None or int(uid) < self.failed_floor]
+            if safe:
+                self.on_flush(max(safe))
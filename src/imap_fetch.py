@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+IMAP-Fetch-Stufe für Ollama Spam Guard
+Holt Nachrichten gebündelt (mehrere UIDs pro FETCH-Kommando) statt einzeln
+
+Bei Providern mit hoher Latenz (GMX, Outlook) dominiert sonst der Roundtrip
+pro E-Mail die Laufzeit. Die Nachrichten werden chunkweise geholt und als
+Generator an die Klassifizierung weitergereicht.
+
+Im partial-Modus werden nur Header und ein begrenzter Body-Anfang geholt
+(BODY.PEEK[HEADER] + BODY.PEEK[TEXT]<0.N>), große Anhänge werden also
+nicht übertragen und das \\Seen-Flag bleibt unverändert.
+
+Autor: Ollama Spam Guard
+"""
+
+import re
+import email
+import email.message
+import logging
+import imaplib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Standard-Anzahl Nachrichten pro FETCH-Kommando
+DEFAULT_CHUNK_SIZE = 50
+
+# Fetch-Modi:
+# - partial: Header + begrenzter Body-Anfang (keine Anhänge)
+# - full: Komplette Nachricht
+# - headers: Nur Header (z.B. für Whitelist-Abgleich im Unspam-Tool)
+FETCH_MODES = ('partial', 'full', 'headers')
+
+# Standard-Länge des Body-Anfangs im partial-Modus (Bytes)
+DEFAULT_BODY_BYTES = 16384
+
+# Regex für die Antwort-Zeilen von imaplib
+_MSG_START_RE = re.compile(rb'^(\d+) \(')
+_UID_RE = re.compile(rb'UID (\d+)')
+_ITEM_RE = re.compile(rb'(RFC822|BODY\[[^\]]*\](?:<\d+>)?) \{\d+\}$')
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def compress_uid_set(uids: List[bytes]) -> str:
+    """
+    Fasst UIDs zu einem kompakten IMAP-Sequence-Set zusammen.
+    
+    Aufeinanderfolgende UIDs werden zu Bereichen gebündelt,
+    z.B. [1, 2, 3, 7, 9, 10] → "1:3,7,9:10".
+    
+    Args:
+        uids: UIDs als Bytes (wie von UID SEARCH geliefert)
+    
+    Returns:
+        str: IMAP-Sequence-Set
+    """
+    numbers = sorted({int(uid) for uid in uids})
+    ranges = []
+    
+    if not numbers:
+        return ""
+    
+    start = prev = numbers[0]
+    for number in numbers[1:]:
+        if number == prev + 1:
+            prev = number
+            continue
+        ranges.append(f"{start}:{prev}" if start != prev else str(start))
+        start = prev = number
+    ranges.append(f"{start}:{prev}" if start != prev else str(start))
+    
+    return ",".join(ranges)
+
+def parse_fetch_response(data: list) -> Dict[bytes, Dict[str, bytes]]:
+    """
+    Zerlegt eine Multi-Message-FETCH-Antwort von imaplib.
+    
+    imaplib liefert pro Literal ein Tuple (Header, Daten) und dazwischen
+    schließende Bytes wie b')' oder b' UID 123)'. Manche Server (z.B. Gmail)
+    senden die UID erst nach dem Literal.
+    
+    Args:
+        data: Rohdaten aus mail.uid('FETCH', ...)
+    
+    Returns:
+        Dict[uid, Dict[item, bytes]]: z.B. {b'42': {'BODY[HEADER]': b'...', 'BODY[TEXT]<0>': b'...'}}
+    """
+    messages: Dict[bytes, Dict[str, bytes]] = {}
+    current_items: Optional[Dict[str, bytes]] = None
+    current_uid: Optional[bytes] = None
+    
+    def finalize() -> None:
+        if current_uid is not None and current_items:
+            messages[current_uid] = current_items
+    
+    for part in data or []:
+        if isinstance(part, tuple):
+            header, literal = part[0], part[1]
+            
+            if _MSG_START_RE.match(header):
+                # Neue Nachricht beginnt
+                finalize()
+                current_items, current_uid = {}, None
+            
+            if current_items is None:
+                continue
+            
+            uid_match = _UID_RE.search(header)
+            if uid_match:
+                current_uid = uid_match.group(1)
+            
+            item_match = _ITEM_RE.search(header)
+            if item_match:
+                current_items[item_match.group(1).decode('ascii')] = literal
+        
+        elif isinstance(part, bytes):
+            if _MSG_START_RE.match(part):
+                # Eigenständige Antwort ohne Literal (z.B. unaufgeforderte FLAGS)
+                finalize()
+                current_items, current_uid = None, None
+                continue
+            
+            if current_items is not None and current_uid is None:
+                uid_match = _UID_RE.search(part)
+                if uid_match:
+                    current_uid = uid_match.group(1)
+    
+    finalize()
+    return messages
+
+def fetch_items_for_mode(mode: str, body_bytes: int = DEFAULT_BODY_BYTES) -> str:
+    """
+    Liefert die FETCH-Items für einen Fetch-Modus.
+    
+    Alle Modi nutzen BODY.PEEK, damit das Holen nicht als Nebeneffekt
+    das \\Seen-Flag setzt.
+    
+    Args:
+        mode: 'partial', 'full' oder 'headers'
+        body_bytes: Maximale Body-Länge im partial-Modus
+    
+    Returns:
+        str: FETCH-Items, z.B. "(BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.16384>)"
+    """
+    if mode == 'full':
+        return '(BODY.PEEK[])'
+    if mode == 'headers':
+        return '(BODY.PEEK[HEADER])'
+    return f'(BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{max(1, body_bytes)}>)'
+
+def build_message(items: Dict[str, bytes]) -> Optional[email.message.Message]:
+    """
+    Baut ein Message-Objekt aus den geholten FETCH-Items.
+    
+    Im partial-Modus werden Header und abgeschnittener Body wieder
+    zusammengesetzt. Der MIME-Parser toleriert den fehlenden Rest
+    (z.B. abgeschnittene Anhänge).
+    
+    Args:
+        items: FETCH-Items einer Nachricht
+    
+    Returns:
+        Message oder None falls keine verwertbaren Daten
+    """
+    raw = items.get('BODY[]') or items.get('RFC822')
+    if raw is not None:
+        return email.message_from_bytes(raw)
+    
+    header = items.get('BODY[HEADER]')
+    if header is None:
+        return None
+    
+    text = next((value for key, value in items.items() if key.startswith('BODY[TEXT]')), b'')
+    return email.message_from_bytes(header + (text or b''))
+
+# ============================================
+# Fetch-Stufe
+# ============================================
+
+def new_fetch_stats() -> Dict[str, int]:
+    """Erzeugt leere Fetch-Statistik."""
+    return {'messages': 0, 'round_trips': 0, 'missing': 0, 'bytes': 0}
+
+def fetch_messages(
+    mail: imaplib.IMAP4,
+    uids: List[bytes],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stats: Optional[Dict[str, int]] = None,
+    mode: str = 'partial',
+    body_bytes: int = DEFAULT_BODY_BYTES
+) -> Iterator[Tuple[bytes, Optional[email.message.Message]]]:
+    """
+    Holt Nachrichten chunkweise per UID FETCH und liefert sie einzeln.
+    
+    Pro Chunk wird genau ein FETCH-Kommando gesendet. Die Nachrichten
+    werden in der Reihenfolge von `uids` geliefert. Jede UID wird genau
+    einmal geliefert: schlägt der FETCH fehl oder fehlen Daten, mit None
+    statt Nachricht, damit der Aufrufer sie zurückstellen kann (sonst würde
+    der Checkpoint über sie hinweg fortgeschrieben).
+    
+    Args:
+        mail: Verbundenes IMAP-Objekt (Ordner bereits selektiert)
+        uids: Zu holende UIDs
+        chunk_size: Anzahl Nachrichten pro FETCH-Kommando
+        stats: Optionales Dict für Statistiken (siehe new_fetch_stats)
+        mode: Fetch-Modus ('partial', 'full' oder 'headers')
+        body_bytes: Maximale Body-Länge im partial-Modus
+    
+    Yields:
+        Tuple[bytes, Optional[Message]]: (uid, geparste Nachricht oder None)
+    """
+    if stats is None:
+        stats = new_fetch_stats()
+    chunk_size = max(1, chunk_size)
+    fetch_items = fetch_items_for_mode(mode, body_bytes)
+    
+    for offset in range(0, len(uids), chunk_size):
+        chunk = uids[offset:offset + chunk_size]
+        uid_set = compress_uid_set(chunk)
+        
+        try:
+            status, data = mail.uid('FETCH', uid_set, fetch_items)
+        except imaplib.IMAP4.error as e:
+            logging.error(f"UID FETCH fehlgeschlagen für {uid_set}: {e}")
+            status, data = None, None
+        finally:
+            stats['round_trips'] += 1
+        
+        if status != 'OK':
+            if status is not None:
+                logging.error(f"UID FETCH fehlgeschlagen für {uid_set}: {status}")
+            stats['missing'] += len(chunk)
+            for uid in chunk:
+                yield uid, None
+            continue
+        
+        fetched = parse_fetch_response(data)
+        
+        for uid in chunk:
+            items = fetched.get(uid)
+            msg = build_message(items) if items else None
+            
+            if msg is None:
+                logging.warning(f"Keine Daten für UID {uid.decode()} erhalten")
+                stats['missing'] += 1
+                yield uid, None
+                continue
+            
+            stats['messages'] += 1
+            stats['bytes'] += sum(len(value) for value in items.values() if value)
+            yield uid, msg
+
+def saved_round_trips(stats: Dict[str, int]) -> int:
+    """
+    Berechnet die eingesparten Roundtrips gegenüber einem FETCH pro E-Mail.
+    
+    Args:
+        stats: Fetch-Statistik
+    
+    Returns:
+        int: Anzahl gesparter Roundtrips
+    """
+    return max(0, stats['messages'] + stats['missing'] - stats['round_trips'])
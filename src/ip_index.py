@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+IP-Bereichsindex für Ollama Spam Guard
+Sortierte, zusammengeführte Adressintervalle mit binärer Suche (bisect)
+
+Quellen wie Spamhaus DROP/EDROP listen ganze Netze (z.B. "1.10.16.0/20"),
+blocklist.de einzelne Adressen. Beides wird als Intervall [erste, letzte
+Adresse] als Ganzzahl gespeichert:
+
+- Einzel-IPs sind Intervalle der Länge 1, CIDR-Blöcke decken ihr ganzes Netz ab
+- Überlappende und angrenzende Intervalle werden beim Aufbau zusammengeführt
+- Lookup: bisect über die sortierten Startadressen, O(log n)
+- IPv4 und IPv6 getrennt; IPv4-gemappte IPv6-Adressen (::ffff:1.2.3.4)
+  werden als IPv4 geprüft
+
+IPv4-Intervalle liegen in kompakten array('Q')-Arrays (16 Bytes pro
+Intervall statt Python-Objekten) und werden mit NumPy sortiert und
+zusammengeführt, damit auch Millionen Adressen wenig Speicher und Zeit
+kosten. IPv6 (128 Bit, passt nicht in uint64) bleibt bei Python-Ganzzahlen.
+
+Autor: Ollama Spam Guard
+"""
+
+import re
+import socket
+import bisect
+import logging
+import ipaddress
+import threading
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Trennzeichen nach der Adresse (z.B. "1.10.16.0/20 ; SBL256894")
+ENTRY_SEPARATOR_RE = re.compile(r'[\s;,]')
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def parse_address(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Wandelt eine einzelne IP-Adresse in (Version, Ganzzahl).
+    
+    Args:
+        text: z.B. "192.0.2.1", "2001:db8::1", "[2001:db8::1]" oder "::ffff:192.0.2.1"
+    
+    Returns:
+        (4 oder 6, Adresse als int) oder None bei ungültiger Adresse
+    """
+    text = text.strip().strip('[]')
+    if text.lower().startswith('ipv6:'):
+        text = text[5:]
+    
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, text), 'big')
+    except OSError:
+        pass
+    
+    try:
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET6, text.split('%', 1)[0]), 'big')
+    except OSError:
+        return None
+    
+    # IPv4-gemappt (::ffff:a.b.c.d) → als IPv4 prüfen
+    if value >> 32 == 0xFFFF:
+        return 4, value & 0xFFFFFFFF
+    return 6, value
+
+def parse_range(entry: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Wandelt einen Listeneintrag (IP oder CIDR) in ein Adressintervall.
+    
+    Args:
+        entry: z.B. "192.0.2.1", "198.51.100.0/24 ; SBL123" oder "2001:db8::/32"
+    
+    Returns:
+        (Version, erste Adresse, letzte Adresse) oder None bei ungültigem Eintrag
+    """
+    token = ENTRY_SEPARATOR_RE.split(entry.strip(), 1)[0]
+    if not token:
+        return None
+    
+    # Schneller Pfad für Einzeladressen (der Großteil von blocklist.de)
+    if '/' not in token:
+        address = parse_address(token)
+        return (address[0], address[1], address[1]) if address else None
+    
+    try:
+        network = ipaddress.ip_network(token, strict=False)
+    except ValueError:
+        return None
+    return network.version, int(network.network_address), int(network.broadcast_address)
+
+def merge_intervals(intervals: List[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    """
+    Sortiert Intervalle und fasst überlappende/angrenzende zusammen.
+    
+    Args:
+        intervals: Liste von (erste, letzte Adresse)
+    
+    Returns:
+        (Startadressen, Endadressen), aufsteigend und disjunkt
+    """
+    starts: List[int] = []
+    ends: List[int] = []
+    for start, end in sorted(intervals):
+        if ends and start <= ends[-1] + 1:
+            if end > ends[-1]:
+                ends[-1] = end
+            continue
+        starts.append(start)
+        ends.append(end)
+    return starts, ends
+
+def merge_intervals_u32(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vektorisierte Variante von merge_intervals für IPv4 (uint64-Arrays).
+    
+    Args:
+        starts: Erste Adressen
+        ends: Letzte Adressen (gleiche Länge)
+    
+    Returns:
+        (Startadressen, Endadressen), aufsteigend und disjunkt
+    """
+    if not len(starts):
+        return starts, ends
+    
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    
+    # Laufendes Maximum der Enden: ein neues Intervall beginnt nur hinter einer Lücke
+    reach = np.maximum.accumulate(ends)
+    new_group = np.empty(len(starts), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = starts[1:] > reach[:-1] + 1
+    
+    first = np.flatnonzero(new_group)
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    return starts[first], reach[last]
+
+def find_interval(starts: Sequence[int], ends: Sequence[int], value: int) -> bool:
+    """True, wenn value in einem der Intervalle liegt (binäre Suche)."""
+    position = bisect.bisect_right(starts, value) - 1
+    return position >= 0 and value <= ends[position]
+
+# ============================================
+# IP Range Index
+# ============================================
+
+class IPRangeIndex:
+    """
+    Menge von IP-Adressen und Netzen mit O(log n)-Lookup.
+    
+    Verwendung:
+        index = IPRangeIndex()
+        index.update(["192.0.2.1", "198.51.100.0/24 ; SBL123", "2001:db8::/32"])
+        index.contains("198.51.100.77")   # True
+    """
+    
+    def __init__(self):
+        self.entries = 0
+        self.invalid = 0
+        
+        # Gesammelte Intervalle bis zum nächsten Aufbau (IPv4: Starts/Enden als array)
+        self._pending = {4: (array('Q'), array('Q')), 6: []}
+        
+        # Zusammengeführte Intervalle als (Starts, Enden) pro Version, wird als
+        # Ganzes ersetzt (Lookups lesen ohne Lock); IPv4 kompakt als array
+        self._ranges = {4: (array('Q'), array('Q')), 6: ([], [])}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        """Anzahl gültiger Einträge (IPs und Netze)."""
+        return self.entries
+    
+    def __contains__(self, ip_address: str) -> bool:
+        return self.contains(ip_address)
+    
+    @property
+    def intervals(self) -> int:
+        """Anzahl zusammengeführter Intervalle."""
+        self._build()
+        return len(self._ranges[4][0]) + len(self._ranges[6][0])
+    
+    def ranges(self, version: int) -> Tuple[Sequence[int], Sequence[int]]:
+        """Zusammengeführte (Starts, Enden) einer IP-Version, z.B. für list_snapshot.py."""
+        self._build()
+        return self._ranges[version]
+    
+    def add(self, entry: str) -> bool:
+        """
+        Fügt eine IP-Adresse oder ein CIDR-Netz hinzu.
+        
+        Returns:
+            bool: False bei ungültigem Eintrag
+        """
+        parsed = parse_range(entry)
+        with self._lock:
+            if parsed is None:
+                self.invalid += 1
+                return False
+            version, start, end = parsed
+            if version == 4:
+                self._pending[4][0].append(start)
+                self._pending[4][1].append(end)
+            else:
+                self._pending[6].append((start, end))
+            self.entries += 1
+            return True
+    
+    def update(self, entries: Iterable[str]) -> int:
+        """
+        Fügt mehrere Einträge hinzu.
+        
+        Returns:
+            int: Anzahl gültiger Einträge
+        """
+        added = 0
+        for entry in entries:
+            if self.add(entry):
+                added += 1
+        return added
+    
+    def _build(self) -> None:
+        """Führt neue Intervalle mit den vorhandenen zusammen (nur bei Änderungen)."""
+        with self._lock:
+            pending_starts, pending_ends = self._pending[4]
+            if pending_starts:
+                current_starts, current_ends = self._ranges[4]
+                starts, ends = merge_intervals_u32(
+                    np.frombuffer(current_starts.tobytes() + pending_starts.tobytes(), dtype=np.uint64),
+                    np.frombuffer(current_ends.tobytes() + pending_ends.tobytes(), dtype=np.uint64)
+                )
+                merged_starts, merged_ends = array('Q'), array('Q')
+                merged_starts.frombytes(starts.astype(np.uint64).tobytes())
+                merged_ends.frombytes(ends.astype(np.uint64).tobytes())
+                self._ranges[4] = (merged_starts, merged_ends)
+                self._pending[4] = (array('Q'), array('Q'))
+                logging.debug(f"IP-Index IPv4: {len(merged_starts)} Intervalle")
+            
+            if self._pending[6]:
+                self._ranges[6] = merge_intervals(self._pending[6] + list(zip(*self._ranges[6])))
+                self._pending[6] = []
+                logging.debug(f"IP-Index IPv6: {len(self._ranges[6][0])} Intervalle")
+    
+    def contains(self, ip_address: str) -> bool:
+        """
+        Prüft, ob eine Adresse in einem der Einträge liegt.
+        
+        Args:
+            ip_address: IPv4- oder IPv6-Adresse
+        
+        Returns:
+            bool: True bei Treffer (ungültige Adressen: False)
+        """
+        address = parse_address(ip_address)
+        if address is None:
+            return False
+        
+        if self._pending[4][0] or self._pending[6]:
+            self._build()
+        
+        version, value = address
+        starts, ends = self._ranges[version]
+        return find_interval(starts, ends, value)
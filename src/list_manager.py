@@ -12,14 +12,22 @@ Datum: 2025-11-20
 
 import os
 import re
+import gzip
+import time
+import hashlib
 import requests
 import logging
 import yaml
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Set, List, Tuple, Optional, Dict
+from typing import Any, Set, List, Tuple, Optional, Dict
 import json
 
+from ip_index import IPRangeIndex
+from domain_index import DomainIndex
+from list_snapshot import ListSnapshot, source_signature
+
 # ============================================
 # Konfiguration
 # ============================================
@@ -31,6 +39,13 @@ UPDATE_INTERVAL_HOURS = 24
 LISTS_DIR = Path(__file__).parent.parent / "data" / "lists"  # User White-/Blacklists
 CACHE_DIR = Path(__file__).parent.parent / "data" / "lists" / "external"  # Externe Listen Cache
 
+# Parallele Downloads externer Listen und Timeout pro Download (Sekunden)
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_TIMEOUT = 30
+
+# Kompilierte externe Listen (siehe list_snapshot.py), liegt im Cache-Verzeichnis
+SNAPSHOT_FILE_NAME = "blacklists.snapshot"
+
 # Pfad zur Blacklist-Provider Konfiguration
 BLACKLIST_SOURCES_FILE = LISTS_DIR / "blacklist_sources.yaml"
 BLACKLIST_SOURCES_EXAMPLE = LISTS_DIR / "blacklist_sources.yaml.example"
@@ -212,12 +227,16 @@ class ListManager:
         LISTS_DIR.mkdir(parents=True, exist_ok=True)  # Für User White-/Blacklists
         self.cache_dir.mkdir(parents=True, exist_ok=True)  # Für externe Listen Cache
         
-        # Listen als Sets für schnelle Lookup-Performance
+        # Lokale Listen als Sets für schnelle Lookup-Performance
         self.whitelist_emails: Set[str] = set()
-        self.whitelist_domains: Set[str] = set()
+        self.whitelist_domains = DomainIndex()  # Nackte Domains exakt, "*.domain" inkl. Subdomains
         self.blacklist_emails: Set[str] = set()
-        self.blacklist_domains: Set[str] = set()
-        self.blacklist_ips: Set[str] = set()
+        self.blacklist_domains = DomainIndex()
+        self.blacklist_ips = IPRangeIndex()  # Einzel-IPs und CIDR-Netze (IPv4/IPv6)
+        
+        # Externe Blacklists als kompilierter, memory-mapped Snapshot
+        self.external: Optional[ListSnapshot] = None
+        self.snapshot_file = self.cache_dir / SNAPSHOT_FILE_NAME
         
         # Metadaten für Updates
         self.metadata_file = self.cache_dir / "metadata.json"
@@ -245,11 +264,12 @@ class ListManager:
         # Externe Blacklists laden/aktualisieren
         self._load_external_blacklists(force_update=force_update)
         
+        blacklist = self._blacklist_counts()
         logging.info(
             f"Listen geladen: "
             f"Whitelist ({len(self.whitelist_emails)} E-Mails, {len(self.whitelist_domains)} Domains), "
-            f"Blacklist ({len(self.blacklist_emails)} E-Mails, {len(self.blacklist_domains)} Domains, "
-            f"{len(self.blacklist_ips)} IPs)"
+            f"Blacklist ({blacklist['emails']} E-Mails, {blacklist['domains']} Domains, "
+            f"{blacklist['ips']} IPs)"
         )
     
     def _load_local_whitelist(self) -> None:
@@ -278,16 +298,7 @@ class ListManager:
                     continue
                 
                 # Prüfe ob E-Mail oder Domain
-                if entry.startswith('@'):
-                    # Domain mit @ angegeben (z.B. @amazon.com) -> als Domain behandeln
-                    domain = entry[1:].strip()
-                    if domain:
-                        if ' ' in domain:
-                            print(f"⚠️  Whitelist Zeile {line_num}: Domain darf keine Leerzeichen enthalten: {domain}")
-                            invalid_count += 1
-                            continue
-                        self.whitelist_domains.add(domain.lower())
-                elif '@' in entry:
+                if '@' in entry and not entry.startswith('@'):
                     # E-Mail Adresse
                     if entry.count('@') != 1:
                         print(f"⚠️  Whitelist Zeile {line_num}: Ungültige E-Mail (mehrere @): {entry}")
@@ -296,13 +307,17 @@ class ListManager:
                         continue
                     self.whitelist_emails.add(entry.lower())
                 else:
-                    # Domain (ohne @)
+                    # Domain: "example.com"/"@example.com"/"=example.com" (nur exakt diese Domain,
+                    # wie bisher) oder "*.example.com" (inkl. Subdomains, nur ausdrücklich)
                     if ' ' in entry:
                         print(f"⚠️  Whitelist Zeile {line_num}: Domain darf keine Leerzeichen enthalten: {entry}")
                         logging.warning(f"Whitelist Zeile {line_num}: Ungültige Domain: {entry}")
                         invalid_count += 1
                         continue
-                    self.whitelist_domains.add(entry.lower())
+                    if not self.whitelist_domains.add_entry(entry, bare_exact=True):
+                        print(f"⚠️  Whitelist Zeile {line_num}: Leere Domain: {entry}")
+                        invalid_count += 1
+                        continue
             
             valid_count = len(entries) - invalid_count
             if invalid_count > 0:
@@ -343,7 +358,7 @@ class ListManager:
                     continue
                 
                 # Prüfe ob E-Mail oder Domain
-                if '@' in entry:
+                if '@' in entry and not entry.startswith('@'):
                     # E-Mail Adresse
                     if entry.count('@') != 1:
                         print(f"⚠️  Blacklist Zeile {line_num}: Ungültige E-Mail (mehrere @): {entry}")
@@ -352,13 +367,17 @@ class ListManager:
                         continue
                     self.blacklist_emails.add(entry.lower())
                 else:
-                    # Domain
+                    # Domain: "example.com", "@example.com", "*.example.com" (inkl. Subdomains)
+                    # oder "=example.com" (nur exakt diese Domain)
                     if ' ' in entry:
                         print(f"⚠️  Blacklist Zeile {line_num}: Domain darf keine Leerzeichen enthalten: {entry}")
                         logging.warning(f"Blacklist Zeile {line_num}: Ungültige Domain: {entry}")
                         invalid_count += 1
                         continue
-                    self.blacklist_domains.add(entry.lower())
+                    if not self.blacklist_domains.add_entry(entry):
+                        print(f"⚠️  Blacklist Zeile {line_num}: Leere Domain: {entry}")
+                        invalid_count += 1
+                        continue
             
             valid_count = len(entries) - invalid_count
             if invalid_count > 0:
@@ -392,82 +411,269 @@ class ListManager:
         
         print(f"   🌐 Prüfe externe Blacklists ({len(enabled_sources)} Quellen aktiviert, {len(BLACKLIST_SOURCES) - len(enabled_sources)} deaktiviert)...")
         
+        # Unkomprimierte Caches älterer Versionen übernehmen (kein erneuter Download)
+        migrated = [name for name in enabled_sources if self._migrate_legacy_cache(name)]
+        if migrated:
+            self._save_metadata()
+        
+        # Quellen mit abgelaufenem Cache parallel aktualisieren
+        due = {}
         for source_name, source_config in enabled_sources.items():
-            cache_file = self.cache_dir / f"{source_name}.txt"
-            
-            # Prüfe ob Update nötig ist
             if not force_update and self._is_cache_valid(source_name):
                 cache_age = self._get_cache_age(source_name)
                 print(f"      ✅ {source_config['description']}: Cache gültig (vor {cache_age} aktualisiert)")
-                logging.info(f"Cache für {source_name} ist aktuell, lade aus Cache...")
-                self._load_from_cache(cache_file, source_config['type'])
+                logging.info(f"Cache für {source_name} ist aktuell")
                 continue
-            
-            # Download externe Liste
-            try:
-                print(f"      ⏳ {source_config['description']}: Lade von {source_config['url']}...")
-                logging.info(f"Lade externe Liste: {source_config['description']}")
-                response = requests.get(source_config['url'], timeout=30)
-                response.raise_for_status()
-                
-                # Speichere im Cache
-                cache_file.write_text(response.text, encoding='utf-8')
-                
-                # Parse und füge zu Blacklist hinzu
-                entries_count_before = len(self.blacklist_ips) + len(self.blacklist_domains)
-                self._load_from_cache(cache_file, source_config['type'])
-                entries_count_after = len(self.blacklist_ips) + len(self.blacklist_domains)
-                new_entries = entries_count_after - entries_count_before
-                
-                # Update Metadaten
-                self.metadata[source_name] = {
-                    "last_update": datetime.now().isoformat(),
-                    "url": source_config['url'],
-                    "type": source_config['type']
+            due[source_name] = source_config
+        
+        if due:
+            print(f"      ⏳ Lade {len(due)} Liste(n) parallel...")
+            with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(due))) as executor:
+                futures = {
+                    executor.submit(self._download_source, source_name, source_config, force_update): source_name
+                    for source_name, source_config in due.items()
                 }
-                self._save_metadata()
-                
-                print(f"      ✅ {source_config['description']}: {new_entries} Einträge hinzugefügt")
-                logging.info(f"Externe Liste {source_name} erfolgreich geladen ({new_entries} neue Einträge)")
-                
-            except requests.RequestException as e:
-                logging.error(f"Fehler beim Laden von {source_name}: {e}")
-                # Versuche aus Cache zu laden falls vorhanden
-                if cache_file.exists():
-                    print(f"      ⚠️  {source_config['description']}: Download fehlgeschlagen, verwende Cache")
-                    logging.warning(f"Verwende alten Cache für {source_name}")
-                    self._load_from_cache(cache_file, source_config['type'])
-                else:
-                    print(f"      ❌ {source_config['description']}: Download fehlgeschlagen, kein Cache verfügbar")
+                for future in as_completed(futures):
+                    source_name = futures[future]
+                    self._record_download(source_name, due[source_name], future)
+            self._save_metadata()
+        
+        self._load_snapshot(enabled_sources)
+    
+    def _cache_path(self, source_name: str) -> Path:
+        """Gzip-komprimierte Cache-Datei einer Quelle."""
+        return self.cache_dir / f"{source_name}.txt.gz"
+    
+    def _migrate_legacy_cache(self, source_name: str) -> bool:
+        """
+        Komprimiert einen unkomprimierten Cache (<Quelle>.txt) älterer Versionen.
+        
+        Ohne Übernahme würde jede Quelle nach dem Update als fehlend gelten und
+        vollständig neu geladen; bei fehlgeschlagenem Download fehlte sie im Snapshot.
+        
+        Args:
+            source_name: Name der Quelle
+        
+        Returns:
+            bool: True wenn ein Cache übernommen wurde
+        """
+        legacy_file = self.cache_dir / f"{source_name}.txt"
+        cache_file = self._cache_path(source_name)
+        if not legacy_file.exists() or cache_file.exists():
+            return False
+        
+        try:
+            content = legacy_file.read_bytes()
+            temp_file = cache_file.with_name(f"{cache_file.name}.tmp")
+            with gzip.open(temp_file, 'wb', compresslevel=6) as f:
+                f.write(content)
+            os.replace(temp_file, cache_file)
+            legacy_file.unlink()
+        except OSError as e:
+            logging.warning(f"Alter Cache {legacy_file.name} konnte nicht übernommen werden: {e}")
+            return False
+        
+        # Prüfsumme ergänzen, damit ein unveränderter Download den Snapshot nicht ungültig macht
+        if source_name in self.metadata:
+            self.metadata[source_name].setdefault('sha256', hashlib.sha256(content).hexdigest())
+        logging.info(f"Alter Cache übernommen: {legacy_file.name} → {cache_file.name}")
+        return True
+    
+    def _download_source(self, source_name: str, source_config: dict, force_update: bool = False) -> Dict[str, Any]:
+        """
+        Lädt eine externe Liste (läuft im Download-Thread, ändert keine Metadaten).
+        
+        Mit vorhandenem Cache wird bedingt angefragt (If-None-Match/If-Modified-Since
+        aus metadata.json); antwortet der Server mit 304, bleibt die Cache-Datei
+        unverändert und der Snapshot gültig. Die Übertragung erfolgt gzip-komprimiert,
+        gespeichert wird die Liste ebenfalls gzip-komprimiert.
+        
+        Args:
+            source_name: Name der Quelle
+            source_config: Konfiguration aus blacklist_sources.yaml
+            force_update: Ohne bedingte Anfrage laden
+        
+        Returns:
+            Dict: status ('updated', 'unchanged', 'not_modified'), etag, last_modified,
+                  sha256, bytes (unkomprimiert), stored (Dateigröße)
+        
+        Raises:
+            requests.RequestException: Download fehlgeschlagen
+            OSError: Cache-Datei nicht schreibbar
+        """
+        cache_file = self._cache_path(source_name)
+        previous = self.metadata.get(source_name, {})
+        headers = {'Accept-Encoding': 'gzip'}
+        
+        # Bedingte Anfrage nur, wenn der Cache zur selben URL gehört
+        conditional = not force_update and cache_file.exists() and previous.get('url') == source_config['url']
+        if conditional and previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if conditional and previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+        
+        logging.info(f"Lade externe Liste: {source_config['description']} (bedingt: {conditional})")
+        response = requests.get(source_config['url'], headers=headers, timeout=DOWNLOAD_TIMEOUT)
+        
+        if response.status_code == 304 and conditional:
+            return {
+                'status': 'not_modified',
+                'etag': response.headers.get('ETag', previous.get('etag')),
+                'last_modified': response.headers.get('Last-Modified', previous.get('last_modified')),
+                'sha256': previous.get('sha256'),
+                'bytes': 0,
+                'stored': cache_file.stat().st_size
+            }
+        response.raise_for_status()
+        
+        # requests dekomprimiert die gzip-Übertragung bereits
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        
+        # Server ohne 304-Unterstützung: gleichen Inhalt nicht neu schreiben (Snapshot bleibt gültig)
+        if cache_file.exists() and digest == previous.get('sha256'):
+            status = 'unchanged'
+        else:
+            temp_file = cache_file.with_name(f"{cache_file.name}.tmp")
+            with gzip.open(temp_file, 'wb', compresslevel=6) as f:
+                f.write(content)
+            os.replace(temp_file, cache_file)
+            status = 'updated'
+            
+            # Unkomprimierten Cache älterer Versionen entfernen
+            legacy_file = self.cache_dir / f"{source_name}.txt"
+            if legacy_file.exists():
+                legacy_file.unlink()
+        
+        return {
+            'status': status,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': digest,
+            'bytes': len(content),
+            'stored': cache_file.stat().st_size
+        }
     
-    def _load_from_cache(self, cache_file: Path, list_type: str) -> None:
+    def _record_download(self, source_name: str, source_config: dict, future: Future) -> None:
         """
-        Lädt Liste aus Cache-Datei.
+        Wertet einen abgeschlossenen Download aus (Metadaten und Ausgabe).
+        
+        Args:
+            source_name: Name der Quelle
+            source_config: Konfiguration aus blacklist_sources.yaml
+            future: Future von _download_source
+        """
+        description = source_config['description']
+        try:
+            result = future.result()
+        except (requests.RequestException, OSError) as e:
+            logging.error(f"Fehler beim Laden von {source_name}: {e}")
+            # Alter Cache fließt weiter in den Snapshot ein
+            if self._cache_path(source_name).exists():
+                print(f"      ⚠️  {description}: Download fehlgeschlagen, verwende Cache")
+                logging.warning(f"Verwende alten Cache für {source_name}")
+            else:
+                print(f"      ❌ {description}: Download fehlgeschlagen, kein Cache verfügbar")
+            return
+        
+        # Update Metadaten (gespeichert nach allen Downloads)
+        self.metadata[source_name] = {
+            "last_update": datetime.now().isoformat(),
+            "url": source_config['url'],
+            "type": source_config['type'],
+            "etag": result['etag'],
+            "last_modified": result['last_modified'],
+            "sha256": result['sha256']
+        }
+        
+        if result['status'] == 'not_modified':
+            print(f"      ✅ {description}: Unverändert (304 Not Modified)")
+        elif result['status'] == 'unchanged':
+            print(f"      ✅ {description}: Unverändert (gleicher Inhalt)")
+        else:
+            print(
+                f"      ✅ {description}: Aktualisiert ({result['bytes'] / 1024:.0f} KB, "
+                f"gespeichert {result['stored'] / 1024:.0f} KB gzip)"
+            )
+        logging.info(f"Externe Liste {source_name}: {result['status']}")
+    
+    def _load_snapshot(self, enabled_sources: Dict[str, dict]) -> None:
+        """
+        Blendet den Snapshot der externen Listen ein oder kompiliert ihn neu.
+        
+        Der Snapshot ist gültig, solange sich keine Cache-Datei geändert hat
+        (Typ, Größe, mtime) und keine Quelle hinzugekommen oder weggefallen ist.
+        
+        Args:
+            enabled_sources: Aktivierte Quellen aus blacklist_sources.yaml
+        """
+        sources = {
+            name: (self._cache_path(name), config['type'])
+            for name, config in enabled_sources.items()
+        }
+        signature = source_signature(sources)
+        started = time.monotonic()
+        
+        snapshot = ListSnapshot.load(self.snapshot_file, signature)
+        if snapshot is not None:
+            counts = snapshot.counts
+            print(
+                f"      ⚡ Snapshot geladen: {counts['ips']} IPs, {counts['domains']} Domains, "
+                f"{counts['emails']} E-Mails ({(time.monotonic() - started) * 1000:.0f} ms)"
+            )
+            logging.info(f"Listen-Snapshot eingeblendet: {self.snapshot_file}")
+        else:
+            # Alle gecachten Listen parsen und neu kompilieren
+            staged = {'ips': IPRangeIndex(), 'domains': DomainIndex(), 'emails': set()}
+            for name in signature:
+                cache_file, list_type = sources[name]
+                added = self._load_from_cache(cache_file, list_type, staged)
+                print(f"      📄 {enabled_sources[name]['description']}: {added} Einträge")
+            
+            snapshot = ListSnapshot.compile(
+                self.snapshot_file, signature, staged['ips'], staged['domains'].suffixes, staged['emails']
+            )
+            print(
+                f"      💾 Snapshot kompiliert: {snapshot.counts['ips']} IPs, {snapshot.counts['domains']} Domains, "
+                f"{snapshot.counts['emails']} E-Mails ({time.monotonic() - started:.1f}s)"
+            )
+            logging.info(f"Listen-Snapshot kompiliert: {self.snapshot_file} (memory-mapped: {snapshot.mapped})")
+        
+        if self.external is not None:
+            self.external.close()
+        self.external = snapshot
+    
+    def _load_from_cache(self, cache_file: Path, list_type: str, staged: dict) -> int:
+        """
+        Lädt Liste aus Cache-Datei in die Zwischenablage für den Snapshot.
         
         Args:
             cache_file: Pfad zur Cache-Datei
             list_type: Typ der Liste (ip, domain, ip_cidr, email)
+            staged: {'ips': IPRangeIndex, 'domains': DomainIndex, 'emails': Set[str]}
+        
+        Returns:
+            int: Anzahl gültiger Einträge
         """
         if not cache_file.exists():
-            return
+            return 0
         
         entries = self._parse_list_file(cache_file)
         
-        if list_type == "ip":
-            self.blacklist_ips.update(entries)
+        if list_type in ("ip", "ip_cidr"):
+            # Einzel-IPs und CIDR-Netze (z.B. "192.168.1.0/24 ; SBL123") im selben Intervall-Index,
+            # Spamhaus-Kommentare beginnen mit ";"
+            entries = [entry for entry in entries if not entry.startswith(';')]
+            added = staged['ips'].update(entries)
+            if added < len(entries):
+                logging.warning(f"{cache_file.name}: {len(entries) - added} ungültige IP-Einträge übersprungen")
+            return added
         elif list_type == "domain":
-            self.blacklist_domains.update(entry.lower() for entry in entries)
+            # Externe Domain-Listen decken auch Subdomains ab
+            staged['domains'].update(entries)
         elif list_type == "email":
-            self.blacklist_emails.update(entry.lower() for entry in entries)
-        elif list_type == "ip_cidr":
-            # Für CIDR-Blöcke extrahieren wir IPs (vereinfacht)
-            for entry in entries:
-                # Extrahiere IP aus CIDR-Notation (z.B. "192.168.1.0/24")
-                if '/' in entry:
-                    ip = entry.split('/')[0]
-                    self.blacklist_ips.add(ip)
-                else:
-                    self.blacklist_ips.add(entry)
+            staged['emails'].update(entry.lower() for entry in entries)
+        return len(entries)
     
     def _parse_list_file(self, file_path: Path) -> List[str]:
         """
@@ -480,7 +686,11 @@ class ListManager:
             List[str]: Gereinigte Einträge (ohne Kommentare, Leerzeilen)
         """
         try:
-            content = file_path.read_text(encoding='utf-8')
+            if file_path.suffix == '.gz':
+                with gzip.open(file_path, 'rt', encoding='utf-8', errors='replace') as f:
+                    content = f.read()
+            else:
+                content = file_path.read_text(encoding='utf-8')
             entries = []
             
             for line in content.splitlines():
@@ -506,6 +716,10 @@ class ListManager:
         Priorität:
         1. Whitelist (E-Mail oder Domain) → kein Spam
         2. Blacklist (E-Mail oder Domain) → Spam
+        
+        Blacklist-Domains gelten auch für Subdomains (außer "=domain"),
+        z.B. trifft "spammer.com" auch "mail.spammer.com". Whitelist-Domains
+        gelten nur mit "*.domain" für Subdomains.
         3. None → unbekannt, LLM-Prüfung nötig
         
         Args:
@@ -528,25 +742,36 @@ class ListManager:
             logging.info(f"✅ E-Mail auf Whitelist: {email_address}")
             return False, f"Whitelist: {email_address}"
         
-        if domain and domain in self.whitelist_domains:
-            logging.info(f"✅ Domain auf Whitelist: {domain}")
-            return False, f"Whitelist: @{domain}"
+        matched = self.whitelist_domains.match(domain) if domain else None
+        if matched:
+            logging.info(f"✅ Domain auf Whitelist: {domain} (Eintrag: {matched})")
+            return False, f"Whitelist: @{domain}{self._suffix_note(domain, matched)}"
         
-        # 2. Prüfe Blacklist
-        if email_lower in self.blacklist_emails:
+        # 2. Prüfe Blacklist (lokal, dann externe Listen)
+        if email_lower in self.blacklist_emails or (
+            self.external is not None and self.external.contains_email(email_lower)
+        ):
             logging.info(f"🚫 E-Mail auf Blacklist: {email_address}")
             return True, f"Blacklist: {email_address}"
         
-        if domain and domain in self.blacklist_domains:
-            logging.info(f"🚫 Domain auf Blacklist: {domain}")
-            return True, f"Blacklist: @{domain}"
+        matched = self.blacklist_domains.match(domain) if domain else None
+        if not matched and domain and self.external is not None:
+            matched = self.external.match_domain(domain)
+        if matched:
+            logging.info(f"🚫 Domain auf Blacklist: {domain} (Eintrag: {matched})")
+            return True, f"Blacklist: @{domain}{self._suffix_note(domain, matched)}"
         
         # 3. Nicht in Listen gefunden
         return None, None
     
+    @staticmethod
+    def _suffix_note(domain: str, matched: str) -> str:
+        """Zusatz für den Grund, wenn eine übergeordnete Domain getroffen wurde."""
+        return f" (via {matched})" if matched not in (domain, f"={domain}") else ""
+    
     def check_ip(self, ip_address: str) -> Tuple[bool, Optional[str]]:
         """
-        Prüft IP-Adresse gegen Blacklist.
+        Prüft IP-Adresse gegen Blacklist (Einzel-IPs und CIDR-Netze, IPv4/IPv6).
         
         Args:
             ip_address: Zu prüfende IP-Adresse
@@ -559,7 +784,9 @@ class ListManager:
         
         ip_clean = ip_address.strip()
         
-        if ip_clean in self.blacklist_ips:
+        if self.blacklist_ips.contains(ip_clean) or (
+            self.external is not None and self.external.contains_ip(ip_clean)
+        ):
             logging.info(f"🚫 IP auf Blacklist: {ip_address}")
             return True, f"Blacklist IP: {ip_address}"
         
@@ -598,7 +825,7 @@ class ListManager:
         Returns:
             bool: True wenn Cache gültig (innerhalb Update-Intervall)
         """
-        if source_name not in self.metadata:
+        if source_name not in self.metadata or not self._cache_path(source_name).exists():
             return False
         
         try:
@@ -641,6 +868,15 @@ class ListManager:
     # Statistiken & Info
     # ============================================
     
+    def _blacklist_counts(self) -> Dict[str, int]:
+        """Anzahl Blacklist-Einträge (lokal + Snapshot der externen Listen)."""
+        external = self.external.counts if self.external is not None else {}
+        return {
+            "emails": len(self.blacklist_emails) + external.get('emails', 0),
+            "domains": len(self.blacklist_domains) + external.get('domains', 0),
+            "ips": len(self.blacklist_ips) + external.get('ips', 0)
+        }
+    
     def get_stats(self) -> dict:
         """
         Gibt Statistiken über geladene Listen zurück.
@@ -648,6 +884,7 @@ class ListManager:
         Returns:
             dict: Statistiken (Anzahl Einträge, letzte Updates etc.)
         """
+        blacklist = self._blacklist_counts()
         return {
             "whitelist": {
                 "emails": len(self.whitelist_emails),
@@ -655,14 +892,13 @@ class ListManager:
                 "total": len(self.whitelist_emails) + len(self.whitelist_domains)
             },
             "blacklist": {
-                "emails": len(self.blacklist_emails),
-                "domains": len(self.blacklist_domains),
-                "ips": len(self.blacklist_ips),
-                "total": len(self.blacklist_emails) + len(self.blacklist_domains) + len(self.blacklist_ips)
+                **blacklist,
+                "total": sum(blacklist.values())
             },
             "cache": {
                 "directory": str(self.cache_dir),
                 "sources": list(self.metadata.keys()),
+                "snapshot": self.external.header.get('created') if self.external is not None else None,
                 "last_updates": {
                     name: data.get('last_update', 'unknown')
                     for name, data in self.metadata.items()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Listen-Snapshot für Ollama Spam Guard
+Kompilierte, memory-mapped Binärdatei aller externen Blacklists
+
+Ohne Snapshot wird bei jedem Start jede gecachte Liste (blocklist.de,
+Firebog, ...) als Text gelesen, zerlegt und in Python-Sets überführt. Das
+kostet Sekunden und Hunderte MB Heap. Stattdessen werden die Listen nach
+einem Update einmal kompiliert:
+
+- IPv4: zusammengeführte Intervalle als sortierte uint64-Arrays (Start/Ende)
+- IPv6: zusammengeführte Intervalle als sortierte 16-Byte-Werte (big-endian)
+- Domains und E-Mails: sortierte 64-Bit-Hashes (BLAKE2b), Lookup per
+  binärer Suche; Domains werden wie im DomainIndex über ihre Label-Suffixe
+  geprüft (Fehltreffer-Wahrscheinlichkeit ~ Einträge / 2^64, vernachlässigbar)
+
+Dateiformat (Version SNAPSHOT_VERSION):
+
+    MAGIC (8 Bytes) | Header-Länge (uint32 LE) | Header (JSON) | Arrays (64-Byte-ausgerichtet)
+
+Der Header enthält Format-Version, Signatur der Quellen (Typ, Größe und
+mtime jeder Cache-Datei) sowie Offset und Länge jedes Arrays. Passt die
+Signatur nicht mehr (Liste aktualisiert, Quelle hinzugefügt/entfernt), wird
+neu kompiliert. Beim Start wird die Datei nur per mmap eingeblendet; die
+Arrays sind Sichten auf die gemappten Seiten (kaum Heap-Verbrauch).
+
+Autor: Ollama Spam Guard
+"""
+
+import os
+import json
+import mmap
+import struct
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ip_index import IPRangeIndex, parse_address
+from domain_index import domain_suffixes, normalize_domain
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Dateikennung und Format-Version (bei Formatänderungen erhöhen)
+SNAPSHOT_MAGIC = b'OSGLIST\x00'
+SNAPSHOT_VERSION = 1
+
+# Ausrichtung der Arrays in der Datei (Bytes)
+ARRAY_ALIGNMENT = 64
+
+# Arrays im Snapshot und ihre Datentypen
+ARRAY_DTYPES = {
+    'ipv4_starts': '<u8',
+    'ipv4_ends': '<u8',
+    'ipv6_starts': 'S16',
+    'ipv6_ends': 'S16',
+    'domains': '<u8',
+    'emails': '<u8'
+}
+
+# Länge von MAGIC + Header-Länge
+PREAMBLE = struct.Struct('<8sI')
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def entry_hash(text: str) -> int:
+    """64-Bit-Hash eines Eintrags (Domain oder E-Mail, bereits normalisiert)."""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def source_signature(sources: Dict[str, Tuple[Path, str]]) -> Dict[str, List[Any]]:
+    """
+    Signatur der Cache-Dateien: ändert sich bei jedem Update einer Quelle.
+    
+    Args:
+        sources: Name → (Cache-Datei, Listentyp)
+    
+    Returns:
+        Dict: Name → [Typ, Größe, mtime_ns] (fehlende Cache-Dateien entfallen)
+    """
+    signature: Dict[str, List[Any]] = {}
+    for name, (cache_file, list_type) in sorted(sources.items()):
+        try:
+            stat = cache_file.stat()
+        except OSError:
+            continue
+        signature[name] = [list_type, stat.st_size, stat.st_mtime_ns]
+    return signature
+
+def _align(offset: int) -> int:
+    """Rundet auf die nächste Array-Ausrichtung auf."""
+    return -(-offset // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+
+def _sorted_hashes(entries: Iterable[str]) -> np.ndarray:
+    """Sortierte, eindeutige Hashes der Einträge."""
+    return np.unique(np.fromiter((entry_hash(entry) for entry in entries), dtype=np.uint64))
+
+def _contains_hash(hashes: np.ndarray, value: int) -> bool:
+    """Binäre Suche nach einem Hash."""
+    key = np.uint64(value)
+    position = int(np.searchsorted(hashes, key))
+    return position < len(hashes) and hashes[position] == key
+
+def build_arrays(ips: IPRangeIndex, domains: Iterable[str], emails: Iterable[str]) -> Dict[str, np.ndarray]:
+    """
+    Wandelt geparste Listen in Snapshot-Arrays.
+    
+    Args:
+        ips: IP-Index mit allen IPs/Netzen der externen Listen
+        domains: Normalisierte Domains (gelten inkl. Subdomains)
+        emails: Kleingeschriebene E-Mail-Adressen
+    
+    Returns:
+        Dict: Array-Name → NumPy-Array (siehe ARRAY_DTYPES)
+    """
+    starts4, ends4 = ips.ranges(4)
+    starts6, ends6 = ips.ranges(6)
+    return {
+        'ipv4_starts': np.frombuffer(bytes(starts4), dtype=np.uint64).astype('<u8'),
+        'ipv4_ends': np.frombuffer(bytes(ends4), dtype=np.uint64).astype('<u8'),
+        'ipv6_starts': np.array([value.to_bytes(16, 'big') for value in starts6], dtype='S16'),
+        'ipv6_ends': np.array([value.to_bytes(16, 'big') for value in ends6], dtype='S16'),
+        'domains': _sorted_hashes(domains).astype('<u8'),
+        'emails': _sorted_hashes(emails).astype('<u8')
+    }
+
+# ============================================
+# List Snapshot
+# ============================================
+
+class ListSnapshot:
+    """
+    Kompilierte externe Blacklists (memory-mapped oder im Speicher).
+    
+    Verwendung:
+        snapshot = ListSnapshot.load(path, signature)
+        if snapshot is None:
+            snapshot = ListSnapshot.compile(path, signature, ip_index, domains, emails)
+        snapshot.contains_ip("192.0.2.1")
+        snapshot.match_domain("mail.spammer.com")   # "spammer.com"
+    """
+    
+    def __init__(self, arrays: Dict[str, np.ndarray], header: Dict[str, Any], mapping: Optional[mmap.mmap] = None):
+        """
+        Args:
+            arrays: Array-Name → Array (siehe ARRAY_DTYPES)
+            header: Snapshot-Header (Version, Quellen, Anzahl Einträge)
+            mapping: Eingeblendete Datei (None = Arrays im Speicher)
+        """
+        self.arrays = arrays
+        self.header = header
+        self.counts: Dict[str, int] = header.get('counts', {})
+        self._mapping = mapping
+    
+    @property
+    def mapped(self) -> bool:
+        """True, wenn die Arrays aus der Snapshot-Datei eingeblendet sind."""
+        return self._mapping is not None
+    
+    # ============================================
+    # Laden und Kompilieren
+    # ============================================
+    
+    @classmethod
+    def load(cls, path: Path, signature: Dict[str, List[Any]]) -> Optional['ListSnapshot']:
+        """
+        Blendet einen Snapshot ein, falls er zur Signatur der Quellen passt.
+        
+        Args:
+            path: Snapshot-Datei
+            signature: Aktuelle Signatur (siehe source_signature)
+        
+        Returns:
+            ListSnapshot oder None (fehlt, veraltet, andere Version, beschädigt)
+        """
+        try:
+            with open(path, 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        
+        try:
+            magic, header_length = PREAMBLE.unpack_from(mapping, 0)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError("keine Snapshot-Datei")
+            header = json.loads(mapping[PREAMBLE.size:PREAMBLE.size + header_length].decode('utf-8'))
+            if header.get('version') != SNAPSHOT_VERSION:
+                raise ValueError(f"Format-Version {header.get('version')} statt {SNAPSHOT_VERSION}")
+            if header.get('sources') != signature:
+                logging.info(f"Listen-Snapshot veraltet (Quellen geändert): {path}")
+                mapping.close()
+                return None
+            
+            data_offset = _align(PREAMBLE.size + header_length)
+            arrays: Dict[str, np.ndarray] = {}
+            for name, dtype in ARRAY_DTYPES.items():
+                spec = header['arrays'][name]
+                if spec['count'] == 0:
+                    arrays[name] = np.empty(0, dtype=dtype)
+                    continue
+                arrays[name] = np.frombuffer(
+                    mapping, dtype=dtype, count=spec['count'], offset=data_offset + spec['offset']
+                )
+        except (ValueError, KeyError, TypeError, struct.error) as e:
+            logging.warning(f"Listen-Snapshot unbrauchbar ({e}), wird neu kompiliert: {path}")
+            mapping.close()
+            return None
+        
+        return cls(arrays, header, mapping)
+    
+    @classmethod
+    def compile(cls, path: Path, signature: Dict[str, List[Any]], ips: IPRangeIndex,
+                domains: Iterable[str], emails: Iterable[str]) -> 'ListSnapshot':
+        """
+        Kompiliert die geparsten Listen, schreibt den Snapshot und blendet ihn ein.
+        
+        Kann die Datei nicht geschrieben werden, bleiben die Arrays im Speicher.
+        
+        Args:
+            path: Snapshot-Datei (wird atomar ersetzt)
+            signature: Signatur der Quellen (siehe source_signature)
+            ips: IP-Index der externen Listen
+            domains: Domains der externen Listen (inkl. Subdomains)
+            emails: E-Mail-Adressen der externen Listen
+        
+        Returns:
+            ListSnapshot
+        """
+        domains = list(domains)
+        emails = list(emails)
+        arrays = build_arrays(ips, domains, emails)
+        
+        layout: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        for name, dtype in ARRAY_DTYPES.items():
+            layout[name] = {'dtype': dtype, 'offset': offset, 'count': len(arrays[name])}
+            offset = _align(offset + arrays[name].nbytes)
+        
+        header = {
+            'version': SNAPSHOT_VERSION,
+            'created': datetime.now().isoformat(),
+            'sources': signature,
+            'counts': {'ips': len(ips), 'domains': len(domains), 'emails': len(emails)},
+            'arrays': layout
+        }
+        
+        try:
+            cls._write(path, header, arrays)
+        except OSError as e:
+            logging.warning(f"Listen-Snapshot konnte nicht geschrieben werden ({e}), nutze Arrays im Speicher")
+            return cls(arrays, header)
+        
+        return cls.load(path, signature) or cls(arrays, header)
+    
+    @staticmethod
+    def _write(path: Path, header: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+        """Schreibt Header und Arrays in eine temporäre Datei und ersetzt den Snapshot atomar."""
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        data_offset = _align(PREAMBLE.size + len(header_bytes))
+        
+        temp_path = path.with_name(f"{path.name}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(PREAMBLE.pack(SNAPSHOT_MAGIC, len(header_bytes)))
+            f.write(header_bytes)
+            for name in ARRAY_DTYPES:
+                f.write(b'\0' * (data_offset + header['arrays'][name]['offset'] - f.tell()))
+                f.write(arrays[name].tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    
+    def close(self) -> None:
+        """Gibt die eingeblendete Datei frei (Arrays danach nicht mehr verwenden)."""
+        if self._mapping is not None:
+            self.arrays = {name: np.empty(0, dtype=dtype) for name, dtype in ARRAY_DTYPES.items()}
+            try:
+                self._mapping.close()
+            except BufferError:
+                # Noch referenzierte Sichten: Freigabe übernimmt der Garbage Collector
+                pass
+            self._mapping = None
+    
+    # ============================================
+    # Lookups
+    # ============================================
+    
+    def contains_ip(self, ip_address: str) -> bool:
+        """True, wenn die Adresse in einer IP/einem Netz der Listen liegt."""
+        address = parse_address(ip_address)
+        if address is None:
+            return False
+        
+        version, value = address
+        if version == 4:
+            starts, ends = self.arrays['ipv4_starts'], self.arrays['ipv4_ends']
+            key = np.uint64(value)
+        else:
+            starts, ends = self.arrays['ipv6_starts'], self.arrays['ipv6_ends']
+            key = np.array(value.to_bytes(16, 'big'), dtype='S16')
+        
+        position = int(np.searchsorted(starts, key, side='right')) - 1
+        return position >= 0 and bool(ends[position] >= key)
+    
+    def match_domain(self, domain: str) -> Optional[str]:
+        """
+        Sucht die spezifischste gelistete Domain (Domain selbst oder übergeordnete).
+        
+        Returns:
+            str: Getroffene Domain, z.B. "spammer.com" für "mail.spammer.com", oder None
+        """
+        domain = normalize_domain(domain)
+        if not domain or not len(self.arrays['domains']):
+            return None
+        
+        for suffix in domain_suffixes(domain):
+            if _contains_hash(self.arrays['domains'], entry_hash(suffix)):
+                return suffix
+        return None
+    
+    def contains_email(self, email_address: str) -> bool:
+        """True, wenn die E-Mail-Adresse gelistet ist."""
+        if not len(self.arrays['emails']):
+            return False
+        return _contains_hash(self.arrays['emails'], entry_hash(email_address.strip().lower()))
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Antwortformat und Auswertung der LLM-Entscheidung für Ollama Spam Guard
+
+Gemeinsam genutzt von Spam-Filter und Benchmark (kein Import von config.py).
+
+- text: Freitext ("SPAM - Begründung"), das erste alleinstehende SPAM/HAM entscheidet
+- json: Strukturierte Ausgabe über Ollamas `format`-Parameter mit JSON-Schema
+  ({"verdict": "SPAM", "confidence": 0.93, "short_reason": "..."}).
+  Weniger generierte Tokens und eindeutige Auswertung ohne Textsuche.
+- batch: K E-Mails in einem Prompt, Antwort als JSON-Array mit einem Objekt
+  pro E-Mail (zusätzlich "index"). System-Prompt und Anweisung fallen nur
+  einmal pro Anfrage an statt einmal pro E-Mail.
+
+Autor: Ollama Spam Guard
+"""
+
+import re
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Unterstützte Ausgabeformate
+OUTPUT_FORMATS = ('text', 'json')
+
+# JSON-Schema für Ollamas `format`-Parameter
+VERDICT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "verdict": {"type": "string", "enum": ["SPAM", "HAM"]},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        "short_reason": {"type": "string", "maxLength": 80}
+    },
+    "required": ["verdict", "confidence", "short_reason"]
+}
+
+# Prompt-Anweisung im JSON-Modus
+JSON_INSTRUCTION = (
+    "Klassifiziere diese E-Mail als SPAM oder HAM. "
+    "Antworte NUR als JSON mit verdict ('SPAM' oder 'HAM'), "
+    "confidence (0.0 bis 1.0) und short_reason (max 10 Wörter).\n\n"
+)
+
+# num_predict im JSON-Modus (reicht für das kompakte Objekt)
+JSON_NUM_PREDICT = 60
+
+# Prompt-Anweisung im Batch-Modus
+BATCH_INSTRUCTION = (
+    "Klassifiziere jede der folgenden E-Mails als SPAM oder HAM. "
+    "Antworte NUR als JSON-Array mit genau einem Objekt pro E-Mail: index (Nummer der E-Mail), "
+    "verdict ('SPAM' oder 'HAM'), confidence (0.0 bis 1.0) und short_reason (max 10 Wörter).\n\n"
+)
+
+# Body-Zeichen pro E-Mail im Batch-Prompt (kürzer als im Einzelmodus)
+BATCH_BODY_CHARS = 500
+
+# Erstes alleinstehendes SPAM/HAM in einer Freitext-Antwort (Groß-/Kleinschreibung egal,
+# Suche auf dem Originaltext, damit match.end() zu dessen Länge passt)
+VERDICT_RE = re.compile(r'\b(SPAM|HAM)\b', re.IGNORECASE)
+
+# ============================================
+# Batch-Prompt
+# ============================================
+
+def batch_schema(count: int) -> Dict[str, Any]:
+    """
+    JSON-Schema für die Batch-Antwort (Array mit genau count Objekten).
+    
+    Args:
+        count: Anzahl E-Mails im Prompt
+    
+    Returns:
+        Dict: Schema für Ollamas `format`-Parameter
+    """
+    item = {
+        "type": "object",
+        "properties": {
+            "index": {"type": "integer", "minimum": 1, "maximum": count},
+            **VERDICT_SCHEMA["properties"]
+        },
+        "required": ["index"] + VERDICT_SCHEMA["required"]
+    }
+    return {"type": "array", "items": item, "minItems": count, "maxItems": count}
+
+def build_batch_prompt(mails: Sequence[Tuple[str, str, str]], body_chars: int = BATCH_BODY_CHARS) -> str:
+    """
+    Baut einen Prompt mit mehreren nummerierten E-Mails.
+    
+    Args:
+        mails: Liste von (sender, subject, body)
+        body_chars: Maximale Body-Länge pro E-Mail
+    
+    Returns:
+        str: Prompt (Nummerierung ab 1)
+    """
+    parts = [
+        f"### E-Mail {number}\n"
+        f"Von: {sender}\n"
+        f"Betreff: {subject}\n"
+        f"Inhalt: {body[:body_chars]}"
+        for number, (sender, subject, body) in enumerate(mails, start=1)
+    ]
+    return BATCH_INSTRUCTION + "\n\n".join(parts)
+
+# ============================================
+# Auswertung
+# ============================================
+
+def find_verdict(text: str) -> Optional[str]:
+    """
+    Sucht das erste alleinstehende SPAM/HAM im Freitext.
+    
+    Args:
+        text: Antworttext des LLM
+    
+    Returns:
+        'SPAM', 'HAM' oder None
+    """
+    match = VERDICT_RE.search(text or '')
+    return match.group(1).upper() if match else None
+
+def parse_json_verdict(text: str) -> Optional[Tuple[bool, float, str]]:
+    """
+    Wertet eine strukturierte JSON-Antwort aus.
+    
+    Args:
+        text: Antworttext des LLM (JSON-Objekt)
+    
+    Returns:
+        (is_spam, confidence, short_reason) oder None bei ungültiger Antwort
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    
+    return _verdict_from_object(data)
+
+def _verdict_from_object(data: Any) -> Optional[Tuple[bool, float, str]]:
+    """Wertet ein einzelnes Verdict-Objekt aus (None bei ungültigem Objekt)."""
+    if not isinstance(data, dict):
+        return None
+    
+    verdict = str(data.get('verdict', '')).strip().upper()
+    if verdict not in ('SPAM', 'HAM'):
+        return None
+    
+    try:
+        confidence = min(1.0, max(0.0, float(data.get('confidence', 0.0))))
+    except (TypeError, ValueError):
+        confidence = 0.0
+    
+    reason = str(data.get('short_reason', '')).replace("\n", " ").strip()
+    return verdict == 'SPAM', confidence, reason
+
+def parse_batch_verdicts(text: str, count: int) -> Optional[List[Tuple[bool, float, str]]]:
+    """
+    Wertet eine Batch-Antwort (JSON-Array) aus.
+    
+    Die Antwort ist nur gültig, wenn jede E-Mail genau ein gültiges
+    Verdict erhält. Fehlt "index", zählt die Position im Array.
+    
+    Args:
+        text: Antworttext des LLM
+        count: Anzahl E-Mails im Prompt
+    
+    Returns:
+        Liste von (is_spam, confidence, short_reason) in Prompt-Reihenfolge
+        oder None bei ungültiger/unvollständiger Antwort
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    
+    # Manche Modelle verpacken das Array in ein Objekt ({"verdicts": [...]})
+    if isinstance(data, dict):
+        lists = [value for value in data.values() if isinstance(value, list)]
+        data = lists[0] if len(lists) == 1 else None
+    
+    if not isinstance(data, list) or len(data) != count:
+        return None
+    
+    results: Dict[int, Tuple[bool, float, str]] = {}
+    for position, item in enumerate(data, start=1):
+        verdict = _verdict_from_object(item)
+        if verdict is None:
+            return None
+        
+        try:
+            index = int(item.get('index', position))
+        except (TypeError, ValueError):
+            return None
+        
+        if not 1 <= index <= count or index in results:
+            return None
+        results[index] = verdict
+    
+    return [results[index] for index in range(1, count + 1)]
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Lokaler Vor-Klassifikator für Ollama Spam Guard
+Multinomialer Naive Bayes über gehashte Token-Features (NumPy)
+
+Jede E-Mail, die auf keiner Liste steht, kostet eine LLM-Anfrage. Der
+Vor-Klassifikator lernt inkrementell aus den bisherigen LLM-Entscheidungen
+(und aus Unspam-Korrekturen) und entscheidet selbst, wenn seine
+Spam-Wahrscheinlichkeit extrem ist (z.B. >= 99.5% oder <= 0.5%).
+
+- Features: Tokens aus Betreff und Body (binär pro E-Mail) plus Absender-Domain,
+  per CRC32 auf N_FEATURES Buckets gehasht (kein Vokabular nötig)
+- Training und Scoring sind über einen Batch von E-Mails vektorisiert
+- Modelldatei (.npz, ~2 MB) lädt in wenigen Millisekunden
+
+Autor: Ollama Spam Guard
+"""
+
+import os
+import zlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from simhash_index import tokenize
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Anzahl Hash-Buckets (2^18 → 2 × 1 MB float32)
+N_FEATURES = 1 << 18
+
+# Laplace-Glättung
+ALPHA = 1.0
+
+# Klassen-Indizes
+HAM, SPAM = 0, 1
+
+# ============================================
+# Features
+# ============================================
+
+def mail_features(sender: str, subject: str, body: str) -> List[int]:
+    """
+    Gehashte Feature-Indizes einer E-Mail (eindeutig, unsortiert).
+    
+    Args:
+        sender: Absender-E-Mail
+        subject: Betreff
+        body: Body-Preview
+    
+    Returns:
+        List[int]: Bucket-Indizes
+    """
+    domain = sender.rsplit('@', 1)[-1].lower() if '@' in sender else ''
+    tokens = set(tokenize(f"{subject} {body}"))
+    tokens.update(f"s:{token}" for token in tokenize(subject))
+    if domain:
+        tokens.add(f"from:{domain}")
+    return [zlib.crc32(token.encode('utf-8')) % N_FEATURES for token in tokens]
+
+def batch_features(mails: Sequence[Tuple[str, str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Features eines Batches als Koordinatenliste (für bincount).
+    
+    Args:
+        mails: Liste von (sender, subject, body)
+    
+    Returns:
+        (doc_index, feature_index): gleich lange int-Arrays
+    """
+    per_mail = [mail_features(*mail) for mail in mails]
+    lengths = np.fromiter((len(features) for features in per_mail), dtype=np.int64, count=len(per_mail))
+    doc_index = np.repeat(np.arange(len(per_mail), dtype=np.int64), lengths)
+    feature_index = np.fromiter(
+        (index for features in per_mail for index in features), dtype=np.int64, count=int(lengths.sum())
+    )
+    return doc_index, feature_index
+
+def new_classifier_stats() -> Dict[str, int]:
+    """Erzeugt leere Klassifikator-Statistik."""
+    return {'scored': 0, 'spam': 0, 'ham': 0, 'trained': 0}
+
+# ============================================
+# Local Classifier
+# ============================================
+
+class LocalClassifier:
+    """
+    Inkrementell trainierter Naive-Bayes-Klassifikator.
+    
+    Verwendung:
+        classifier = LocalClassifier(Path("data/state/local_classifier.npz"))
+        probabilities = classifier.predict_proba([(sender, subject, body), ...])
+        classifier.learn(sender, subject, body, is_spam=True)
+        classifier.train_pending()
+        classifier.save()
+    """
+    
+    def __init__(self, path: Optional[Path] = None, min_docs: int = 100):
+        """
+        Initialisiert den Klassifikator und lädt ein vorhandenes Modell.
+        
+        Args:
+            path: Pfad zur .npz-Datei (None = nur im Speicher)
+            min_docs: Mindestanzahl Trainings-E-Mails pro Klasse, bevor
+                      der Klassifikator als einsatzbereit gilt
+        """
+        self.path = Path(path) if path else None
+        self.min_docs = max(1, min_docs)
+        self.stats = new_classifier_stats()
+        
+        # Zeile 0 = HAM, Zeile 1 = SPAM: Anzahl E-Mails mit Feature (gewichtet)
+        self.feature_counts = np.zeros((2, N_FEATURES), dtype=np.float32)
+        self.doc_counts = np.zeros(2, dtype=np.float64)
+        
+        self._log_ratio_cache: Optional[np.ndarray] = None
+        self._pending: List[Tuple[Tuple[str, str, str], int, float]] = []
+        self._lock = threading.RLock()
+        self._dirty = False
+        
+        self._load()
+    
+    @property
+    def ready(self) -> bool:
+        """True, sobald beide Klassen genug Trainings-E-Mails haben."""
+        return bool(self.doc_counts.min() >= self.min_docs)
+    
+    def _load(self) -> None:
+        """Lädt das Modell aus der .npz-Datei."""
+        if not self.path or not self.path.exists():
+            return
+        
+        try:
+            with np.load(self.path) as data:
+                if data['feature_counts'].shape != self.feature_counts.shape:
+                    logging.warning(f"Lokaler Klassifikator ({self.path}): andere Feature-Anzahl, starte neu")
+                    return
+                self.feature_counts = data['feature_counts'].astype(np.float32, copy=False)
+                self.doc_counts = data['doc_counts'].astype(np.float64, copy=False)
+        except Exception as e:
+            logging.error(f"Fehler beim Laden des lokalen Klassifikators ({self.path}): {e}")
+    
+    def save(self) -> None:
+        """Speichert das Modell atomar (nur bei Änderungen)."""
+        if self.path is None or not self._dirty:
+            return
+        
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+                with open(tmp_path, 'wb') as f:
+                    np.savez(f, feature_counts=self.feature_counts, doc_counts=self.doc_counts)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern des lokalen Klassifikators: {e}")
+    
+    def partial_fit(self, mails: Sequence[Tuple[str, str, str]], labels: Sequence[bool],
+                    weights: Optional[Sequence[float]] = None) -> None:
+        """
+        Trainiert inkrementell mit einem Batch von E-Mails.
+        
+        Args:
+            mails: Liste von (sender, subject, body)
+            labels: True = SPAM, False = HAM
+            weights: Optionale Gewichte pro E-Mail (z.B. höher für Korrekturen)
+        """
+        if not mails:
+            return
+        
+        doc_index, feature_index = batch_features(mails)
+        classes = np.asarray(labels, dtype=bool).astype(np.int64)
+        weights = np.ones(len(mails)) if weights is None else np.asarray(weights, dtype=np.float64)
+        
+        with self._lock:
+            for cls in (HAM, SPAM):
+                selected = classes[doc_index] == cls
+                if not selected.any():
+                    continue
+                self.feature_counts[cls] += np.bincount(
+                    feature_index[selected], weights=weights[doc_index[selected]], minlength=N_FEATURES
+                ).astype(np.float32)
+                self.doc_counts[cls] += weights[classes == cls].sum()
+            
+            self._log_ratio_cache = None
+            self._dirty = True
+            self.stats['trained'] += len(mails)
+    
+    def _log_ratio(self) -> np.ndarray:
+        """log P(Feature | SPAM) - log P(Feature | HAM) pro Bucket (geglättet, gecacht)."""
+        if self._log_ratio_cache is None:
+            totals = self.feature_counts.sum(axis=1, dtype=np.float64) + ALPHA * N_FEATURES
+            log_likelihood = np.log(self.feature_counts + ALPHA) - np.log(totals)[:, None]
+            self._log_ratio_cache = (log_likelihood[SPAM] - log_likelihood[HAM]).astype(np.float32)
+        return self._log_ratio_cache
+    
+    def predict_proba(self, mails: Sequence[Tuple[str, str, str]]) -> np.ndarray:
+        """
+        Spam-Wahrscheinlichkeit für einen Batch von E-Mails.
+        
+        Args:
+            mails: Liste von (sender, subject, body)
+        
+        Returns:
+            np.ndarray: P(SPAM) pro E-Mail (0.5 solange nicht trainiert)
+        """
+        if not mails:
+            return np.zeros(0)
+        
+        with self._lock:
+            if not self.doc_counts.all():
+                return np.full(len(mails), 0.5)
+            
+            doc_index, feature_index = batch_features(mails)
+            log_ratio = self._log_ratio()
+            
+            # Log-Odds = Prior + Summe der Feature-Verhältnisse je E-Mail (bincount statt Schleife)
+            prior = np.log(self.doc_counts[SPAM] / self.doc_counts[HAM])
+            log_odds = prior + np.bincount(
+                doc_index, weights=log_ratio[feature_index], minlength=len(mails)
+            )
+            self.stats['scored'] += len(mails)
+        
+        return 1.0 / (1.0 + np.exp(-np.clip(log_odds, -500, 500)))
+    
+    def learn(self, sender: str, subject: str, body: str, is_spam: bool, weight: float = 1.0) -> None:
+        """
+        Merkt eine Entscheidung für das nächste train_pending() vor (thread-sicher).
+        
+        Args:
+            sender: Absender-E-Mail
+            subject: Betreff
+            body: Body-Preview
+            is_spam: Entscheidung (LLM oder Korrektur)
+            weight: Gewicht im Training
+        """
+        with self._lock:
+            self._pending.append(((sender, subject, body), int(is_spam), weight))
+    
+    def train_pending(self) -> int:
+        """
+        Trainiert alle vorgemerkten Entscheidungen als ein Batch.
+        
+        Returns:
+            int: Anzahl trainierter E-Mails
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        
+        if pending:
+            mails, labels, weights = zip(*pending)
+            self.partial_fit(mails, labels, weights)
+        return len(pending)
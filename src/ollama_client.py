@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Ollama-Client für Ollama Spam Guard
+Wiederverwendbarer HTTP-Client mit Connection-Pool und keep_alive-Steuerung
+
+Statt pro E-Mail eine neue TCP-Verbindung aufzubauen, nutzen Spam-Filter
+und Benchmark eine gemeinsame requests.Session. Jede Anfrage sendet
+keep_alive mit, damit Ollama das Modell zwischen Accounts nicht entlädt.
+Das Modell kann explizit vorgeladen (Warm-up) und wieder entladen werden.
+
+Der Client importiert bewusst nicht config.py, damit ihn auch Skripte ohne
+accounts.yaml (z.B. der Benchmark) nutzen können.
+
+Autor: Ollama Spam Guard
+"""
+
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Standard-Endpoint (wie OLLAMA_URL in config.py)
+DEFAULT_GENERATE_URL = "http://localhost:11434/api/generate"
+
+# Standard-Haltezeit des Modells im Speicher nach der letzten Anfrage
+DEFAULT_KEEP_ALIVE = "30m"
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+def parse_keep_alive(value: Union[str, int, None]) -> Union[str, int, None]:
+    """
+    Normalisiert keep_alive für die Ollama-API.
+    
+    Ollama akzeptiert Dauer-Strings ("30m", "1h") oder Sekunden als Zahl.
+    Reine Zahlen aus .env ("-1", "0", "600") werden daher zu int.
+    
+    Args:
+        value: Wert aus Konfiguration
+    
+    Returns:
+        str, int oder None (leer = Ollama-Standard)
+    """
+    if value is None or isinstance(value, int):
+        return value
+    
+    value = str(value).strip()
+    if not value:
+        return None
+    if value.lstrip('-').isdigit():
+        return int(value)
+    return value
+
+def generate_url_from(url: str) -> str:
+    """
+    Ergänzt den Generate-Endpoint, falls nur die Basis-URL angegeben ist.
+    
+    Args:
+        url: z.B. "http://box1:11434" oder "http://box1:11434/api/generate"
+    
+    Returns:
+        str: z.B. "http://box1:11434/api/generate"
+    """
+    url = url.strip()
+    if '/api/' in url:
+        return url
+    return f"{url.rstrip('/')}/api/generate"
+
+def base_url_from(generate_url: str) -> str:
+    """
+    Leitet die Basis-URL aus dem Generate-Endpoint ab.
+    
+    Args:
+        generate_url: z.B. "http://localhost:11434/api/generate"
+    
+    Returns:
+        str: z.B. "http://localhost:11434"
+    """
+    if '/api/' in generate_url:
+        return generate_url.split('/api/', 1)[0]
+    return generate_url.rstrip('/')
+
+# ============================================
+# Ollama Client
+# ============================================
+
+class OllamaClient:
+    """
+    HTTP-Client für die Ollama-API mit persistenter Session.
+    
+    Verwendung:
+        client = OllamaClient("http://localhost:11434/api/generate", keep_alive="30m")
+        client.preload("qwen2.5:14b-instruct")
+        data = client.generate({"model": "qwen2.5:14b-instruct", "prompt": "...", "stream": False})
+        client.unload("qwen2.5:14b-instruct")
+    """
+    
+    def __init__(self, generate_url: str = DEFAULT_GENERATE_URL,
+                 keep_alive: Union[str, int, None] = DEFAULT_KEEP_ALIVE,
+                 pool_size: int = 4):
+        """
+        Initialisiert Client und Connection-Pool.
+        
+        Args:
+            generate_url: URL des /api/generate-Endpoints
+            keep_alive: Haltezeit des Modells (wird bei jeder Anfrage gesendet)
+            pool_size: Maximale Anzahl offener Verbindungen (>= parallele Anfragen)
+        """
+        self.generate_url = generate_url
+        self.base_url = base_url_from(generate_url)
+        self.keep_alive = parse_keep_alive(keep_alive)
+        
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+        
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0}
+    
+    def _count_connections(self) -> int:
+        """Zählt die bisher aufgebauten TCP-Verbindungen aller Pools."""
+        pools = self._adapter.poolmanager.pools
+        total = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                total += getattr(pool, 'num_connections', 0)
+        return total
+    
+    def _request(self, method: str, url: str, timeout: float,
+                 payload: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """Sendet Anfrage über die Session und zählt sie."""
+        with self._stats_lock:
+            self.stats['requests'] += 1
+        try:
+            response = self.session.request(method, url, json=payload, timeout=timeout)
+            response.raise_for_status()
+            return response
+        except requests.RequestException:
+            with self._stats_lock:
+                self.stats['errors'] += 1
+            raise
+    
+    def generate(self, payload: Dict[str, Any], timeout: float = 120) -> Dict[str, Any]:
+        """
+        Ruft /api/generate auf (keep_alive wird ergänzt, falls nicht gesetzt).
+        
+        Args:
+            payload: Request-Body (model, prompt, options, ...)
+            timeout: Timeout in Sekunden
+        
+        Returns:
+            Dict: JSON-Antwort von Ollama
+        
+        Raises:
+            requests.RequestException: Bei Timeout, Verbindungs- oder HTTP-Fehlern
+        """
+        if self.keep_alive is not None and 'keep_alive' not in payload:
+            payload = {**payload, 'keep_alive': self.keep_alive}
+        
+        return self._request('POST', self.generate_url, timeout, payload).json()
+    
+    def generate_stream(self, payload: Dict[str, Any], timeout: float = 120,
+                        stop: Optional[Callable[[str], bool]] = None) -> Dict[str, Any]:
+        """
+        Ruft /api/generate im Streaming-Modus auf und liest die Antwort stückweise.
+        
+        Liefert stop(text) True, wird die Verbindung geschlossen und Ollama
+        bricht die Generierung ab. Die Verbindung geht dabei nicht zurück in
+        den Pool (nicht vollständig gelesen).
+        
+        Args:
+            payload: Request-Body (model, prompt, options, ...)
+            timeout: Timeout in Sekunden (pro Lesevorgang)
+            stop: Optionale Abbruchbedingung, erhält den bisherigen Antworttext
+        
+        Returns:
+            Dict: Letztes JSON-Objekt des Streams mit zusammengesetztem 'response',
+                  zusätzlich 'stopped_early' (bool) und 'total_seconds' (float)
+        
+        Raises:
+            requests.RequestException: Bei Timeout, Verbindungs- oder HTTP-Fehlern
+        """
+        payload = {**payload, 'stream': True}
+        if self.keep_alive is not None and 'keep_alive' not in payload:
+            payload['keep_alive'] = self.keep_alive
+        
+        with self._stats_lock:
+            self.stats['requests'] += 1
+        
+        started = time.monotonic()
+        text = ''
+        data: Dict[str, Any] = {}
+        stopped_early = False
+        
+        try:
+            response = self.session.post(self.generate_url, json=payload, timeout=timeout, stream=True)
+            try:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if 'error' in data:
+                        raise requests.RequestException(f"Ollama-Fehler: {data['error']}")
+                    
+                    text += data.get('response', '')
+                    if data.get('done'):
+                        break
+                    if stop and stop(text):
+                        stopped_early = True
+                        break
+            finally:
+                response.close()
+        except requests.RequestException:
+            with self._stats_lock:
+                self.stats['errors'] += 1
+            raise
+        
+        result = dict(data)
+        result['response'] = text
+        result['stopped_early'] = stopped_early
+        result['total_seconds'] = time.monotonic() - started
+        return result
+    
+    def embed(self, model: str, inputs: List[str], timeout: float = 60) -> List[List[float]]:
+        """
+        Berechnet Embeddings für mehrere Texte in einer Anfrage (/api/embed).
+        
+        Args:
+            model: Embedding-Modell (z.B. "nomic-embed-text")
+            inputs: Texte (ein Vektor pro Text, gleiche Reihenfolge)
+            timeout: Timeout in Sekunden
+        
+        Returns:
+            List[List[float]]: Embedding-Vektoren
+        
+        Raises:
+            requests.RequestException: Bei Timeout, Verbindungs- oder HTTP-Fehlern
+        """
+        payload: Dict[str, Any] = {'model': model, 'input': inputs, 'truncate': True}
+        if self.keep_alive is not None:
+            payload['keep_alive'] = self.keep_alive
+        
+        response = self._request('POST', f"{self.base_url}/api/embed", timeout, payload)
+        return response.json().get('embeddings', [])
+    
+    def list_models(self, timeout: float = 3) -> List[str]:
+        """
+        Liefert die Namen der installierten Modelle (/api/tags).
+        
+        Raises:
+            requests.RequestException: Bei Timeout, Verbindungs- oder HTTP-Fehlern
+        """
+        response = self._request('GET', f"{self.base_url}/api/tags", timeout)
+        return [model['name'] for model in response.json().get('models', [])]
+    
+    def preload(self, model: str, timeout: float = 60) -> None:
+        """
+        Lädt ein Modell in den Speicher (Anfrage ohne Prompt).
+        
+        Raises:
+            requests.RequestException: Bei Timeout, Verbindungs- oder HTTP-Fehlern
+        """
+        self.generate({'model': model}, timeout=timeout)
+    
+    def unload(self, model: str, timeout: float = 30) -> None:
+        """
+        Entlädt ein Modell sofort (keep_alive=0).
+        
+        Raises:
+            requests.RequestException: Bei Timeout, Verbindungs- oder HTTP-Fehlern
+        """
+        self.generate({'model': model, 'keep_alive': 0}, timeout=timeout)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Liefert Anfrage- und Verbindungsstatistik.
+        
+        Returns:
+            Dict: {'requests', 'errors', 'connections', 'reused'}
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['connections'] = self._count_connections()
+        stats['reused'] = max(0, stats['requests'] - stats['connections'])
+        return stats
+    
+    def close(self) -> None:
+        """Schließt alle offenen Verbindungen."""
+        self.session.close()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Ollama-Dispatcher für Ollama Spam Guard
+Begrenzt gleichzeitige LLM-Anfragen und verteilt sie auf mehrere Ollama-Hosts
+
+Werden mehrere Accounts parallel verarbeitet, laufen alle Klassifizierungen
+über einen gemeinsamen Dispatcher. Dieser begrenzt die Anzahl gleichzeitiger
+Anfragen pro Host und optional die Anfragen pro Sekunde, damit die lokalen
+Modelle nicht überlastet werden.
+
+Mehrere Hosts (OLLAMA_URLS):
+- Routing: Host mit den wenigsten offenen Anfragen (least outstanding requests),
+  der das angefragte Modell installiert hat
+- Health: Jeder Host hat einen eigenen Circuit Breaker (ollama_guard.py);
+  ausgefallene Hosts werden bis zur nächsten Probe-Anfrage übersprungen
+- Failover: Schlägt eine Anfrage fehl, wird sie auf dem nächsten Host wiederholt
+
+Autor: Ollama Spam Guard
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+import requests
+
+from ollama_client import OllamaClient
+from ollama_guard import CircuitBreaker, CircuitOpenError
+
+# ============================================
+# Ollama-Host
+# ============================================
+
+class OllamaHost:
+    """
+    Ein Ollama-Server mit eigenem Client, Circuit Breaker und Modell-Liste.
+    
+    Verwendung:
+        host = OllamaHost(OllamaClient("http://box1:11434/api/generate"), CircuitBreaker(3, 300))
+        host.refresh_models()
+        host.has_model("qwen2.5:14b-instruct")
+    """
+    
+    def __init__(self, client: OllamaClient, breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            client: OllamaClient für diesen Host
+            breaker: Circuit Breaker (Standard: aus)
+        """
+        self.client = client
+        self.name = client.base_url
+        self.breaker = breaker or CircuitBreaker(failure_threshold=0)
+        
+        # Installierte Modelle (None = unbekannt, alle Modelle erlaubt)
+        self.models: Optional[Set[str]] = None
+        
+        # Offene Anfragen (nur unter der Condition des Dispatchers ändern)
+        self.outstanding = 0
+        self.stats = {'requests': 0, 'errors': 0, 'seconds': 0.0}
+    
+    def has_model(self, model: Optional[str]) -> bool:
+        """True, wenn das Modell installiert ist (oder die Modell-Liste unbekannt ist)."""
+        if model is None or self.models is None:
+            return True
+        return model in self.models or f"{model}:latest" in self.models
+    
+    def refresh_models(self, timeout: float = 3) -> bool:
+        """
+        Health-Check: Lädt die Modell-Liste (/api/tags).
+        
+        Ist der Host nicht erreichbar, wird sein Circuit Breaker geöffnet
+        (nächster Versuch nach der Abkühlzeit).
+        
+        Returns:
+            bool: True wenn der Host erreichbar ist
+        """
+        try:
+            self.models = set(self.client.list_models(timeout=timeout))
+        except requests.ConnectionError as e:
+            logging.warning(f"Ollama-Host {self.name} nicht erreichbar: {e}")
+            self.breaker.trip()
+            return False
+        except requests.RequestException as e:
+            # Erreichbar, aber Modell-Liste unklar → alle Modelle erlauben
+            logging.warning(f"Ollama-Host {self.name}: Modell-Liste nicht lesbar: {e}")
+            self.models = None
+        
+        self.breaker.record_success()
+        return True
+
+# ============================================
+# Dispatcher
+# ============================================
+
+class OllamaDispatcher:
+    """
+    Gemeinsamer, rate-limitierter Zugang zu einem oder mehreren Ollama-Hosts.
+    
+    Verwendung:
+        dispatcher = OllamaDispatcher([host_a, host_b], max_concurrent=2, rate_limit=5.0)
+        data = dispatcher.call('generate', payload, model=payload['model'], timeout=120)
+    """
+    
+    def __init__(self, hosts: List[OllamaHost], max_concurrent: int = 1, rate_limit: float = 0.0):
+        """
+        Initialisiert den Dispatcher.
+        
+        Args:
+            hosts: Ollama-Hosts (mindestens einer)
+            max_concurrent: Maximale Anzahl gleichzeitiger Anfragen pro Host
+            rate_limit: Maximale Anfragen pro Sekunde über alle Hosts (0 = unbegrenzt)
+        """
+        if not hosts:
+            raise ValueError("Mindestens ein Ollama-Host erforderlich")
+        
+        self.hosts = hosts
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = 1.0 / rate_limit if rate_limit > 0 else 0.0
+        self.started = time.monotonic()
+        
+        # Schützt Host-Auswahl und offene Anfragen; benachrichtigt wartende Threads
+        self._hosts_changed = threading.Condition()
+        self._rate_lock = threading.Lock()
+        self._next_start = 0.0
+        
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'wait_seconds': 0.0, 'max_in_flight': 0, 'failovers': 0, 'rejected': 0}
+        self._in_flight = 0
+    
+    def _wait_for_rate_limit(self) -> None:
+        """Hält den Mindestabstand zwischen zwei Anfragen ein."""
+        if not self.min_interval:
+            return
+        
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        
+        if start > now:
+            time.sleep(start - now)
+    
+    def _acquire(self, model: Optional[str], tried: Set[OllamaHost]) -> Optional[OllamaHost]:
+        """
+        Wählt den Host mit den wenigsten offenen Anfragen (wartet, bis einer frei ist).
+        
+        Args:
+            model: Angefragtes Modell (None = beliebig)
+            tried: Bereits fehlgeschlagene Hosts dieser Anfrage
+        
+        Returns:
+            OllamaHost oder None, falls kein Host in Frage kommt
+        """
+        with self._hosts_changed:
+            while True:
+                candidates = [
+                    host for host in self.hosts
+                    if host not in tried and host.has_model(model) and host.breaker.allows()
+                ]
+                if not candidates:
+                    return None
+                
+                free = [host for host in candidates if host.outstanding < self.max_concurrent]
+                if not free:
+                    # Timeout: Breaker-Zustände ändern sich auch ohne Benachrichtigung
+                    self._hosts_changed.wait(timeout=1.0)
+                    continue
+                
+                host = min(free, key=lambda candidate: (candidate.outstanding, candidate.stats['requests']))
+                try:
+                    host.breaker.before_request()
+                except CircuitOpenError:
+                    tried.add(host)
+                    continue
+                
+                host.outstanding += 1
+                return host
+    
+    def _release(self, host: OllamaHost) -> None:
+        """Gibt den Slot eines Hosts frei und weckt wartende Threads."""
+        with self._hosts_changed:
+            host.outstanding -= 1
+            self._hosts_changed.notify_all()
+    
+    def call(self, method: str, *args, model: Optional[str] = None, **kwargs) -> Any:
+        """
+        Führt eine Ollama-Anfrage auf dem am wenigsten belasteten Host aus.
+        
+        Schlägt sie fehl, wird sie auf dem nächsten geeigneten Host
+        wiederholt (jeder Host höchstens einmal).
+        
+        Args:
+            method: Methode des OllamaClient (z.B. 'generate', 'generate_stream', 'embed')
+            *args, **kwargs: Argumente für die Methode
+            model: Angefragtes Modell (nur Hosts mit diesem Modell)
+        
+        Returns:
+            Rückgabewert der Client-Methode
+        
+        Raises:
+            CircuitOpenError: Kein Host verfügbar (alle ausgefallen oder ohne Modell)
+            requests.RequestException: Fehler des letzten versuchten Hosts
+        """
+        queued = time.monotonic()
+        tried: Set[OllamaHost] = set()
+        last_error: Optional[Exception] = None
+        
+        while True:
+            host = self._acquire(model, tried)
+            if host is None:
+                if last_error is not None:
+                    raise last_error
+                with self._stats_lock:
+                    self.stats['rejected'] += 1
+                raise CircuitOpenError(
+                    f"Kein Ollama-Host verfügbar{f' für {model}' if model else ''} (Circuit Breaker offen)"
+                )
+            
+            try:
+                self._wait_for_rate_limit()
+                
+                with self._stats_lock:
+                    self.stats['requests'] += 1
+                    if last_error is None:
+                        self.stats['wait_seconds'] += time.monotonic() - queued
+                    else:
+                        self.stats['failovers'] += 1
+                    self._in_flight += 1
+                    self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+                
+                started = time.monotonic()
+                try:
+                    result = getattr(host.client, method)(*args, **kwargs)
+                finally:
+                    with self._stats_lock:
+                        self._in_flight -= 1
+                        host.stats['requests'] += 1
+                        host.stats['seconds'] += time.monotonic() - started
+            except Exception as e:
+                host.breaker.record_failure()
+                with self._stats_lock:
+                    host.stats['errors'] += 1
+                tried.add(host)
+                last_error = e
+                if len(self.hosts) > 1:
+                    logging.warning(f"Ollama-Host {host.name} fehlgeschlagen ({e}), versuche nächsten Host")
+                continue
+            finally:
+                self._release(host)
+            
+            host.breaker.record_success()
+            return result
+    
+    def hosts_with(self, model: str) -> List[OllamaHost]:
+        """Erreichbare Hosts, auf denen das Modell installiert ist."""
+        return [host for host in self.hosts if host.has_model(model) and host.breaker.allows()]
+    
+    def host_stats(self) -> List[Dict[str, Any]]:
+        """
+        Durchsatz und Latenz pro Host.
+        
+        Returns:
+            Liste von Dicts: name, requests, errors, avg_ms, per_minute, trips
+        """
+        elapsed_minutes = max(1e-9, (time.monotonic() - self.started) / 60)
+        with self._stats_lock:
+            return [
+                {
+                    'name': host.name,
+                    'requests': host.stats['requests'],
+                    'errors': host.stats['errors'],
+                    'avg_ms': host.stats['seconds'] / host.stats['requests'] * 1000 if host.stats['requests'] else 0.0,
+                    'per_minute': (host.stats['requests'] - host.stats['errors']) / elapsed_minutes,
+                    'trips': host.breaker.stats['trips']
+                }
+                for host in self.hosts
+            ]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Liefert eine Kopie der Dispatcher-Statistik."""
+        with self._stats_lock:
+            return dict(self.stats)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Schutzmechanismen für Ollama-Anfragen (Ollama Spam Guard)
+Adaptive Timeouts aus Latenz-Perzentilen und Circuit Breaker
+
+Ein fester Timeout von 120s pro E-Mail lässt einen Lauf bei hängendem
+Ollama sehr lange stehen. Stattdessen:
+
+- AdaptiveTimeout: merkt sich die Dauer erfolgreicher Anfragen pro Modell
+  (Sekunden pro E-Mail) und setzt den Timeout auf ein Vielfaches des
+  gewählten Perzentils (z.B. 3 × p95), begrenzt durch Minimum und den
+  bisherigen festen Wert als Obergrenze.
+- CircuitBreaker: nach N aufeinanderfolgenden Fehlern werden für eine
+  Abkühlzeit keine Anfragen mehr gesendet (CircuitOpenError). Danach darf
+  genau eine Probe-Anfrage durch; gelingt sie, schließt der Breaker wieder.
+
+Autor: Ollama Spam Guard
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# ============================================
+# Exceptions
+# ============================================
+
+class CircuitOpenError(Exception):
+    """Anfrage abgewiesen, weil der Circuit Breaker offen ist."""
+
+# ============================================
+# Adaptive Timeouts
+# ============================================
+
+class AdaptiveTimeout:
+    """
+    Timeout aus dem Latenz-Perzentil erfolgreicher Anfragen.
+    
+    Verwendung:
+        timeouts = AdaptiveTimeout(percentile=95, multiplier=3.0, minimum=10)
+        timeout = timeouts.timeout("qwen2.5:14b-instruct", mails=4, ceiling=240)
+        timeouts.record("qwen2.5:14b-instruct", mails=4, seconds=6.2)
+    """
+    
+    def __init__(self, percentile: float = 95, multiplier: float = 3.0,
+                 minimum: float = 10, window: int = 100, min_samples: int = 5):
+        """
+        Args:
+            percentile: Perzentil der Latenz (0-100)
+            multiplier: Sicherheitsfaktor auf das Perzentil
+            minimum: Untergrenze des Timeouts in Sekunden
+            window: Anzahl berücksichtigter Messungen pro Modell
+            min_samples: Messungen, bevor der adaptive Wert gilt (vorher: ceiling)
+        """
+        self.percentile = min(100.0, max(0.0, percentile))
+        self.multiplier = max(1.0, multiplier)
+        self.minimum = max(1.0, minimum)
+        self.window = max(1, window)
+        self.min_samples = max(1, min_samples)
+        
+        # Modell → letzte Latenzen (Sekunden pro E-Mail)
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, model: str, mails: int, seconds: float) -> None:
+        """Speichert die Dauer einer erfolgreichen Anfrage (thread-sicher)."""
+        with self._lock:
+            samples = self._samples.setdefault(model, deque(maxlen=self.window))
+            samples.append(seconds / max(1, mails))
+    
+    def quantile(self, model: str) -> Optional[float]:
+        """Latenz-Perzentil pro E-Mail (None bei zu wenig Messungen)."""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        
+        if len(samples) < self.min_samples:
+            return None
+        position = round(self.percentile / 100 * (len(samples) - 1))
+        return samples[position]
+    
+    def timeout(self, model: str, mails: int = 1, ceiling: float = 120) -> float:
+        """
+        Timeout für eine Anfrage.
+        
+        Args:
+            model: Ollama-Modell
+            mails: Anzahl E-Mails in der Anfrage
+            ceiling: Obergrenze (bisheriger fester Timeout)
+        
+        Returns:
+            float: Timeout in Sekunden
+        """
+        quantile = self.quantile(model)
+        if quantile is None:
+            return ceiling
+        return min(ceiling, max(self.minimum, quantile * max(1, mails) * self.multiplier))
+
+# ============================================
+# Circuit Breaker
+# ============================================
+
+class CircuitBreaker:
+    """
+    Stoppt Anfragen nach aufeinanderfolgenden Fehlern.
+    
+    Zustände: 'closed' (normal), 'open' (alle Anfragen abgewiesen),
+    'half_open' (eine Probe-Anfrage nach Ablauf der Abkühlzeit).
+    
+    Verwendung:
+        breaker = CircuitBreaker(failure_threshold=3, cooldown=300)
+        breaker.before_request()    # wirft CircuitOpenError
+        breaker.record_success()    # bzw. record_failure()
+    """
+    
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 300, name: str = 'Ollama'):
+        """
+        Args:
+            failure_threshold: Aufeinanderfolgende Fehler bis zum Auslösen (0 = aus)
+            cooldown: Sekunden bis zur nächsten Probe-Anfrage
+            name: Bezeichnung für Log-Meldungen (z.B. Host-URL)
+        """
+        self.name = name
+        self.failure_threshold = max(0, failure_threshold)
+        self.cooldown = max(0.0, cooldown)
+        
+        self.state = 'closed'
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_running = False
+        self._lock = threading.Lock()
+        
+        self.stats = {'trips': 0, 'rejected': 0}
+    
+    @property
+    def is_open(self) -> bool:
+        """True, solange Anfragen abgewiesen werden."""
+        with self._lock:
+            return self.state == 'open' and time.monotonic() - self._opened_at < self.cooldown
+    
+    def allows(self) -> bool:
+        """True, wenn before_request() eine Anfrage zulassen würde (ändert keinen Zustand)."""
+        if not self.failure_threshold:
+            return True
+        
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                return time.monotonic() - self._opened_at >= self.cooldown
+            return not self._probe_running
+    
+    def trip(self) -> None:
+        """Öffnet den Breaker sofort (z.B. fehlgeschlagener Health-Check)."""
+        if not self.failure_threshold:
+            return
+        
+        with self._lock:
+            if self.state != 'open':
+                self.stats['trips'] += 1
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+            self._probe_running = False
+    
+    def before_request(self) -> None:
+        """
+        Prüft, ob eine Anfrage gesendet werden darf.
+        
+        Raises:
+            CircuitOpenError: Breaker offen (bzw. Probe-Anfrage läuft bereits)
+        """
+        if not self.failure_threshold:
+            return
+        
+        with self._lock:
+            if self.state == 'closed':
+                return
+            
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = 'half_open'
+                self._probe_running = False
+            
+            if self.state == 'half_open' and not self._probe_running:
+                self._probe_running = True
+                logging.info(f"Circuit Breaker: Probe-Anfrage an {self.name}")
+                return
+            
+            self.stats['rejected'] += 1
+            remaining = max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+        
+        raise CircuitOpenError(f"Circuit Breaker für {self.name} offen (nächster Versuch in {remaining:.0f}s)")
+    
+    def record_success(self) -> None:
+        """Erfolgreiche Anfrage: Fehlerzähler zurücksetzen, Breaker schließen."""
+        with self._lock:
+            if self.state != 'closed':
+                logging.info(f"Circuit Breaker geschlossen: {self.name} antwortet wieder")
+            self.state = 'closed'
+            self.failures = 0
+            self._probe_running = False
+    
+    def record_failure(self) -> None:
+        """Fehlgeschlagene Anfrage: nach failure_threshold Fehlern (oder fehlgeschlagener Probe) öffnen."""
+        if not self.failure_threshold:
+            return
+        
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+                self._probe_running = False
+                self.stats['trips'] += 1
+                logging.warning(
+                    f"Circuit Breaker offen nach {self.failures} Fehler(n) in Folge: "
+                    f"keine Anfragen an {self.name} für {self.cooldown:.0f}s"
+                )
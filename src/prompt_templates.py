@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Prompt-Templates für Ollama Spam Guard
+Statischer Prompt-Anfang, variable E-Mail-Felder am Ende
+
+Ollama hält den KV-Cache der letzten Anfrage pro Modell-Slot und muss bei
+der nächsten Anfrage nur die Tokens ab der ersten Abweichung neu auswerten.
+Deshalb ist jeder Prompt zweigeteilt:
+
+1. Präfix: System-Prompt und Anweisung, byte-identisch für alle E-Mails
+   eines Laufs (kein Datum, keine Zähler, keine E-Mail-Daten)
+2. Ende: Absender, Betreff und Body der E-Mail
+
+Ob der Präfix wiederverwendet wird, zeigen prompt_eval_count (neu
+ausgewertete Prompt-Tokens) und prompt_eval_duration aus der Antwort.
+
+Gemeinsam genutzt von Spam-Filter und Benchmark (kein Import von config.py).
+
+Autor: Ollama Spam Guard
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from llm_verdict import JSON_INSTRUCTION
+
+# ============================================
+# Statischer Präfix
+# ============================================
+
+# Lightweight System-Prompt für Ministral (Standard-System-Prompt hat ~600 Tokens
+# wegen Tool-Definitionen). Bewusst ohne aktuelles Datum: es würde den Präfix
+# täglich ändern und zur Klassifizierung nichts beitragen.
+SYSTEM_PROMPT = (
+    "You are an intelligent Spam Detection System. "
+    "Analyze the email content and metadata critically. "
+    "Legitimate emails (HAM) can come from unknown senders. "
+    "Only mark as SPAM if there are clear indicators like phishing, scams, unsolicited offers, or malicious content."
+)
+
+# Prompt-Anweisung im Text-Modus
+TEXT_INSTRUCTION = (
+    "Klassifiziere diese E-Mail als SPAM oder HAM. "
+    "Antworte NUR mit 'SPAM' oder 'HAM' und einer kurzen Begründung (max 15 Wörter).\n\n"
+)
+
+# ============================================
+# Prompt und Payload
+# ============================================
+
+def uses_system_prompt(model: str) -> bool:
+    """True für Modelle, deren Standard-System-Prompt ersetzt wird (Ministral)."""
+    return "ministral" in model.lower()
+
+def build_prompt(sender: str, subject: str, body: str, structured: bool = False) -> str:
+    """
+    Baut den Prompt für eine E-Mail: statische Anweisung, dann die E-Mail-Felder.
+    
+    Args:
+        sender: Absender (leer = Zeile entfällt, z.B. im Benchmark)
+        subject: Betreff
+        body: Body (bereits gekürzt)
+        structured: JSON-Anweisung statt Freitext
+    
+    Returns:
+        str: Prompt
+    """
+    instruction = JSON_INSTRUCTION if structured else TEXT_INSTRUCTION
+    sender_line = f"Von: {sender}\n" if sender else ""
+    return f"{instruction}{sender_line}Betreff: {subject}\nInhalt: {body}"
+
+def build_payload(prompt: str, model: str, num_predict: int, use_thinking: bool = False,
+                  schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Baut den Request-Body für /api/generate.
+    
+    Args:
+        prompt: Fertiger Prompt (siehe build_prompt / build_batch_prompt)
+        model: Ollama-Modell
+        num_predict: Maximale Anzahl generierter Tokens
+        use_thinking: Thinking-Modus erlauben (sonst think=False)
+        schema: Optionales JSON-Schema für Ollamas format-Parameter
+    
+    Returns:
+        Dict: Payload (ohne keep_alive, das ergänzt der OllamaClient)
+    """
+    payload: Dict[str, Any] = {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "options": {
+            "temperature": 0.1,
+            "num_predict": 2000 if use_thinking else num_predict
+        }
+    }
+    
+    if uses_system_prompt(model):
+        payload["system"] = SYSTEM_PROMPT
+    
+    # Thinking explizit deaktivieren (Reasoning-Modelle denken sonst ungefragt)
+    if not use_thinking:
+        payload["think"] = False
+    
+    if schema is not None:
+        payload["format"] = schema
+    
+    return payload
+
+def prompt_eval_stats(data: Dict[str, Any]) -> Tuple[Optional[int], Optional[float]]:
+    """
+    Liest die Prompt-Auswertung aus einer Ollama-Antwort.
+    
+    Args:
+        data: JSON-Antwort von /api/generate (letztes Objekt bei Streaming)
+    
+    Returns:
+        (prompt_eval_count, prompt_eval_duration in Sekunden), None falls nicht enthalten
+    """
+    count = data.get("prompt_eval_count")
+    duration = data.get("prompt_eval_duration")
+    return count, (duration / 1e9 if duration is not None else None)
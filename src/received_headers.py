@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Received-Header-Analyse für Ollama Spam Guard
+Ermittelt die IP des ersten externen Hops für den IP-Blacklist-Check
+
+Jeder Mailserver auf dem Weg einer E-Mail setzt oben einen Received-Header
+mit der IP, von der er die E-Mail angenommen hat, z.B.:
+
+    Received: from mail.example.com (mail.example.com [203.0.113.5])
+        by mx.provider.de (Postfix) with ESMTPS id 4F2...
+
+Die Header werden von oben (eigener Server) nach unten gelesen. Hops mit
+privaten/reservierten Adressen (interne Relays, Loopback) und Netze aus
+RECEIVED_TRUSTED_NETWORKS (eigene Mailserver des Providers) werden
+übersprungen. Die erste übrige IP ist der externe Server, der die E-Mail
+eingeliefert hat. Tiefere Header werden nicht ausgewertet, da der Absender
+sie beliebig fälschen kann.
+
+Autor: Ollama Spam Guard
+"""
+
+import re
+import ipaddress
+from typing import List, Optional, Sequence
+
+from ip_index import IPRangeIndex, parse_address
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Teil vor " by " (wer hat eingeliefert)
+BY_CLAUSE_RE = re.compile(r'\sby\s', re.IGNORECASE)
+
+# Kommentare in Klammern, z.B. "(mail.example.com [203.0.113.5])"
+COMMENT_RE = re.compile(r'\(([^()]*)\)')
+
+# IP-Literale, z.B. "[203.0.113.5]", "[IPv6:2001:db8::1]", "(198.51.100.1)"
+BRACKET_IP_RE = re.compile(r'[\[(](?:IPv6:)?([0-9A-Fa-f:.]{2,45})[\])]')
+
+# IP-Literal im HELO/EHLO, z.B. "(HELO [198.51.100.1])" oder "helo=[198.51.100.1]"
+# (vom Absender frei wählbar, wird vor der Suche entfernt)
+HELO_LITERAL_RE = re.compile(r'\b(?:HELO|EHLO)(?:\s*=\s*|\s+)[\[(][^\])]*[\])]', re.IGNORECASE)
+
+# Nackte IP nach "from" (z.B. qmail: "from 203.0.113.5 by ...")
+BARE_IP_RE = re.compile(r'^\s*from\s+([0-9A-Fa-f:.]{7,45})(?:\s|$)', re.IGNORECASE)
+
+# ============================================
+# Header-Auswertung
+# ============================================
+
+def extract_received_ip(header: str) -> Optional[str]:
+    """
+    Liest die einliefernde IP aus einem Received-Header.
+    
+    Bevorzugt wird die IP im Klammer-Kommentar (vom empfangenden Server
+    ermittelt). IP-Literale nach HELO/EHLO (vom Absender frei wählbar)
+    werden ignoriert, z.B. "from host (HELO [1.2.3.4]) (5.6.7.8)" → 5.6.7.8.
+    
+    Args:
+        header: Wert eines Received-Headers (gefaltet oder ungefaltet)
+    
+    Returns:
+        str: IP-Adresse oder None, falls keine gefunden
+    """
+    text = ' '.join(header.split())
+    from_part = HELO_LITERAL_RE.sub('', BY_CLAUSE_RE.split(text, 1)[0])
+    
+    candidates: List[str] = []
+    for comment in COMMENT_RE.findall(from_part):
+        candidates.extend(BRACKET_IP_RE.findall(f"({comment})"))
+    candidates.extend(BRACKET_IP_RE.findall(from_part))
+    
+    bare = BARE_IP_RE.match(from_part)
+    if bare:
+        candidates.append(bare.group(1))
+    
+    for candidate in candidates:
+        if parse_address(candidate) is not None:
+            return candidate
+    return None
+
+def is_internal_address(ip_address: str) -> bool:
+    """True für private, Loopback-, Link-Local- und reservierte Adressen."""
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return True
+    
+    mapped = getattr(address, 'ipv4_mapped', None)
+    return not (mapped or address).is_global
+
+def first_external_hop(headers: Sequence[str], trusted: Optional[IPRangeIndex] = None) -> Optional[str]:
+    """
+    Ermittelt die IP des ersten externen Hops.
+    
+    Args:
+        headers: Received-Header in Original-Reihenfolge (oberster = neuester)
+        trusted: Eigene Mailserver (werden wie interne Hops übersprungen)
+    
+    Returns:
+        str: IP des ersten externen Servers oder None (z.B. nur interne Hops)
+    """
+    for header in headers:
+        ip_address = extract_received_ip(header)
+        if ip_address is None:
+            continue
+        if is_internal_address(ip_address):
+            continue
+        if trusted is not None and trusted.contains(ip_address):
+            continue
+        return ip_address
+    return None
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+SimHash-Index für Ollama Spam Guard
+Erkennt nahezu identische E-Mails (Spam-Kampagnen, Newsletter-Varianten)
+
+Kampagnen variieren Anrede, Tracking-IDs und Beträge, ein exakter Hash
+(Verdict-Cache) greift dann nicht. Ein 64-Bit-SimHash über Betreff und
+Body-Anfang bleibt bei kleinen Änderungen fast gleich; liegt eine neue
+E-Mail innerhalb von SIMHASH_MAX_DISTANCE Bits einer bereits klassifizierten,
+wird deren Entscheidung ohne LLM-Anfrage übernommen.
+
+Lookup über Banding (Schubfachprinzip): Bei maximal k abweichenden Bits ist
+mindestens eines von k+1 Bändern identisch. Pro Lookup werden nur die
+Kandidaten aus diesen Buckets verglichen.
+
+Autor: Ollama Spam Guard
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ============================================
+# Konfiguration
+# ============================================
+
+# Anzahl Bits des Fingerprints
+SIMHASH_BITS = 64
+
+# Mindestanzahl Tokens, darunter ist der Fingerprint nicht aussagekräftig
+MIN_TOKENS = 8
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_DIGITS_RE = re.compile(r'\d+')
+
+# ============================================
+# Fingerprint
+# ============================================
+
+def tokenize(text: str) -> List[str]:
+    """
+    Zerlegt Text in normalisierte Tokens.
+    
+    Ziffernfolgen werden vereinheitlicht, damit Beträge, Bestellnummern
+    und Tracking-IDs den Fingerprint nicht verändern.
+    """
+    return [_DIGITS_RE.sub('0', token) for token in _TOKEN_RE.findall((text or '').lower())]
+
+def simhash(text: str) -> Optional[int]:
+    """
+    Berechnet den 64-Bit-SimHash über Wort-Shingles (Wortpaare).
+    
+    Args:
+        text: Betreff + Body-Anfang
+    
+    Returns:
+        int oder None bei zu wenig Text
+    """
+    tokens = tokenize(text)
+    if len(tokens) < MIN_TOKENS:
+        return None
+    
+    features = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * SIMHASH_BITS
+    
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+    
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    """Anzahl unterschiedlicher Bits."""
+    return bin(a ^ b).count('1')
+
+def new_simhash_stats() -> Dict[str, int]:
+    """Erzeugt leere Index-Statistik."""
+    return {'hits': 0, 'misses': 0, 'skipped': 0, 'added': 0, 'evicted': 0}
+
+# ============================================
+# SimHash Index
+# ============================================
+
+class SimHashIndex:
+    """
+    Persistenter, größenbegrenzter Near-Duplicate-Index.
+    
+    Verwendung:
+        index = SimHashIndex(Path("data/state/simhash_index.json"), max_distance=3)
+        fingerprint = simhash(subject + " " + body)
+        match = index.lookup(fingerprint)   # (is_spam, reason, distance) oder None
+        index.add(fingerprint, True, "SPAM: Phishing")
+        index.save()
+    """
+    
+    def __init__(self, path: Optional[Path] = None, max_distance: int = 3, max_entries: int = 5000):
+        """
+        Initialisiert den Index und lädt vorhandene Fingerprints.
+        
+        Args:
+            path: Pfad zur JSON-Datei (None = nur im Speicher)
+            max_distance: Maximale Hamming-Distanz für einen Treffer
+            max_entries: Maximale Anzahl Fingerprints (älteste werden verdrängt)
+        """
+        self.path = Path(path) if path else None
+        self.max_distance = max(0, min(max_distance, 15))
+        self.max_entries = max(1, max_entries)
+        self.stats = new_simhash_stats()
+        
+        # Bänder: max_distance + 1 möglichst gleich breite Bit-Bereiche
+        band_count = self.max_distance + 1
+        edges = [round(i * SIMHASH_BITS / band_count) for i in range(band_count + 1)]
+        self._bands = [(start, (1 << (end - start)) - 1) for start, end in zip(edges, edges[1:])]
+        
+        # fingerprint → (is_spam, reason, timestamp), Reihenfolge = Alter (LRU)
+        self.entries: "OrderedDict[int, Tuple[bool, str, float]]" = OrderedDict()
+        self._buckets: List[Dict[int, set]] = [{} for _ in self._bands]
+        self._lock = threading.RLock()
+        self._dirty = False
+        
+        self._load()
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def _band_values(self, fingerprint: int) -> List[int]:
+        return [fingerprint >> start & mask for start, mask in self._bands]
+    
+    def _insert(self, fingerprint: int, entry: Tuple[bool, str, float]) -> None:
+        self.entries[fingerprint] = entry
+        self.entries.move_to_end(fingerprint)
+        for buckets, value in zip(self._buckets, self._band_values(fingerprint)):
+            buckets.setdefault(value, set()).add(fingerprint)
+    
+    def _remove(self, fingerprint: int) -> None:
+        self.entries.pop(fingerprint, None)
+        for buckets, value in zip(self._buckets, self._band_values(fingerprint)):
+            bucket = buckets.get(value)
+            if bucket:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del buckets[value]
+    
+    def _load(self) -> None:
+        """Lädt Fingerprints aus JSON-Datei."""
+        if not self.path or not self.path.exists():
+            return
+        
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            for fingerprint, is_spam, reason, timestamp in data.get('entries', []):
+                self._insert(int(fingerprint, 16), (bool(is_spam), reason, timestamp))
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+        except Exception as e:
+            logging.error(f"Fehler beim Laden des SimHash-Index ({self.path}): {e}")
+    
+    def save(self) -> None:
+        """Speichert den Index atomar (nur bei Änderungen)."""
+        if self.path is None or not self._dirty:
+            return
+        
+        try:
+            with self._lock:
+                data = {
+                    'bits': SIMHASH_BITS,
+                    'entries': [
+                        [f"{fingerprint:016x}", is_spam, reason, timestamp]
+                        for fingerprint, (is_spam, reason, timestamp) in self.entries.items()
+                    ]
+                }
+                self._dirty = False
+                
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+                tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern des SimHash-Index: {e}")
+    
+    def lookup(self, fingerprint: Optional[int]) -> Optional[Tuple[bool, str, int]]:
+        """
+        Sucht die ähnlichste bereits klassifizierte E-Mail.
+        
+        Args:
+            fingerprint: SimHash der E-Mail (None = zu wenig Text)
+        
+        Returns:
+            (is_spam, reason, distance) oder None
+        """
+        if fingerprint is None:
+            self.stats['skipped'] += 1
+            return None
+        
+        with self._lock:
+            candidates = set()
+            for buckets, value in zip(self._buckets, self._band_values(fingerprint)):
+                candidates.update(buckets.get(value, ()))
+            
+            best = None
+            for candidate in candidates:
+                distance = hamming_distance(fingerprint, candidate)
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (candidate, distance)
+            
+            if best is None:
+                self.stats['misses'] += 1
+                return None
+            
+            candidate, distance = best
+            is_spam, reason, _ = self.entries[candidate]
+            self.entries.move_to_end(candidate)
+            self.stats['hits'] += 1
+            return is_spam, reason, distance
+    
+    def add(self, fingerprint: Optional[int], is_spam: bool, reason: str) -> None:
+        """
+        Nimmt eine klassifizierte E-Mail in den Index auf.
+        
+        Args:
+            fingerprint: SimHash der E-Mail (None wird ignoriert)
+            is_spam: Entscheidung des LLM
+            reason: Begründung
+        """
+        if fingerprint is None:
+            return
+        
+        with self._lock:
+            if fingerprint in self.entries:
+                self._remove(fingerprint)
+            self._insert(fingerprint, (is_spam, reason, time.time()))
+            self.stats['added'] += 1
+            
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+                self.stats['evicted'] += 1
+            
+            self._dirty = True
@@ -26,10 +26,14 @@ import requests
 from dotenv import load_dotenv
 from tqdm import tqdm
 import os
+import re
+import time
 import logging
-from typing import Tuple, Dict, Optional
+import threading
+from typing import Tuple, Dict, List, Optional
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 # ============================================
 # Konfiguration laden
@@ -38,10 +42,40 @@ from collections import defaultdict
 load_dotenv()
 
 from config import (
-    EMAIL_ACCOUNTS, OLLAMA_URL, SPAM_MODEL, FILTER_MODE, LIMIT, DAYS_BACK, LOG_PATH,
-    USE_LISTS, LIST_UPDATE_INTERVAL, FORCE_LIST_UPDATE, LISTS_CACHE_DIR
+    EMAIL_ACCOUNTS, OLLAMA_URLS, SPAM_MODEL, FILTER_MODE, LIMIT, DAYS_BACK, LOG_PATH,
+    USE_LISTS, LIST_UPDATE_INTERVAL, FORCE_LIST_UPDATE, LISTS_CACHE_DIR,
+    FETCH_CHUNK_SIZE, FETCH_MODE, FETCH_BODY_BYTES, USE_CHECKPOINTS, CHECKPOINT_FILE,
+    ACTION_BATCH_SIZE, ACCOUNT_WORKERS, OLLAMA_MAX_CONCURRENT, OLLAMA_RATE_LIMIT,
+    OLLAMA_KEEP_ALIVE, OLLAMA_UNLOAD_AFTER_RUN, CLASSIFY_IN_FLIGHT,
+    USE_VERDICT_CACHE, VERDICT_CACHE_FILE, VERDICT_CACHE_TTL_HOURS, VERDICT_CACHE_MAX_ENTRIES,
+    USE_SIMHASH_INDEX, SIMHASH_INDEX_FILE, SIMHASH_MAX_DISTANCE, SIMHASH_MAX_ENTRIES,
+    OLLAMA_STREAM, OLLAMA_STREAM_REASON_CHARS, OLLAMA_OUTPUT_FORMAT, LLM_BATCH_SIZE,
+    CASCADE_MODEL, CASCADE_CONFIDENCE, CASCADE_TRAIN_LOCAL, USE_LOCAL_CLASSIFIER, LOCAL_CLASSIFIER_FILE,
+    LOCAL_CLASSIFIER_THRESHOLD, LOCAL_CLASSIFIER_MIN_DOCS, USE_EMBEDDING_KNN, EMBEDDING_MODEL,
+    EMBEDDING_INDEX_DIR, EMBEDDING_KNN_K, EMBEDDING_KNN_MIN_SIMILARITY, EMBEDDING_KNN_AGREEMENT,
+    EMBEDDING_KNN_MIN_ENTRIES, OLLAMA_TIMEOUT_MAX, OLLAMA_ADAPTIVE_TIMEOUT, OLLAMA_TIMEOUT_PERCENTILE,
+    OLLAMA_TIMEOUT_MULTIPLIER, OLLAMA_TIMEOUT_MIN, CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_COOLDOWN,
+    BODY_CLEANUP, BODY_TOKEN_BUDGET, USE_RECEIVED_IP_CHECK, RECEIVED_TRUSTED_NETWORKS
 )
 from list_manager import ListManager
+from ip_index import IPRangeIndex
+from received_headers import first_external_hop
+from imap_fetch import fetch_messages, new_fetch_stats, saved_round_trips
+from checkpoint_store import CheckpointStore, checkpoint_key, get_uidvalidity, filter_new_uids, limit_uids
+from imap_actions import MailActions, new_action_stats, refresh_capabilities
+from ollama_dispatcher import OllamaDispatcher, OllamaHost
+from ollama_guard import AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+from ollama_client import OllamaClient, generate_url_from
+from verdict_cache import VerdictCache, cache_key
+from simhash_index import SimHashIndex, simhash
+from local_classifier import LocalClassifier
+from embedding_index import EmbeddingIndex
+from body_cleanup import MAX_INPUT_CHARS, clean_body, new_cleanup_stats
+from prompt_templates import build_prompt, build_payload, prompt_eval_stats
+from llm_verdict import (
+    VERDICT_RE, VERDICT_SCHEMA, JSON_NUM_PREDICT, parse_json_verdict,
+    batch_schema, build_batch_prompt, parse_batch_verdicts
+)
 
 # Logging-Setup
 log_path = LOG_PATH
@@ -106,6 +140,256 @@ def init_list_manager() -> Optional[ListManager]:
     
     return _list_manager
 
+# ============================================
+# Received-Header (IP-Blacklist)
+# ============================================
+
+# Eigene Mailserver, die beim Received-Check übersprungen werden
+trusted_networks = IPRangeIndex()
+if trusted_networks.update(RECEIVED_TRUSTED_NETWORKS) < len(RECEIVED_TRUSTED_NETWORKS):
+    logging.warning(f"RECEIVED_TRUSTED_NETWORKS enthält ungültige Einträge: {RECEIVED_TRUSTED_NETWORKS}")
+
+# Statistik des Received-Checks (über alle Threads)
+_header_stats_lock = threading.Lock()
+header_stats = {'checked': 0, 'external': 0, 'ip_blacklist': 0}
+
+def received_sender_ip(msg: email.message.Message) -> Optional[str]:
+    """
+    IP des ersten externen Hops aus den Received-Headern.
+    
+    Args:
+        msg: E-Mail-Message-Objekt (Header genügen)
+    
+    Returns:
+        str: IP-Adresse oder None (Check deaktiviert oder kein externer Hop)
+    """
+    if not (USE_LISTS and USE_RECEIVED_IP_CHECK):
+        return None
+    
+    sender_ip = first_external_hop(msg.get_all('Received') or [], trusted_networks)
+    with _header_stats_lock:
+        header_stats['checked'] += 1
+        if sender_ip is not None:
+            header_stats['external'] += 1
+    return sender_ip
+
+# ============================================
+# UID-Checkpoints (global)
+# ============================================
+
+# Globale Instanz des CheckpointStores (wird bei Bedarf initialisiert)
+_checkpoint_store = None
+
+def init_checkpoint_store() -> Optional[CheckpointStore]:
+    """
+    Initialisiert den CheckpointStore beim ersten Aufruf.
+    
+    Returns:
+        CheckpointStore oder None falls deaktiviert
+    """
+    global _checkpoint_store
+    
+    if not USE_CHECKPOINTS:
+        return None
+    
+    if _checkpoint_store is None:
+        from pathlib import Path
+        checkpoint_path = Path(CHECKPOINT_FILE)
+        if not checkpoint_path.is_absolute():
+            checkpoint_path = Path(__file__).parent.parent / checkpoint_path
+        
+        _checkpoint_store = CheckpointStore(checkpoint_path)
+        logging.info(f"Checkpoint-Store geladen: {checkpoint_path} ({len(_checkpoint_store.checkpoints)} Einträge)")
+    
+    return _checkpoint_store
+
+# ============================================
+# Verdict-Cache (global)
+# ============================================
+
+# Globale Instanz des VerdictCaches (wird bei Bedarf initialisiert)
+_verdict_cache = None
+
+def init_verdict_cache() -> Optional[VerdictCache]:
+    """
+    Initialisiert den Verdict-Cache beim ersten Aufruf.
+    
+    Returns:
+        VerdictCache oder None falls deaktiviert bzw. nicht ladbar
+    """
+    global _verdict_cache
+    
+    if not USE_VERDICT_CACHE:
+        return None
+    
+    if _verdict_cache is None:
+        try:
+            from pathlib import Path
+            cache_path = Path(VERDICT_CACHE_FILE)
+            if not cache_path.is_absolute():
+                cache_path = Path(__file__).parent.parent / cache_path
+            
+            _verdict_cache = VerdictCache(
+                cache_path,
+                ttl_hours=VERDICT_CACHE_TTL_HOURS,
+                max_entries=VERDICT_CACHE_MAX_ENTRIES
+            )
+            expired = _verdict_cache.purge_expired()
+            logging.info(
+                f"Verdict-Cache geladen: {cache_path} ({len(_verdict_cache)} Einträge, "
+                f"{expired} abgelaufen entfernt)"
+            )
+        except Exception as e:
+            logging.error(f"Verdict-Cache konnte nicht geöffnet werden: {e}", exc_info=True)
+            return None
+    
+    return _verdict_cache
+
+# ============================================
+# SimHash-Index (global)
+# ============================================
+
+# Globale Instanz des SimHashIndex (wird bei Bedarf initialisiert)
+_simhash_index = None
+
+def init_simhash_index() -> Optional[SimHashIndex]:
+    """
+    Initialisiert den Near-Duplicate-Index beim ersten Aufruf.
+    
+    Returns:
+        SimHashIndex oder None falls deaktiviert
+    """
+    global _simhash_index
+    
+    if not USE_SIMHASH_INDEX:
+        return None
+    
+    if _simhash_index is None:
+        from pathlib import Path
+        index_path = Path(SIMHASH_INDEX_FILE)
+        if not index_path.is_absolute():
+            index_path = Path(__file__).parent.parent / index_path
+        
+        _simhash_index = SimHashIndex(
+            index_path,
+            max_distance=SIMHASH_MAX_DISTANCE,
+            max_entries=SIMHASH_MAX_ENTRIES
+        )
+        logging.info(f"SimHash-Index geladen: {index_path} ({len(_simhash_index)} Fingerprints)")
+    
+    return _simhash_index
+
+# ============================================
+# Lokaler Vor-Klassifikator (global)
+# ============================================
+
+# Globale Instanz des LocalClassifier (wird bei Bedarf initialisiert)
+_local_classifier = None
+
+def init_local_classifier() -> Optional[LocalClassifier]:
+    """
+    Initialisiert den lokalen Vor-Klassifikator beim ersten Aufruf.
+    
+    Returns:
+        LocalClassifier oder None falls deaktiviert
+    """
+    global _local_classifier
+    
+    if not USE_LOCAL_CLASSIFIER:
+        return None
+    
+    if _local_classifier is None:
+        from pathlib import Path
+        model_path = Path(LOCAL_CLASSIFIER_FILE)
+        if not model_path.is_absolute():
+            model_path = Path(__file__).parent.parent / model_path
+        
+        _local_classifier = LocalClassifier(model_path, min_docs=LOCAL_CLASSIFIER_MIN_DOCS)
+        spam_docs, ham_docs = int(_local_classifier.doc_counts[1]), int(_local_classifier.doc_counts[0])
+        logging.info(f"Lokaler Klassifikator geladen: {model_path} ({spam_docs} SPAM, {ham_docs} HAM gelernt)")
+    
+    return _local_classifier
+
+# ============================================
+# Embedding-Index (global)
+# ============================================
+
+# Globale Instanz des EmbeddingIndex (wird bei Bedarf initialisiert)
+_embedding_index = None
+
+# Embeddings eskalierter E-Mails bis zur LLM-Entscheidung (Schlüssel → Vektor, begrenzt)
+_embedding_pending_lock = threading.Lock()
+_embedding_pending: "OrderedDict[str, List[float]]" = OrderedDict()
+EMBEDDING_PENDING_MAX = 2000
+
+def init_embedding_index() -> Optional[EmbeddingIndex]:
+    """
+    Initialisiert den Embedding-Index beim ersten Aufruf.
+    
+    Returns:
+        EmbeddingIndex oder None falls deaktiviert
+    """
+    global _embedding_index
+    
+    if not USE_EMBEDDING_KNN:
+        return None
+    
+    if _embedding_index is None:
+        from pathlib import Path
+        index_dir = Path(EMBEDDING_INDEX_DIR)
+        if not index_dir.is_absolute():
+            index_dir = Path(__file__).parent.parent / index_dir
+        
+        _embedding_index = EmbeddingIndex(index_dir, model=EMBEDDING_MODEL)
+        logging.info(f"Embedding-Index geladen: {index_dir} ({len(_embedding_index)} Vektoren)")
+    
+    return _embedding_index
+
+# ============================================
+# Ollama-Dispatcher (global)
+# ============================================
+
+# Gemeinsamer Dispatcher für alle Accounts (wird bei Bedarf initialisiert)
+_ollama_dispatcher = None
+
+def init_ollama_dispatcher() -> OllamaDispatcher:
+    """
+    Initialisiert den Ollama-Dispatcher beim ersten Aufruf.
+    
+    Pro Eintrag in OLLAMA_URLS entsteht ein Host mit eigenem HTTP-Client
+    (Connection-Pool) und Circuit Breaker. Vor dem Start paralleler
+    Account-Threads aufrufen, damit alle Threads dieselbe Instanz nutzen.
+    
+    Returns:
+        OllamaDispatcher
+    """
+    global _ollama_dispatcher
+    
+    if _ollama_dispatcher is None:
+        hosts = []
+        for url in OLLAMA_URLS:
+            client = OllamaClient(
+                generate_url_from(url),
+                keep_alive=OLLAMA_KEEP_ALIVE,
+                pool_size=max(OLLAMA_MAX_CONCURRENT, ACCOUNT_WORKERS)
+            )
+            breaker = CircuitBreaker(CIRCUIT_BREAKER_FAILURES, CIRCUIT_BREAKER_COOLDOWN, name=client.base_url)
+            hosts.append(OllamaHost(client, breaker))
+        
+        _ollama_dispatcher = OllamaDispatcher(
+            hosts,
+            max_concurrent=OLLAMA_MAX_CONCURRENT,
+            rate_limit=OLLAMA_RATE_LIMIT
+        )
+        logging.info(
+            f"Ollama-Dispatcher: {', '.join(host.name for host in hosts)} "
+            f"(keep_alive={OLLAMA_KEEP_ALIVE}), max. {OLLAMA_MAX_CONCURRENT} gleichzeitige Anfragen pro Host, "
+            f"Rate-Limit: {OLLAMA_RATE_LIMIT or 'unbegrenzt'}/s, "
+            f"Circuit Breaker: {CIRCUIT_BREAKER_FAILURES or 'aus'} Fehler / {CIRCUIT_BREAKER_COOLDOWN:.0f}s"
+        )
+    
+    return _ollama_dispatcher
+
 # ============================================
 # IMAP-Funktionen
 # ============================================
@@ -130,6 +414,9 @@ def connect_imap(account: Dict[str, str]) -> imaplib.IMAP4_SSL:
         print(f"🔐 Login {account['name']}...")
         mail.login(account['user'], account['password'])
         
+        # MOVE/UIDPLUS/IDLE kündigen viele Server erst nach dem Login an
+        refresh_capabilities(mail)
+        
         print("📬 Öffne INBOX...")
         mail.select('INBOX')
         
@@ -153,111 +440,630 @@ def connect_imap(account: Dict[str, str]) -> imaplib.IMAP4_SSL:
 # Spam-Detection mit LLM
 # ============================================
 
-def detect_spam(sender: str, subject: str, body: str) -> Tuple[bool, str]:
+# Laufzeit-Statistik der LLM-Anfragen (über alle Threads)
+_llm_timing_lock = threading.Lock()
+llm_timing = {
+    'requests': 0, 'early_stops': 0, 'verdict_seconds': 0.0, 'total_seconds': 0.0,
+    'prompt_evals': 0, 'prompt_tokens': 0, 'prompt_eval_seconds': 0.0
+}
+
+# Statistik der Body-Bereinigung (geschätzte Tokens vor/nach, BODY_CLEANUP)
+_cleanup_stats_lock = threading.Lock()
+cleanup_stats = new_cleanup_stats()
+
+# Antwortzeiten erfolgreicher Anfragen pro Modell (Basis der adaptiven Timeouts)
+llm_timeouts = AdaptiveTimeout(
+    percentile=OLLAMA_TIMEOUT_PERCENTILE,
+    multiplier=OLLAMA_TIMEOUT_MULTIPLIER,
+    minimum=OLLAMA_TIMEOUT_MIN
+)
+
+# Statistik des Batch-Modus (LLM_BATCH_SIZE > 1)
+_batch_stats_lock = threading.Lock()
+batch_stats = {'requests': 0, 'mails': 0, 'fallbacks': 0}
+
+# Statistik der Modell-Kaskade pro Stufe (CASCADE_MODEL gesetzt)
+_cascade_stats_lock = threading.Lock()
+cascade_stats = {
+    'fast': {'mails': 0, 'decided': 0, 'seconds': 0.0},
+    'large': {'mails': 0, 'decided': 0, 'seconds': 0.0}
+}
+
+def parse_verdict(text: str, final: bool = True) -> Optional[bool]:
+    """
+    Bestimmt SPAM/HAM aus der (ggf. noch unvollständigen) LLM-Antwort.
+    
+    Args:
+        text: Bisheriger Antworttext
+        final: True wenn die Antwort vollständig ist
+    
+    Returns:
+        True (SPAM), False (HAM) oder None falls noch nicht entscheidbar
+    """
+    match = VERDICT_RE.search(text)
+    
+    # Im Stream muss nach dem Wort noch ein Zeichen folgen (sonst evtl. abgeschnitten)
+    if match and (final or match.end() < len(text)):
+        return match.group(1).upper() == 'SPAM'
+    
+    if final:
+        # Fallback wie bisher: "SPAM" irgendwo im Text
+        return "SPAM" in text.upper()
+    return None
+
+def record_llm_timing(verdict_seconds: float, total_seconds: float, stopped_early: bool,
+                      result: Optional[Dict[str, any]] = None) -> None:
+    """Sammelt Time-to-Verdict, Gesamt-Generierungszeit und Prompt-Auswertung (thread-sicher)."""
+    prompt_eval_count, prompt_eval_seconds = prompt_eval_stats(result or {})
+    if prompt_eval_count is not None:
+        logging.info(
+            f"LLM: prompt_eval_count={prompt_eval_count}, "
+            f"prompt_eval_duration={(prompt_eval_seconds or 0.0) * 1000:.0f} ms"
+        )
+    
+    with _llm_timing_lock:
+        llm_timing['requests'] += 1
+        llm_timing['verdict_seconds'] += verdict_seconds
+        llm_timing['total_seconds'] += total_seconds
+        if stopped_early:
+            llm_timing['early_stops'] += 1
+        # Fehlt bei früh beendeten Streams (Ollama sendet es erst mit done=true),
+        # für die Messung des Präfix-Caches daher OLLAMA_STREAM=false verwenden
+        if prompt_eval_count is not None:
+            llm_timing['prompt_evals'] += 1
+            llm_timing['prompt_tokens'] += prompt_eval_count
+            llm_timing['prompt_eval_seconds'] += prompt_eval_seconds or 0.0
+
+def classify_with_llm(payload: Dict[str, any], timeout: float, mails: int = 1) -> str:
+    """
+    Sendet die Anfrage an Ollama und liefert den Antworttext.
+    
+    Im Streaming-Modus wird abgebrochen, sobald SPAM/HAM feststeht und
+    OLLAMA_STREAM_REASON_CHARS Zeichen Begründung gelesen wurden. Bei
+    JSON-Ausgabe (format) wird vollständig gelesen, damit das Objekt gültig bleibt.
+    
+    Mit OLLAMA_ADAPTIVE_TIMEOUT wird der Timeout aus den bisherigen
+    Antwortzeiten des Modells berechnet (timeout ist dann die Obergrenze).
+    
+    Args:
+        payload: Request-Body für /api/generate
+        timeout: (Maximaler) Timeout in Sekunden
+        mails: Anzahl E-Mails in der Anfrage (für den adaptiven Timeout)
+    
+    Returns:
+        str: Antworttext des LLM
+    
+    Raises:
+        requests.RequestException: Bei Timeout, Verbindungs- oder HTTP-Fehlern
+        CircuitOpenError: Circuit Breaker offen (keine Anfrage gesendet)
+    """
+    dispatcher = init_ollama_dispatcher()
+    model = payload["model"]
+    
+    if OLLAMA_ADAPTIVE_TIMEOUT:
+        timeout = llm_timeouts.timeout(model, mails, ceiling=timeout)
+    
+    if not OLLAMA_STREAM:
+        started = time.monotonic()
+        result = dispatcher.call('generate', payload, model=model, timeout=timeout)
+        elapsed = time.monotonic() - started
+        record_llm_timing(elapsed, elapsed, False, result)
+        llm_timeouts.record(model, mails, elapsed)
+        return result.get("response", "")
+    
+    started = time.monotonic()
+    verdict_at = {}
+    early_stop = 'format' not in payload
+    
+    def stop(text: str) -> bool:
+        if 'time' not in verdict_at:
+            match = VERDICT_RE.search(text)
+            if not match or match.end() >= len(text):
+                return False
+            verdict_at['time'] = time.monotonic()
+            verdict_at['offset'] = match.end()
+        return early_stop and len(text) - verdict_at['offset'] >= OLLAMA_STREAM_REASON_CHARS
+    
+    result = dispatcher.call('generate_stream', payload, model=model, timeout=timeout, stop=stop)
+    total = result['total_seconds']
+    verdict_seconds = verdict_at['time'] - started if 'time' in verdict_at else total
+    record_llm_timing(verdict_seconds, total, result['stopped_early'], result)
+    llm_timeouts.record(model, mails, total)
+    
+    logging.debug(
+        f"LLM: Entscheidung nach {verdict_seconds * 1000:.0f} ms, "
+        f"gesamt {total * 1000:.0f} ms{' (früh beendet)' if result['stopped_early'] else ''} "
+        f"(Timeout {timeout:.0f}s)"
+    )
+    return result.get("response", "")
+
+def prompt_body(body: str) -> str:
+    """Body für den Prompt (bereinigt bereits im Token-Budget, sonst max 1000 Zeichen)."""
+    return body if BODY_CLEANUP else body[:1000]
+
+def build_llm_payload(prompt: str, num_predict: int, model: str = SPAM_MODEL,
+                      schema: Optional[Dict[str, any]] = None) -> Dict[str, any]:
+    """
+    Baut den Request-Body für /api/generate (Einzel- und Batch-Modus).
+    
+    System-Prompt und Optionen kommen aus prompt_templates.py und sind für
+    alle E-Mails eines Laufs identisch (Präfix-Cache von Ollama).
+    
+    Args:
+        prompt: Fertiger Prompt
+        num_predict: Maximale Anzahl generierter Tokens
+        model: Ollama-Modell (Standard: SPAM_MODEL)
+        schema: Optionales JSON-Schema (JSON- und Batch-Modus)
+    
+    Returns:
+        Dict: Payload für classify_with_llm
+    """
+    # Standardmäßig kein "Thinking" für maximale Geschwindigkeit im Produktivbetrieb
+    return build_payload(prompt, model, num_predict, use_thinking=False, schema=schema)
+
+def llm_error_verdict(error: Exception) -> Tuple[Optional[bool], str]:
+    """
+    Ergebnis bei fehlgeschlagener LLM-Anfrage: E-Mail wird zurückgestellt.
+    
+    Zurückgestellte E-Mails bleiben ungelesen im Posteingang und der
+    Checkpoint wird nicht über sie hinaus fortgeschrieben (nächster Lauf).
+    
+    Args:
+        error: Exception der Anfrage
+    
+    Returns:
+        Tuple[Optional[bool], str]: (None, reason)
+    """
+    if isinstance(error, CircuitOpenError):
+        logging.debug(f"LLM-Anfrage übersprungen: {error}")
+        return None, "Ollama pausiert (Circuit Breaker), zurückgestellt"
+    if isinstance(error, requests.Timeout):
+        logging.warning("LLM-Request timeout, E-Mail wird zurückgestellt")
+        return None, "LLM Timeout, zurückgestellt"
+    if isinstance(error, requests.ConnectionError):
+        logging.error("Ollama nicht erreichbar - ist 'ollama serve' aktiv?")
+        print("\n⚠️  Ollama nicht erreichbar!")
+        print("   Starte in anderem Terminal: ollama serve")
+        return None, "Ollama offline, zurückgestellt"
+    
+    logging.error(f"LLM-Fehler: {error}", exc_info=error)
+    return None, f"Fehler: {str(error)}, zurückgestellt"
+
+def lookup_known_verdict(sender: str, subject: str, body: str,
+                         sender_ip: Optional[str] = None) -> Optional[Tuple[bool, str]]:
+    """
+    Prüft Listen, Verdict-Cache und SimHash-Index (ohne LLM-Anfrage).
+    
+    Args:
+        sender: Absender-E-Mail
+        subject: E-Mail-Betreff
+        body: E-Mail-Body (Preview)
+        sender_ip: IP des ersten externen Hops (Received-Header), optional
+    
+    Returns:
+        (is_spam, reason) oder None, falls das LLM entscheiden muss
+    """
+    # ============================================
+    # STUFE 1 & 2: Whitelist/Blacklist Check (Hard Filter)
+    # ============================================
+    
+    list_manager = init_list_manager()
+    
+    if list_manager:
+        # Prüfe E-Mail gegen Listen
+        is_spam_by_list, list_reason = list_manager.check_email(sender)
+        
+        if is_spam_by_list is not None:
+            # E-Mail wurde in Liste gefunden (Whitelist oder Blacklist)
+            logging.info(f"Hard Filter: {sender} → {list_reason}")
+            return is_spam_by_list, list_reason
+        
+        # Einliefernder Server auf einer IP-Blacklist (Whitelist hat Vorrang, s.o.)
+        if sender_ip:
+            is_spam_by_ip, ip_reason = list_manager.check_ip(sender_ip)
+            if is_spam_by_ip:
+                with _header_stats_lock:
+                    header_stats['ip_blacklist'] += 1
+                logging.info(f"Hard Filter: {sender} über {sender_ip} → {ip_reason}")
+                return True, f"{ip_reason} (Received)"
+        
+        # E-Mail nicht in Listen → LLM-Analyse durchführen
+        logging.debug(f"E-Mail nicht in Listen gefunden, führe LLM-Analyse durch: {sender}")
+    
+    # Bereits bekannte E-Mail (gleicher Absender, Betreff, Body-Anfang)?
+    verdict_cache = init_verdict_cache()
+    
+    if verdict_cache is not None:
+        # Schlüssel pro entscheidendem Modell (SPAM_MODEL zuerst, dann ggf. CASCADE_MODEL)
+        for model in filter(None, (SPAM_MODEL, CASCADE_MODEL)):
+            cached = verdict_cache.get(cache_key(model, sender, subject, body[:1000]))
+            if cached is not None:
+                logging.info(f"Verdict-Cache: {sender} → {'SPAM' if cached[0] else 'HAM'}")
+                return cached[0], f"[Cache] {cached[1]}"
+    
+    # Nahezu identische E-Mail bereits klassifiziert (z.B. gleiche Spam-Kampagne)?
+    simhash_index = init_simhash_index()
+    
+    if simhash_index is not None:
+        match = simhash_index.lookup(simhash(f"{subject} {body[:1000]}"))
+        if match is not None:
+            is_spam, reason, distance = match
+            logging.info(f"Near-Duplicate (Distanz {distance}): {sender} → {'SPAM' if is_spam else 'HAM'}")
+            return is_spam, f"[Ähnlich, Distanz {distance}] {reason}"
+    
+    return None
+
+def classify_with_local_model(mails: List[Tuple[str, str, str]]) -> List[Optional[Tuple[bool, str]]]:
+    """
+    Lokaler Vor-Klassifikator: entscheidet nur bei extremer Spam-Wahrscheinlichkeit.
+    
+    Alle E-Mails werden in einem vektorisierten Durchlauf bewertet.
+    
+    Args:
+        mails: Liste von (sender, subject, body)
+    
+    Returns:
+        Liste von (is_spam, reason) oder None (→ LLM) pro E-Mail
+    """
+    classifier = init_local_classifier()
+    if classifier is None or not classifier.ready or not mails:
+        return [None] * len(mails)
+    
+    probabilities = classifier.predict_proba([(sender, subject, body[:1000]) for sender, subject, body in mails])
+    verdicts: List[Optional[Tuple[bool, str]]] = []
+    
+    for (sender, _, _), probability in zip(mails, probabilities):
+        if probability >= LOCAL_CLASSIFIER_THRESHOLD:
+            verdict = (True, f"[Lokal] SPAM-Wahrscheinlichkeit {probability:.1%}")
+            classifier.stats['spam'] += 1
+        elif probability <= 1 - LOCAL_CLASSIFIER_THRESHOLD:
+            verdict = (False, f"[Lokal] SPAM-Wahrscheinlichkeit {probability:.1%}")
+            classifier.stats['ham'] += 1
+        else:
+            verdict = None
+        
+        if verdict is not None:
+            logging.info(f"Lokaler Klassifikator: {sender} → {'SPAM' if verdict[0] else 'HAM'} ({probability:.4f})")
+        verdicts.append(verdict)
+    
+    return verdicts
+
+def classify_with_embeddings(mails: List[Tuple[str, str, str]]) -> List[Optional[Tuple[bool, str]]]:
+    """
+    Embedding-kNN: ein Embedding-Aufruf für alle E-Mails, Abstimmung der nächsten Nachbarn.
+    
+    Uneindeutige Nachbarschaften liefern None (→ LLM). Deren Vektoren werden
+    vorgemerkt und nach der LLM-Entscheidung in den Index übernommen.
+    
+    Args:
+        mails: Liste von (sender, subject, body)
+    
+    Returns:
+        Liste von (is_spam, reason) oder None pro E-Mail
+    """
+    index = init_embedding_index()
+    if index is None or not mails:
+        return [None] * len(mails)
+    
+    texts = [f"{subject}\n{body[:1000]}" for _, subject, body in mails]
+    try:
+        vectors = init_ollama_dispatcher().call('embed', EMBEDDING_MODEL, texts, model=EMBEDDING_MODEL, timeout=60)
+    except CircuitOpenError:
+        return [None] * len(mails)
+    except Exception as e:
+        logging.warning(f"Embedding-Anfrage fehlgeschlagen ({EMBEDDING_MODEL}): {e}")
+        return [None] * len(mails)
+    
+    if len(vectors) != len(mails):
+        logging.warning(f"Embedding-Antwort unvollständig: {len(vectors)} von {len(mails)} Vektoren")
+        return [None] * len(mails)
+    
+    if len(index) >= EMBEDDING_KNN_MIN_ENTRIES:
+        votes = index.vote(
+            vectors, k=EMBEDDING_KNN_K, min_similarity=EMBEDDING_KNN_MIN_SIMILARITY,
+            agreement=EMBEDDING_KNN_AGREEMENT
+        )
+    else:
+        votes = [None] * len(mails)
+    
+    verdicts: List[Optional[Tuple[bool, str]]] = []
+    for (sender, subject, body), vector, vote in zip(mails, vectors, votes):
+        if vote is None:
+            # Vektor bis zur LLM-Entscheidung vormerken (remember_verdict)
+            with _embedding_pending_lock:
+                _embedding_pending[cache_key(EMBEDDING_MODEL, sender, subject, body[:1000])] = vector
+                while len(_embedding_pending) > EMBEDDING_PENDING_MAX:
+                    _embedding_pending.popitem(last=False)
+            verdicts.append(None)
+            continue
+        
+        is_spam, share, similarity = vote
+        logging.info(f"Embedding-kNN: {sender} → {'SPAM' if is_spam else 'HAM'} ({share:.0%}, Ähnlichkeit {similarity:.2f})")
+        verdicts.append((is_spam, f"[kNN {share:.0%} von {EMBEDDING_KNN_K}, Ähnlichkeit {similarity:.2f}] {'SPAM' if is_spam else 'HAM'}"))
+    
+    return verdicts
+
+def remember_verdict(sender: str, subject: str, body: str, is_spam: bool, reason: str,
+                     model: str = SPAM_MODEL) -> None:
+    """
+    Speichert eine LLM-Entscheidung in Verdict-Cache, SimHash-Index und Trainingspuffer.
+    
+    Der Cache-Eintrag gilt nur für das entscheidende Modell. Entscheidungen von
+    CASCADE_MODEL landen nur mit CASCADE_TRAIN_LOCAL=true auch in den lokalen
+    Stufen (SimHash, lokaler Klassifikator, Embedding-Index).
+    
+    Args:
+        sender: Absender-E-Mail
+        subject: Betreff
+        body: E-Mail-Body
+        is_spam: Entscheidung
+        reason: Begründung
+        model: Entscheidendes Modell (SPAM_MODEL oder CASCADE_MODEL)
+    """
+    verdict_cache = init_verdict_cache()
+    if verdict_cache is not None:
+        verdict_cache.put(cache_key(model, sender, subject, body[:1000]), model, is_spam, reason)
+    
+    if model != SPAM_MODEL and not CASCADE_TRAIN_LOCAL:
+        # Vorgemerkten Embedding-Vektor trotzdem freigeben
+        with _embedding_pending_lock:
+            _embedding_pending.pop(cache_key(EMBEDDING_MODEL, sender, subject, body[:1000]), None)
+        return
+    
+    simhash_index = init_simhash_index()
+    if simhash_index is not None:
+        simhash_index.add(simhash(f"{subject} {body[:1000]}"), is_spam, reason)
+    
+    # Training erfolgt gebündelt am Ende des Durchlaufs (train_pending)
+    local_classifier = init_local_classifier()
+    if local_classifier is not None:
+        local_classifier.learn(sender, subject, body[:1000], is_spam)
+    
+    # Vorgemerkten Embedding-Vektor mit Label übernehmen (Append beim flush)
+    embedding_index = init_embedding_index()
+    if embedding_index is not None:
+        with _embedding_pending_lock:
+            vector = _embedding_pending.pop(cache_key(EMBEDDING_MODEL, sender, subject, body[:1000]), None)
+        if vector is not None:
+            embedding_index.add(vector, is_spam)
+
+def record_cascade_stage(stage: str, mails: int, decided: int, seconds: float) -> None:
+    """Sammelt E-Mails, Entscheidungen und Laufzeit einer Kaskaden-Stufe (thread-sicher)."""
+    with _cascade_stats_lock:
+        cascade_stats[stage]['mails'] += mails
+        cascade_stats[stage]['decided'] += decided
+        cascade_stats[stage]['seconds'] += seconds
+
+def classify_fast_with_llm(mails: List[Tuple[str, str, str]]) -> List[Optional[Tuple[bool, str]]]:
+    """
+    Erste Stufe der Modell-Kaskade: kleines Modell (CASCADE_MODEL) mit JSON-Ausgabe.
+    
+    Übernommen werden nur Entscheidungen mit confidence >= CASCADE_CONFIDENCE.
+    Unsichere E-Mails, ungültige Antworten und Fehler liefern None und
+    werden an SPAM_MODEL eskaliert.
+    
+    Args:
+        mails: Liste von (sender, subject, body)
+    
+    Returns:
+        Liste von (is_spam, reason) oder None pro E-Mail
+    """
+    if len(mails) == 1:
+        sender, subject, body = mails[0]
+        prompt = build_prompt(sender, subject, prompt_body(body), structured=True)
+        payload = build_llm_payload(prompt, JSON_NUM_PREDICT, model=CASCADE_MODEL, schema=VERDICT_SCHEMA)
+    else:
+        payload = build_llm_payload(
+            build_batch_prompt(mails), JSON_NUM_PREDICT * len(mails), model=CASCADE_MODEL, schema=batch_schema(len(mails))
+        )
+    
+    started = time.monotonic()
+    try:
+        result_text = classify_with_llm(payload, 60 + 15 * len(mails), mails=len(mails)).strip()
+    except CircuitOpenError:
+        result_text = ""
+    except Exception as e:
+        logging.warning(f"Kaskade: {CASCADE_MODEL} fehlgeschlagen, eskaliere an {SPAM_MODEL}: {e}")
+        result_text = ""
+    
+    if len(mails) == 1:
+        parsed = parse_json_verdict(result_text)
+        parsed = [parsed] if parsed is not None else None
+    else:
+        parsed = parse_batch_verdicts(result_text, len(mails))
+    
+    verdicts: List[Optional[Tuple[bool, str]]] = [None] * len(mails)
+    for position, (is_spam, confidence, short_reason) in enumerate(parsed or []):
+        if confidence < CASCADE_CONFIDENCE:
+            continue
+        reason = f"{'SPAM' if is_spam else 'HAM'} ({confidence:.0%}, {CASCADE_MODEL}): {short_reason}"
+        remember_verdict(*mails[position], is_spam, reason, model=CASCADE_MODEL)
+        verdicts[position] = (is_spam, reason)
+    
+    decided = sum(1 for verdict in verdicts if verdict is not None)
+    record_cascade_stage('fast', len(mails), decided, time.monotonic() - started)
+    logging.debug(f"Kaskade: {decided}/{len(mails)} E-Mail(s) von {CASCADE_MODEL} entschieden")
+    return verdicts
+
+def classify_single_with_llm(sender: str, subject: str, body: str) -> Tuple[Optional[bool], str]:
+    """
+    STUFE 3: LLM-Analyse einer einzelnen E-Mail.
+    
+    Args:
+        sender: Absender-E-Mail
+        subject: E-Mail-Betreff
+        body: E-Mail-Body (Preview)
+    
+    Returns:
+        Tuple[Optional[bool], str]: (is_spam, reason), is_spam None = zurückgestellt
+    """
+    # JSON-Modus: Strukturierte Antwort per Schema statt Freitext
+    structured = OLLAMA_OUTPUT_FORMAT == 'json'
+    
+    # Prompt-Design aus Benchmark übernommen (statische Anweisung vorne, E-Mail-Felder am Ende)
+    prompt = build_prompt(sender, subject, prompt_body(body), structured)
+    
+    timeout = OLLAMA_TIMEOUT_MAX  # Obergrenze, adaptiv kürzer (OLLAMA_ADAPTIVE_TIMEOUT)
+    payload = build_llm_payload(
+        prompt, JSON_NUM_PREDICT if structured else 150, schema=VERDICT_SCHEMA if structured else None
+    )
+    
+    try:
+        # Über den gemeinsamen Dispatcher (begrenzt parallele Anfragen aller Accounts)
+        result_text = classify_with_llm(payload, timeout).strip()
+    except Exception as e:
+        return llm_error_verdict(e)
+    
+    parsed = parse_json_verdict(result_text) if structured else None
+    
+    if parsed is not None:
+        is_spam, confidence, short_reason = parsed
+        clean_reason = f"{'SPAM' if is_spam else 'HAM'} ({confidence:.0%}): {short_reason}"
+    else:
+        if structured:
+            logging.warning(f"Ungültige JSON-Antwort, werte als Text aus: {result_text[:100]}")
+        
+        # Bestimme Spam-Status (erstes alleinstehendes SPAM/HAM, sonst "SPAM" irgendwo im Text)
+        is_spam = parse_verdict(result_text)
+        
+        # Bereinige den Text für das Log (entferne Newlines)
+        clean_reason = result_text.replace("\n", " ").strip()
+    
+    # Nur echte LLM-Entscheidungen cachen (keine Timeouts/Fehler)
+    remember_verdict(sender, subject, body, is_spam, clean_reason)
+    return is_spam, clean_reason
+
+def classify_batch_with_llm(mails: List[Tuple[str, str, str]]) -> List[Tuple[Optional[bool], str]]:
+    """
+    STUFE 3 im Batch-Modus: Mehrere E-Mails in einer LLM-Anfrage.
+    
+    Die Antwort ist ein JSON-Array (ein Verdict pro E-Mail). Ist sie
+    ungültig oder unvollständig, wird jede E-Mail einzeln klassifiziert.
+    
+    Args:
+        mails: Liste von (sender, subject, body)
+    
+    Returns:
+        Liste von (is_spam, reason) in Eingabe-Reihenfolge
+    """
+    if len(mails) == 1:
+        return [classify_single_with_llm(*mails[0])]
+    
+    payload = build_llm_payload(build_batch_prompt(mails), JSON_NUM_PREDICT * len(mails), schema=batch_schema(len(mails)))
+    timeout = OLLAMA_TIMEOUT_MAX + 30 * len(mails)
+    
+    try:
+        result_text = classify_with_llm(payload, timeout, mails=len(mails)).strip()
+    except Exception as e:
+        error_verdict = llm_error_verdict(e)
+        return [error_verdict] * len(mails)
+    
+    parsed = parse_batch_verdicts(result_text, len(mails))
+    
+    with _batch_stats_lock:
+        batch_stats['requests'] += 1
+        batch_stats['mails'] += len(mails)
+        if parsed is None:
+            batch_stats['fallbacks'] += 1
+    
+    if parsed is None:
+        logging.warning(
+            f"Ungültige Batch-Antwort für {len(mails)} E-Mails, klassifiziere einzeln: {result_text[:100]}"
+        )
+        return [classify_single_with_llm(*mail) for mail in mails]
+    
+    results = []
+    for (sender, subject, body), (is_spam, confidence, short_reason) in zip(mails, parsed):
+        clean_reason = f"{'SPAM' if is_spam else 'HAM'} ({confidence:.0%}): {short_reason}"
+        remember_verdict(sender, subject, body, is_spam, clean_reason)
+        results.append((is_spam, clean_reason))
+    return results
+
+def detect_spam(sender: str, subject: str, body: str, sender_ip: Optional[str] = None) -> Tuple[Optional[bool], str]:
     """
     Analysiert E-Mail mit 3-stufigem Ansatz:
     1. Whitelist-Check (höchste Priorität) → kein Spam
-    2. Blacklist-Check → Spam
+    2. Blacklist-Check (Absender und einliefernde IP) → Spam
     3. LLM-Analyse via qwen2.5:14b-instruct (falls nicht in Listen)
     
     Args:
         sender: Absender-E-Mail
         subject: E-Mail-Betreff
         body: E-Mail-Body (Preview, max 500 Zeichen)
-        
+        sender_ip: IP des ersten externen Hops (Received-Header), optional
+                
     Returns:
-        Tuple[bool, str]: (is_spam, reason)
+        Tuple[Optional[bool], str]: (is_spam, reason), is_spam None = zurückgestellt
     """
-    # ============================================
-    # STUFE 1 & 2: Whitelist/Blacklist Check (Hard Filter)
-    # ============================================
+    known = lookup_known_verdict(sender, subject, body, sender_ip)
+    if known is not None:
+        return known
     
-    list_manager = init_list_manager()
+    local = classify_with_local_model([(sender, subject, body)])[0]
+    if local is not None:
+        return local
     
-    if list_manager:
-        # Prüfe E-Mail gegen Listen
-        is_spam_by_list, list_reason = list_manager.check_email(sender)
-        
-        if is_spam_by_list is not None:
-            # E-Mail wurde in Liste gefunden (Whitelist oder Blacklist)
-            logging.info(f"Hard Filter: {sender} → {list_reason}")
-            return is_spam_by_list, list_reason
-        
-        # E-Mail nicht in Listen → LLM-Analyse durchführen
-        logging.debug(f"E-Mail nicht in Listen gefunden, führe LLM-Analyse durch: {sender}")
+    neighbours = classify_with_embeddings([(sender, subject, body)])[0]
+    if neighbours is not None:
+        return neighbours
     
-    # ============================================
-    # STUFE 3: LLM-basierte Spam-Erkennung
-    # ============================================
+    if not CASCADE_MODEL:
+        return classify_single_with_llm(sender, subject, body)
     
-    # Prompt-Design aus Benchmark übernommen (optimiert für Ministral/Qwen)
-    prompt = (
-        f"Klassifiziere diese E-Mail als SPAM oder HAM. "
-        f"Antworte NUR mit 'SPAM' oder 'HAM' und einer kurzen Begründung (max 15 Wörter).\n\n"
-        f"Von: {sender}\n"
-        f"Betreff: {subject}\n"
-        f"Inhalt: {body[:1000]}"  # Mehr Kontext als vorher (500 -> 1000)
-    )
+    # Modell-Kaskade: kleines Modell zuerst, nur unsichere E-Mails an SPAM_MODEL
+    fast = classify_fast_with_llm([(sender, subject, body)])[0]
+    if fast is not None:
+        return fast
     
-    # Konfiguration analog zum Benchmark
-    # Standardmäßig kein "Thinking" für maximale Geschwindigkeit im Produktivbetrieb
-    use_thinking = False 
-    num_predict = 2000 if use_thinking else 150
-    timeout = 120  # Erhöht von 30s auf 120s für Stabilität
-    
-    payload = {
-        "model": SPAM_MODEL,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0.1,
-            "num_predict": num_predict
-        }
-    }
+    started = time.monotonic()
+    verdict = classify_single_with_llm(sender, subject, body)
+    record_cascade_stage('large', 1, int(verdict[0] is not None), time.monotonic() - started)
+    return verdict
+
+def detect_spam_batch(mails: List[Tuple[str, str, str]],
+                      sender_ips: Optional[List[Optional[str]]] = None) -> List[Tuple[Optional[bool], str]]:
+    """
+    Wie detect_spam, aber für mehrere E-Mails: Listen, Cache und SimHash
+    werden pro E-Mail geprüft, alle übrigen gehen gemeinsam an das LLM.
     
-    # Ministral-Optimierung: Lightweight System-Prompt
-    # Reduziert Input-Tokens von ~600 auf ~50 und steigert Effizienz
-    if "ministral" in SPAM_MODEL.lower():
-        payload["system"] = (
-            f"You are an intelligent Spam Detection System. "
-            f"Analyze the email content and metadata critically. "
-            f"Legitimate emails (HAM) can come from unknown senders. "
-            f"Only mark as SPAM if there are clear indicators like phishing, scams, unsolicited offers, or malicious content. "
-            f"The current date is {datetime.now().strftime('%Y-%m-%d')}."
-        )
-        
-    # Deaktiviere Thinking explizit, falls nicht gewünscht
-    if not use_thinking:
-        payload["think"] = False
+    Args:
+        mails: Liste von (sender, subject, body)
+        sender_ips: IP des ersten externen Hops pro E-Mail, optional
     
-    try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=timeout)
-        response.raise_for_status()
-        
-        # Parse Ollama JSON-Response
-        result_json = response.json()
-        result_text = result_json.get("response", "").strip()
-        
-        # Bestimme Spam-Status
-        # Suche nach "SPAM" im gesamten Antworttext, da Benchmark-Prompt Begründung enthält
-        is_spam = "SPAM" in result_text.upper()
-        
-        # Bereinige den Text für das Log (entferne Newlines)
-        clean_reason = result_text.replace("\n", " ").strip()
-        
-        return is_spam, clean_reason
-        
-    except requests.Timeout:
-        logging.warning("LLM-Request timeout, behandle als HAM")
-        return False, "LLM Timeout (als HAM behandelt)"
-    except requests.ConnectionError:
-        logging.error("Ollama nicht erreichbar - ist 'ollama serve' aktiv?")
-        print("\n⚠️  Ollama nicht erreichbar!")
-        print("   Starte in anderem Terminal: ollama serve")
-        return False, "Ollama offline (als HAM behandelt)"
-    except Exception as e:
-        logging.error(f"LLM-Fehler: {e}", exc_info=True)
-        return False, f"Fehler: {str(e)}"
+    Returns:
+        Liste von (is_spam, reason) in Eingabe-Reihenfolge
+    """
+    sender_ips = sender_ips or [None] * len(mails)
+    results: List[Optional[Tuple[bool, str]]] = [
+        lookup_known_verdict(*mail, sender_ip=sender_ip) for mail, sender_ip in zip(mails, sender_ips)
+    ]
+    open_positions = [i for i, result in enumerate(results) if result is None]
+    
+    # Lokaler Vor-Klassifikator und Embedding-kNN (jeweils ein Durchlauf für alle offenen E-Mails)
+    for classify in (classify_with_local_model, classify_with_embeddings):
+        if open_positions:
+            verdicts = classify([mails[i] for i in open_positions])
+            for position, verdict in zip(open_positions, verdicts):
+                results[position] = verdict
+            open_positions = [i for i, result in enumerate(results) if result is None]
+    
+    # Modell-Kaskade: kleines Modell zuerst, nur unsichere E-Mails an SPAM_MODEL
+    if CASCADE_MODEL and open_positions:
+        verdicts = classify_fast_with_llm([mails[i] for i in open_positions])
+        for position, verdict in zip(open_positions, verdicts):
+            results[position] = verdict
+        open_positions = [i for i, result in enumerate(results) if result is None]
+    
+    if open_positions:
+        started = time.monotonic()
+        verdicts = classify_batch_with_llm([mails[i] for i in open_positions])
+        for position, verdict in zip(open_positions, verdicts):
+            results[position] = verdict
+        if CASCADE_MODEL:
+            decided = sum(1 for is_spam, _ in verdicts if is_spam is not None)
+            record_cascade_stage('large', len(open_positions), decided, time.monotonic() - started)
+    
+    return results
 
 # ============================================
 # E-Mail-Verarbeitung
@@ -301,7 +1107,10 @@ def decode_header_safe(header_value: str) -> str:
 
 def extract_body_preview(msg: email.message.Message) -> str:
     """
-    Extrahiert Body-Vorschau aus E-Mail (max 500 Zeichen).
+    Extrahiert Body-Vorschau aus E-Mail.
+    
+    Mit BODY_CLEANUP wird der Body bereinigt (Zitate, Signaturen, URLs,
+    Leerzeichen) und auf BODY_TOKEN_BUDGET Tokens gekürzt, sonst auf 500 Zeichen.
     
     Args:
         msg: E-Mail-Message-Objekt
@@ -310,6 +1119,7 @@ def extract_body_preview(msg: email.message.Message) -> str:
         str: Body-Preview (text/plain bevorzugt)
     """
     body = ""
+    preview_chars = MAX_INPUT_CHARS if BODY_CLEANUP else 500
     
     try:
         if msg.is_multipart():
@@ -319,149 +1129,505 @@ def extract_body_preview(msg: email.message.Message) -> str:
                 if content_type == "text/plain":
                     payload = part.get_payload(decode=True)
                     if payload:
-                        body = payload.decode('utf-8', errors='ignore')[:500]
+                        body = payload.decode('utf-8', errors='ignore')[:preview_chars]
                         break
         else:
             # Einfache Nachricht
             payload = msg.get_payload(decode=True)
             if payload:
-                body = payload.decode('utf-8', errors='ignore')[:500]
+                body = payload.decode('utf-8', errors='ignore')[:preview_chars]
     except Exception as e:
         logging.warning(f"Body-Extraktion fehlgeschlagen: {e}")
-        body = "[Body konnte nicht dekodiert werden]"
+        return "[Body konnte nicht dekodiert werden]"
+    
+    if body and BODY_CLEANUP:
+        stats = new_cleanup_stats()
+        body = clean_body(body, BODY_TOKEN_BUDGET, stats)
+        with _cleanup_stats_lock:
+            for key, value in stats.items():
+                cleanup_stats[key] += value
     
     return body if body else "[Leerer Body]"
 
-def process_inbox(account: Dict[str, str]) -> Dict[str, any]:
+def classify_message(msg: email.message.Message) -> Tuple[str, str, Optional[bool], str]:
     """
-    Hauptfunktion: Verarbeitet INBOX und filtert Spam.
+    Extrahiert Metadaten und klassifiziert eine E-Mail (thread-sicher).
+    
+    Args:
+        msg: E-Mail-Message-Objekt
+    
+    Returns:
+        Tuple[str, str, Optional[bool], str]: (sender, subject, is_spam, reason),
+        is_spam None = zurückgestellt (keine LLM-Entscheidung)
+    """
+    sender = email.utils.parseaddr(msg.get('From', ''))[1] or "Unbekannt"
+    subject = decode_header_safe(msg.get('Subject', 'Kein Betreff'))
+    body_preview = extract_body_preview(msg)
+    sender_ip = received_sender_ip(msg)
+    
+    # LLM-Analyse
+    is_spam, reason = detect_spam(sender, subject, body_preview, sender_ip)
+    return sender, subject, is_spam, reason
+
+def classify_messages(msgs: List[email.message.Message]) -> List[Tuple[str, str, Optional[bool], str]]:
+    """
+    Klassifiziert mehrere E-Mails, bei LLM_BATCH_SIZE > 1 mit gemeinsamer LLM-Anfrage.
+    
+    Args:
+        msgs: Liste von E-Mail-Message-Objekten
+    
+    Returns:
+        Liste von (sender, subject, is_spam, reason) in Eingabe-Reihenfolge
+    """
+    if len(msgs) == 1:
+        return [classify_message(msgs[0])]
+    
+    mails = [
+        (
+            email.utils.parseaddr(msg.get('From', ''))[1] or "Unbekannt",
+            decode_header_safe(msg.get('Subject', 'Kein Betreff')),
+            extract_body_preview(msg)
+        )
+        for msg in msgs
+    ]
+    verdicts = detect_spam_batch(mails, [received_sender_ip(msg) for msg in msgs])
+    return [
+        (sender, subject, is_spam, reason)
+        for (sender, subject, _), (is_spam, reason) in zip(mails, verdicts)
+    ]
+
+def process_mailbox(mail: imaplib.IMAP4, account: Dict[str, str],
+                    checkpoint_store: Optional[CheckpointStore] = None) -> Dict[str, any]:
+    """
+    Verarbeitet die INBOX einer bestehenden IMAP-Verbindung und filtert Spam.
+    
+    Wird vom Batch-Lauf (process_inbox) und vom Daemon (daemon.py) genutzt.
+    Verbindungsaufbau und Logout übernimmt der Aufrufer.
     
     Args:
+        mail: Verbundenes IMAP-Objekt (INBOX selektiert)
         account: Account-Konfiguration
+        checkpoint_store: Optionaler CheckpointStore (Standard: globale Instanz)
     
     Returns:
-        Dict mit Statistiken: {'spam': int, 'ham': int, 'spam_senders': list}
+        Dict mit Statistiken: {'spam': int, 'ham': int, 'spam_senders': list, 'fetch': dict, 'actions': dict}
     """
-    try:
-        mail = connect_imap(account)
-    except Exception as e:
-        logging.error(f"Verbindung zu {account['name']} fehlgeschlagen: {e}")
-        print(f"\n⚠️  Überspringe {account['name']} (Verbindung fehlgeschlagen)\n")
-        return {'spam': 0, 'ham': 0, 'spam_senders': [], 'error': True}
+    fetch_stats = new_fetch_stats()
+    action_stats = new_action_stats()
+    stats = {
+        'spam': 0, 'ham': 0, 'deferred': 0, 'spam_senders': [], 'fetch': fetch_stats,
+        'actions': action_stats, 'error': False
+    }
     
-    stats = {'spam': 0, 'ham': 0, 'spam_senders': [], 'error': False}
+    # Checkpoint: Bei Folgeläufen nur E-Mails oberhalb der zuletzt verarbeiteten UID
+    checkpoint_store = checkpoint_store or init_checkpoint_store()
+    cp_key = checkpoint_key(account)
+    uidvalidity = get_uidvalidity(mail) if checkpoint_store else None
+    last_uid = checkpoint_store.get_last_uid(cp_key, uidvalidity) if checkpoint_store else None
+    uid_range = f'UID {last_uid + 1}:* ' if last_uid is not None else ''
     
-    try:
-        # Suche E-Mails basierend auf Filter-Modus
-        if FILTER_MODE == 'days':
-            # Berechne Datum für IMAP-Suche
-            since_date = datetime.now() - timedelta(days=DAYS_BACK)
-            date_str = since_date.strftime('%d-%b-%Y')  # Format: "19-Nov-2025"
-            
-            print(f"\n🔍 Suche E-Mails seit {date_str} (letzte {DAYS_BACK} Tage)...")
-            status, data = mail.search(None, f'(SINCE {date_str})')
-            
-            if status != 'OK':
-                logging.error("IMAP SEARCH fehlgeschlagen")
-                print("❌ E-Mail-Suche fehlgeschlagen")
-                return stats
-            
-            email_ids = data[0].split()
-            
-        else:  # FILTER_MODE == 'count'
-            print(f"\n🔍 Suche letzte {LIMIT} E-Mails...")
-            status, data = mail.search(None, 'ALL')
-            
-            if status != 'OK':
-                logging.error("IMAP SEARCH fehlgeschlagen")
-                print("❌ E-Mail-Suche fehlgeschlagen")
-                return stats
-            
-            email_ids = data[0].split()
-            
-            # Limit anwenden (neueste E-Mails = höchste IDs)
-            email_ids = email_ids[-LIMIT:] if len(email_ids) > LIMIT else email_ids
+    if last_uid is not None:
+        print(f"\n📌 Checkpoint gefunden: verarbeite nur E-Mails nach UID {last_uid}")
+    
+    # Suche E-Mails basierend auf Filter-Modus
+    if FILTER_MODE == 'days':
+        # Berechne Datum für IMAP-Suche
+        since_date = datetime.now() - timedelta(days=DAYS_BACK)
+        date_str = since_date.strftime('%d-%b-%Y')  # Format: "19-Nov-2025"
         
-        if not email_ids:
-            if FILTER_MODE == 'days':
-                print(f"✅ Keine E-Mails in den letzten {DAYS_BACK} Tagen gefunden!")
-            else:
-                print("✅ Keine E-Mails gefunden!")
+        print(f"\n🔍 Suche E-Mails seit {date_str} (letzte {DAYS_BACK} Tage)...")
+        status, data = mail.uid('SEARCH', None, f'({uid_range}SINCE {date_str})')
+        
+        if status != 'OK':
+            logging.error("IMAP SEARCH fehlgeschlagen")
+            print("❌ E-Mail-Suche fehlgeschlagen")
             return stats
         
-        print(f"📧 Analysiere {len(email_ids)} E-Mail(s)...\n")
+        email_ids = data[0].split()
         
-        # Verarbeite E-Mails mit Progress-Bar
-        for email_id in tqdm(email_ids, desc="Verarbeite E-Mails", unit="mail"):
-            try:
-                # Hole E-Mail
-                status, msg_data = mail.fetch(email_id, '(RFC822)')
-                if status != 'OK':
-                    logging.error(f"Fetch fehlgeschlagen für ID {email_id}")
-                    continue
+    else:  # FILTER_MODE == 'count'
+        print(f"\n🔍 Suche letzte {LIMIT} E-Mails...")
+        status, data = mail.uid('SEARCH', None, uid_range.strip() or 'ALL')
+        
+        if status != 'OK':
+            logging.error("IMAP SEARCH fehlgeschlagen")
+            print("❌ E-Mail-Suche fehlgeschlagen")
+            return stats
+        
+        email_ids = data[0].split()
+    
+    if last_uid is not None:
+        # "UID n+1:*" liefert immer mindestens die höchste UID → nachfiltern
+        email_ids = filter_new_uids(email_ids, last_uid)
+    
+    if FILTER_MODE != 'days':
+        # Limit anwenden: ohne Checkpoint die neuesten, mit Checkpoint die ältesten neuen E-Mails
+        found = len(email_ids)
+        email_ids = limit_uids(email_ids, LIMIT, resume=last_uid is not None)
+        if len(email_ids) < found and last_uid is not None:
+            print(f"ℹ️  {found - len(email_ids)} weitere neue E-Mail(s) folgen im nächsten Lauf (LIMIT={LIMIT})")
+    
+    if not email_ids:
+        if last_uid is not None:
+            print("✅ Keine neuen E-Mails seit dem letzten Lauf!")
+        elif FILTER_MODE == 'days':
+            print(f"✅ Keine E-Mails in den letzten {DAYS_BACK} Tagen gefunden!")
+        else:
+            print("✅ Keine E-Mails gefunden!")
+        return stats
+    
+    print(f"📧 Analysiere {len(email_ids)} E-Mail(s)...\n")
+    
+    # Hole E-Mails gebündelt (ein UID FETCH pro Chunk) und verarbeite sie mit Progress-Bar
+    messages = fetch_messages(
+        mail, email_ids, chunk_size=FETCH_CHUNK_SIZE, stats=fetch_stats,
+        mode=FETCH_MODE, body_bytes=FETCH_BODY_BYTES
+    )
+    
+    # Aktionen werden gesammelt und alle ACTION_BATCH_SIZE Entscheidungen ausgeführt.
+    # Der Checkpoint wird erst nach erfolgreicher Ausführung fortgeschrieben.
+    def advance_checkpoint(uid: int) -> None:
+        if checkpoint_store:
+            checkpoint_store.update(cp_key, uidvalidity, uid)
+    
+    actions = MailActions(
+        mail, account['spam_folder'], batch_size=ACTION_BATCH_SIZE,
+        stats=action_stats, on_flush=advance_checkpoint
+    )
+    
+    def apply_result(email_id: bytes, result: Tuple[str, str, Optional[bool], str]) -> None:
+        """Wendet das Ergebnis einer Klassifizierung an (in Original-Reihenfolge)."""
+        try:
+            sender, subject, is_spam, reason = result
+            
+            # Ausgabe
+            print(f"\n📧 Von: {sender}")
+            print(f"   Betreff: {subject[:60]}{'...' if len(subject) > 60 else ''}")
+            
+            if is_spam is None:
+                print(f"   ⏸️  ZURÜCKGESTELLT: {reason[:100]}")
                 
-                # Parse E-Mail
-                msg = email.message_from_bytes(msg_data[0][1])
+                # Keine Aktion: bleibt ungelesen, nächster Lauf prüft erneut
+                actions.defer(email_id)
+                logging.info(f"Zurückgestellt: {subject} von {sender} ({account['name']}): {reason}")
                 
-                # Extrahiere Metadaten
-                sender = email.utils.parseaddr(msg.get('From', ''))[1] or "Unbekannt"
-                subject = decode_header_safe(msg.get('Subject', 'Kein Betreff'))
-                body_preview = extract_body_preview(msg)
+                stats['deferred'] += 1
+            elif is_spam:
+                print(f"   ❌ SPAM: {reason[:100]}")
                 
-                # Ausgabe
-                print(f"\n📧 Von: {sender}")
-                print(f"   Betreff: {subject[:60]}{'...' if len(subject) > 60 else ''}")
+                # Zum Verschieben in den Spam-Ordner vormerken
+                actions.move_to_spam(email_id)
+                logging.info(f"SPAM erkannt: {subject} von {sender} ({account['name']})")
                 
-                # LLM-Analyse
-                is_spam, reason = detect_spam(sender, subject, body_preview)
+                # Sammle Absender für Übersicht
+                stats['spam_senders'].append({
+                    'email': sender,
+                    'subject': subject,
+                    'reason': reason
+                })
                 
-                if is_spam:
-                    print(f"   ❌ SPAM: {reason[:100]}")
-                    
-                    # Verschiebe zu Spam-Ordner
-                    try:
-                        mail.copy(email_id, account['spam_folder'])
-                        mail.store(email_id, '+FLAGS', '\\Deleted')
-                        logging.info(f"SPAM verschoben: {subject} von {sender} ({account['name']})")
-                        
-                        # Sammle Absender für Übersicht
-                        stats['spam_senders'].append({
-                            'email': sender,
-                            'subject': subject,
-                            'reason': reason
-                        })
-                    except Exception as e:
-                        logging.error(f"Spam-Verschiebung fehlgeschlagen: {e}")
-                        print(f"   ⚠️  Verschiebung fehlgeschlagen: {e}")
-                    
-                    stats['spam'] += 1
-                else:
-                    print(f"   ✅ HAM: {reason[:100]}")
-                    
-                    # Markiere als gelesen
-                    mail.store(email_id, '+FLAGS', '\\Seen')
-                    logging.info(f"HAM behalten: {subject} ({account['name']})")
-                    
-                    stats['ham'] += 1
-                    
-            except Exception as e:
-                logging.error(f"Fehler bei E-Mail ID {email_id}: {e}", exc_info=True)
-                print(f"\n⚠️  Fehler bei dieser E-Mail: {e}")
-                continue
+                stats['spam'] += 1
+            else:
+                print(f"   ✅ HAM: {reason[:100]}")
+                
+                # Zum Markieren als gelesen vormerken
+                actions.mark_seen(email_id)
+                logging.info(f"HAM behalten: {subject} ({account['name']})")
+                
+                stats['ham'] += 1
+                
+        except Exception as e:
+            logging.error(f"Fehler bei E-Mail UID {email_id}: {e}", exc_info=True)
+            print(f"\n⚠️  Fehler bei dieser E-Mail, zurückgestellt: {e}")
+            actions.defer(email_id)
+            stats['deferred'] += 1
+    
+    def apply_results(email_ids: List[bytes], future) -> None:
+        """Wartet auf einen Batch und wendet dessen Ergebnisse an."""
+        try:
+            results = future.result()
+        except Exception as e:
+            for email_id in email_ids:
+                logging.error(f"Fehler bei E-Mail UID {email_id}: {e}", exc_info=True)
+                actions.defer(email_id)
+                stats['deferred'] += 1
+            print(f"\n⚠️  Fehler bei {len(email_ids)} E-Mail(s), zurückgestellt: {e}")
+            return
         
-        return stats
+        for email_id, result in zip(email_ids, results):
+            apply_result(email_id, result)
+    
+    # Klassifizierung: bis zu CLASSIFY_IN_FLIGHT Anfragen gleichzeitig, während
+    # die Fetch-Stufe bereits die nächsten E-Mails liefert. Bei LLM_BATCH_SIZE > 1
+    # werden jeweils so viele E-Mails zu einer Anfrage zusammengefasst.
+    in_flight = max(1, CLASSIFY_IN_FLIGHT)
+    batch_size = max(1, LLM_BATCH_SIZE)
+    pending = deque()
+    batch_ids, batch_msgs = [], []
+    executor = ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix="classify")
+    started = time.monotonic()
+    
+    def submit_batch() -> None:
+        pending.append((list(batch_ids), executor.submit(classify_messages, list(batch_msgs))))
+        batch_ids.clear()
+        batch_msgs.clear()
+    
+    try:
+        for email_id, msg in tqdm(messages, total=len(email_ids), desc="Verarbeite E-Mails", unit="mail"):
+            if msg is None:
+                # Nicht geholt: zurückstellen, damit der Checkpoint unter dieser UID bleibt
+                actions.defer(email_id)
+                stats['deferred'] += 1
+                continue
+            
+            batch_ids.append(email_id)
+            batch_msgs.append(msg)
+            if len(batch_msgs) >= batch_size:
+                submit_batch()
+            
+            # Fenster voll → ältesten Batch abwarten und anwenden
+            if len(pending) >= in_flight:
+                apply_results(*pending.popleft())
         
+        if batch_msgs:
+            submit_batch()
+        while pending:
+            apply_results(*pending.popleft())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    elapsed = time.monotonic() - started
+    classified = stats['spam'] + stats['ham']
+    if stats['deferred']:
+        print(f"\n⏸️  {stats['deferred']} E-Mail(s) zurückgestellt (bleiben ungelesen, nächster Lauf prüft erneut)")
+        logging.warning(f"{stats['deferred']} E-Mail(s) zurückgestellt ({account['name']})")
+    if classified and elapsed > 0:
+        print(f"\n⚡ Durchsatz: {classified / elapsed:.2f} E-Mails/s ({in_flight} parallel, Batch {batch_size})")
+        logging.info(
+            f"Klassifizierung ({account['name']}): {classified} E-Mails in {elapsed:.1f}s "
+            f"({classified / elapsed:.2f}/s, {in_flight} parallel, Batch {batch_size})"
+        )
+    
+    # Restliche Aktionen ausführen (schreibt auch den Checkpoint fort)
+    actions.flush()
+    
+    # Neue Fingerprints sichern (auch im Daemon nach jedem Durchlauf)
+    simhash_index = init_simhash_index()
+    if simhash_index is not None:
+        simhash_index.save()
+    
+    # Neue LLM-Entscheidungen gebündelt lernen und Modell sichern
+    local_classifier = init_local_classifier()
+    if local_classifier is not None:
+        trained = local_classifier.train_pending()
+        local_classifier.save()
+        if trained:
+            logging.info(f"Lokaler Klassifikator ({account['name']}): {trained} E-Mail(s) gelernt")
+    
+    # Neue Embedding-Vektoren an den Index anhängen
+    embedding_index = init_embedding_index()
+    if embedding_index is not None:
+        appended = embedding_index.flush()
+        if appended:
+            logging.info(f"Embedding-Index ({account['name']}): {appended} Vektor(en) angehängt")
+    
+    logging.info(
+        f"IMAP-Aktionen ({account['name']}): {action_stats['moved']} verschoben, "
+        f"{action_stats['seen']} als gelesen markiert, {action_stats['deferred']} zurückgestellt, "
+        f"{action_stats['commands']} Kommandos, "
+        f"{action_stats['failed']} fehlgeschlagen"
+    )
+    
+    # Fetch-Statistik
+    saved = saved_round_trips(fetch_stats)
+    print(
+        f"\n📡 IMAP-Fetch ({FETCH_MODE}): {fetch_stats['messages']} E-Mail(s) in "
+        f"{fetch_stats['round_trips']} Roundtrip(s) ({saved} gespart, {fetch_stats['bytes'] / 1024:.0f} KB)"
+    )
+    logging.info(
+        f"IMAP-Fetch ({account['name']}, {FETCH_MODE}): {fetch_stats['messages']} E-Mails, "
+        f"{fetch_stats['round_trips']} Roundtrips, {saved} gespart, {fetch_stats['missing']} fehlend, "
+        f"{fetch_stats['bytes']} Bytes"
+    )
+    
+    return stats
+
+
+def failed_account_stats() -> Dict[str, any]:
+    """Erzeugt leere Statistik für einen fehlgeschlagenen Account."""
+    return {
+        'spam': 0, 'ham': 0, 'deferred': 0, 'spam_senders': [], 'fetch': new_fetch_stats(),
+        'actions': new_action_stats(), 'error': True
+    }
+
+def process_inbox(account: Dict[str, str]) -> Dict[str, any]:
+    """
+    Hauptfunktion: Verarbeitet INBOX und filtert Spam.
+    
+    Args:
+        account: Account-Konfiguration
+    
+    Returns:
+        Dict mit Statistiken: {'spam': int, 'ham': int, 'spam_senders': list, 'fetch': dict, 'actions': dict}
+    """
+    try:
+        mail = connect_imap(account)
+    except Exception as e:
+        logging.error(f"Verbindung zu {account['name']} fehlgeschlagen: {e}")
+        print(f"\n⚠️  Überspringe {account['name']} (Verbindung fehlgeschlagen)\n")
+        return failed_account_stats()
+    
+    try:
+        return process_mailbox(mail, account)
     finally:
         # Cleanup
         try:
             print("\n🧹 Räume auf...")
-            mail.expunge()  # Lösche markierte E-Mails
             mail.logout()
             print("✅ IMAP-Verbindung geschlossen")
             
         except Exception as e:
             logging.error(f"Logout fehlgeschlagen: {e}", exc_info=True)
 
+def process_account(idx: int, account: Dict[str, str]) -> Dict[str, any]:
+    """
+    Verarbeitet einen Account isoliert (läuft ggf. in einem Worker-Thread).
+    
+    Unerwartete Fehler betreffen nur diesen Account und werden als
+    fehlgeschlagener Account gezählt.
+    
+    Args:
+        idx: Laufende Nummer des Accounts (für die Ausgabe)
+        account: Account-Konfiguration
+    
+    Returns:
+        Dict mit Statistiken (siehe process_inbox)
+    """
+    print("\n" + "─"*60)
+    print(f"📬 Account {idx}/{len(EMAIL_ACCOUNTS)}: {account['name']}")
+    print(f"   Server: {account['server']}")
+    print("─"*60)
+    
+    try:
+        stats = process_inbox(account)
+    except Exception as e:
+        logging.error(f"Fehler bei Account {account['name']}: {e}", exc_info=True)
+        print(f"\n⚠️  Account {account['name']} abgebrochen: {e}\n")
+        return failed_account_stats()
+    
+    # Account-Statistik
+    account_total = stats['spam'] + stats['ham']
+    if account_total > 0:
+        spam_rate = (stats['spam'] / account_total) * 100
+        print(f"\n   📊 {account['name']}: {account_total} E-Mails ({stats['spam']} SPAM, {stats['ham']} HAM, {spam_rate:.1f}% Spam-Rate)")
+    if stats['deferred']:
+        print(f"   ⏸️  {account['name']}: {stats['deferred']} E-Mail(s) zurückgestellt")
+    
+    return stats
+
+# ============================================
+# Ollama-Check
+# ============================================
+
+def check_ollama() -> bool:
+    """
+    Prüft alle Ollama-Hosts und Modelle, lädt die Modelle vor (Warm-up).
+    
+    Nicht erreichbare Hosts werden übersprungen (Circuit Breaker offen),
+    Hosts ohne ein Modell erhalten keine Anfragen für dieses Modell.
+    
+    Returns:
+        bool: False wenn kein Host erreichbar ist oder ein Modell auf keinem Host fehlt (Abbruch), sonst True
+    """
+    # Prüfe Ollama-Verfügbarkeit (Health-Check pro Host)
+    print("🔍 Prüfe Ollama-Verfügbarkeit...")
+    dispatcher = init_ollama_dispatcher()
+    reachable = []
+    
+    for host in dispatcher.hosts:
+        if host.refresh_models(timeout=3):
+            reachable.append(host)
+            if host.models is None:
+                print(f"⚠️  Ollama ({host.name}) antwortet nicht wie erwartet")
+            else:
+                print(f"✅ Ollama läuft ({host.name}, {len(host.models)} Modelle)")
+        else:
+            print(f"❌ Ollama nicht erreichbar: {host.name}")
+    
+    if not reachable:
+        print("❌ Ollama nicht erreichbar!")
+        print("   Starte in anderem Terminal: ollama serve")
+        print("   (Oder als Dienst: brew services start ollama)")
+        print("   Details: docs/SETUP.md → Abschnitt 'Ollama einrichten'")
+        print("\n⏹️  Script wird abgebrochen - keine E-Mails verarbeitet.\n")
+        logging.error("Ollama nicht erreichbar - Script abgebrochen")
+        return False
+    
+    if len(reachable) < len(dispatcher.hosts):
+        print(f"⚠️  Nur {len(reachable)}/{len(dispatcher.hosts)} Ollama-Host(s) erreichbar, Failover aktiv")
+    
+    # Kaskade: kleines Modell zuerst, SPAM_MODEL für unsichere E-Mails
+    models = [CASCADE_MODEL, SPAM_MODEL] if CASCADE_MODEL else [SPAM_MODEL]
+    
+    for model in models:
+        # Prüfe ob Modell verfügbar ist
+        print(f"🔍 Prüfe LLM-Modell '{model}'...")
+        hosts = [host for host in reachable if host.has_model(model)]
+        
+        if len(hosts) == len(reachable):
+            print(f"✅ Modell '{model}' ist verfügbar")
+        elif hosts:
+            print(f"⚠️  Modell '{model}' nur auf {len(hosts)}/{len(reachable)} Host(s): {', '.join(host.name for host in hosts)}")
+            logging.warning(f"LLM-Modell {model} nur auf {[host.name for host in hosts]}")
+        else:
+            available_models = sorted(set().union(*(host.models or set() for host in reachable)))
+            print(f"⚠️  Modell '{model}' nicht gefunden!")
+            print(f"   Verfügbare Modelle: {', '.join(available_models) if available_models else 'keine'}")
+            print(f"   Installation: ollama pull {model}")
+            print("\n⏹️  Script wird abgebrochen.\n")
+            logging.error(f"LLM-Modell {model} nicht verfügbar - Script abgebrochen")
+            return False
+    
+    # Embedding-Modell: fehlt es, läuft der Filter ohne kNN weiter
+    if USE_EMBEDDING_KNN:
+        hosts = [host for host in reachable if host.has_model(EMBEDDING_MODEL)]
+        for host in hosts:
+            try:
+                host.client.embed(EMBEDDING_MODEL, [], timeout=60)  # Modell laden
+            except Exception as e:
+                logging.warning(f"Embedding-Modell {EMBEDDING_MODEL} Warmup auf {host.name} fehlgeschlagen: {e}")
+        if hosts:
+            print(f"✅ Embedding-Modell '{EMBEDDING_MODEL}' ist einsatzbereit")
+        else:
+            print(f"⚠️  Embedding-Modell '{EMBEDDING_MODEL}' nicht gefunden (ollama pull {EMBEDDING_MODEL}), kNN ohne Wirkung")
+            logging.warning(f"Embedding-Modell {EMBEDDING_MODEL} nicht verfügbar")
+    
+    for model in models:
+        # Modell vorladen (Warm-up), bleibt per keep_alive im Speicher
+        print(f"🚀 Starte LLM '{model}'...")
+        print("   ⏳ Bitte warten, Modell wird geladen (beim ersten Aufruf kann das etwas dauern)...")
+        
+        for host in reachable:
+            if not host.has_model(model):
+                continue
+            
+            try:
+                host.client.preload(model, timeout=60)  # Längerer Timeout für Modell-Laden
+                print(f"✅ LLM '{model}' ist einsatzbereit ({host.name})")
+                logging.info(f"LLM {model} auf {host.name} erfolgreich initialisiert (keep_alive={OLLAMA_KEEP_ALIVE})")
+                
+            except requests.Timeout:
+                print(f"⚠️  LLM-Initialisierung auf {host.name} dauert zu lange (Timeout)")
+                print("   Das Script läuft weiter, aber LLM-Anfragen könnten langsam sein.")
+                logging.warning(f"LLM Warmup Timeout ({host.name})")
+            except Exception as e:
+                print(f"⚠️  LLM-Test auf {host.name} fehlgeschlagen: {e}")
+                print("   Das Script läuft weiter, aber es könnte zu Problemen kommen.")
+                logging.warning(f"LLM Warmup fehlgeschlagen ({host.name}): {e}")
+        print()
+    
+    return True
+
 # ============================================
 # Main Entry Point
 # ============================================
@@ -473,6 +1639,8 @@ def main():
     print("🤖 LLM-basierter IMAP Spam-Filter (Multi-Account)")
     print("="*60)
     print(f"   Modell: {SPAM_MODEL}")
+    if len(OLLAMA_URLS) > 1:
+        print(f"   Ollama-Hosts: {len(OLLAMA_URLS)} (Lastverteilung nach offenen Anfragen)")
     print(f"   Accounts: {len(EMAIL_ACCOUNTS)}")
     
     if FILTER_MODE == 'days':
@@ -480,83 +1648,55 @@ def main():
     else:
         print(f"   Filter: Letzte {LIMIT} E-Mails pro Account")
     
+    if ACCOUNT_WORKERS > 1 or CLASSIFY_IN_FLIGHT > 1:
+        print(
+            f"   Parallel: {ACCOUNT_WORKERS} Account(s), {CLASSIFY_IN_FLIGHT} Klassifizierung(en) pro Account, "
+            f"max. {OLLAMA_MAX_CONCURRENT} LLM-Anfrage(n) gleichzeitig pro Host"
+        )
+    
+    if LLM_BATCH_SIZE > 1:
+        print(f"   Batch: bis zu {LLM_BATCH_SIZE} E-Mails pro LLM-Anfrage")
+    
+    if CASCADE_MODEL:
+        print(f"   Kaskade: {CASCADE_MODEL} → {SPAM_MODEL} (ab Konfidenz {CASCADE_CONFIDENCE:.2f})")
+    
     print(f"   Log: {log_path}")
     print("="*60 + "\n")
     
     try:
-        # Prüfe Ollama-Verfügbarkeit
-        print("🔍 Prüfe Ollama-Verfügbarkeit...")
-        try:
-            response = requests.get("http://localhost:11434/api/tags", timeout=3)
-            if response.status_code == 200:
-                print("✅ Ollama läuft")
-                
-                # Prüfe ob Modell verfügbar ist
-                print(f"🔍 Prüfe LLM-Modell '{SPAM_MODEL}'...")
-                models_data = response.json()
-                available_models = [model['name'] for model in models_data.get('models', [])]
-                
-                if SPAM_MODEL in available_models:
-                    print(f"✅ Modell '{SPAM_MODEL}' ist verfügbar")
-                else:
-                    print(f"⚠️  Modell '{SPAM_MODEL}' nicht gefunden!")
-                    print(f"   Verfügbare Modelle: {', '.join(available_models) if available_models else 'keine'}")
-                    print(f"   Installation: ollama pull {SPAM_MODEL}")
-                    print("\n⏹️  Script wird abgebrochen.\n")
-                    logging.error(f"LLM-Modell {SPAM_MODEL} nicht verfügbar - Script abgebrochen")
-                    return
-                
-                # Teste LLM mit einfacher Anfrage (Warm-up)
-                print(f"🚀 Starte LLM '{SPAM_MODEL}'...")
-                print("   ⏳ Bitte warten, Modell wird geladen (beim ersten Aufruf kann das etwas dauern)...")
-                
-                try:
-                    warmup_response = requests.post(
-                        OLLAMA_URL,
-                        json={
-                            'model': SPAM_MODEL,
-                            'prompt': 'Test',
-                            'stream': False,
-                            'options': {'num_predict': 1}
-                        },
-                        timeout=60  # Längerer Timeout für Modell-Laden
-                    )
-                    warmup_response.raise_for_status()
-                    print(f"✅ LLM '{SPAM_MODEL}' ist einsatzbereit!\n")
-                    logging.info(f"LLM {SPAM_MODEL} erfolgreich initialisiert")
-                    
-                except requests.Timeout:
-                    print("⚠️  LLM-Initialisierung dauert zu lange (Timeout)")
-                    print("   Das Script läuft weiter, aber LLM-Anfragen könnten langsam sein.\n")
-                    logging.warning("LLM Warmup Timeout")
-                except Exception as e:
-                    print(f"⚠️  LLM-Test fehlgeschlagen: {e}")
-                    print("   Das Script läuft weiter, aber es könnte zu Problemen kommen.\n")
-                    logging.warning(f"LLM Warmup fehlgeschlagen: {e}")
-            else:
-                print("⚠️  Ollama antwortet nicht wie erwartet\n")
-        except requests.ConnectionError:
-            print("❌ Ollama nicht erreichbar!")
-            print("   Starte in anderem Terminal: ollama serve")
-            print("   (Oder als Dienst: brew services start ollama)")
-            print("   Details: docs/SETUP.md → Abschnitt 'Ollama einrichten'")
-            print("\n⏹️  Script wird abgebrochen - keine E-Mails verarbeitet.\n")
-            logging.error("Ollama nicht erreichbar - Script abgebrochen")
+        if not check_ollama():
             return
         
         # Gesamtstatistik
-        total_stats = {'spam': 0, 'ham': 0, 'accounts_processed': 0, 'accounts_failed': 0, 'spam_senders': []}
-        
-        # Verarbeite alle Accounts
-        for idx, account in enumerate(EMAIL_ACCOUNTS, 1):
-            print("\n" + "─"*60)
-            print(f"📬 Account {idx}/{len(EMAIL_ACCOUNTS)}: {account['name']}")
-            print(f"   Server: {account['server']}")
-            print("─"*60)
-            
-            # Verarbeite Account
-            stats = process_inbox(account)
-            
+        total_stats = {
+            'spam': 0, 'ham': 0, 'deferred': 0, 'accounts_processed': 0, 'accounts_failed': 0,
+            'spam_senders': [], 'fetch': new_fetch_stats(), 'actions': new_action_stats()
+        }
+        
+        # Gemeinsame Ressourcen vor dem Start der Worker-Threads initialisieren
+        init_list_manager()
+        init_verdict_cache()
+        init_simhash_index()
+        init_local_classifier()
+        init_embedding_index()
+        init_ollama_dispatcher()
+        
+        # Verarbeite Accounts parallel (ACCOUNT_WORKERS=1 → nacheinander)
+        workers = max(1, min(ACCOUNT_WORKERS, len(EMAIL_ACCOUNTS)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account")
+        futures = [
+            executor.submit(process_account, idx, account)
+            for idx, account in enumerate(EMAIL_ACCOUNTS, 1)
+        ]
+        
+        # Ergebnisse in Account-Reihenfolge zusammenführen
+        # (Gesamtstatistik und Spam-Übersicht wie bei sequenzieller Verarbeitung)
+        try:
+            results = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        for stats in results:
             if stats.get('error', False):
                 total_stats['accounts_failed'] += 1
                 continue
@@ -564,15 +1704,14 @@ def main():
             # Aktualisiere Gesamtstatistik
             total_stats['spam'] += stats['spam']
             total_stats['ham'] += stats['ham']
+            total_stats['deferred'] += stats['deferred']
             total_stats['accounts_processed'] += 1
             if stats.get('spam_senders'):
                 total_stats['spam_senders'].extend(stats['spam_senders'])
-            
-            # Account-Statistik
-            account_total = stats['spam'] + stats['ham']
-            if account_total > 0:
-                spam_rate = (stats['spam'] / account_total) * 100
-                print(f"\n   📊 {account['name']}: {account_total} E-Mails ({stats['spam']} SPAM, {stats['ham']} HAM, {spam_rate:.1f}% Spam-Rate)")
+            for key, value in stats['fetch'].items():
+                total_stats['fetch'][key] += value
+            for key, value in stats['actions'].items():
+                total_stats['actions'][key] += value
         
         # Finale Gesamtstatistik
         total = total_stats['spam'] + total_stats['ham']
@@ -588,10 +1727,137 @@ def main():
         print(f"   ❌ Als SPAM erkannt: {total_stats['spam']}")
         print(f"   ✅ Als HAM erkannt: {total_stats['ham']}")
         
+        if total_stats['deferred'] > 0:
+            print(f"   ⏸️  Zurückgestellt (ohne LLM-Entscheidung): {total_stats['deferred']}")
+        
         if total > 0:
             spam_rate = (total_stats['spam'] / total) * 100
             print(f"   📈 Gesamt-Spam-Rate: {spam_rate:.1f}%")
         
+        if total_stats['fetch']['round_trips'] > 0:
+            print(
+                f"   📡 IMAP-Roundtrips: {total_stats['fetch']['round_trips']} "
+                f"({saved_round_trips(total_stats['fetch'])} gespart durch Chunk-Fetch, "
+                f"{total_stats['fetch']['bytes'] / 1024:.0f} KB übertragen)"
+            )
+        
+        if total_stats['actions']['commands'] > 0:
+            print(
+                f"   📦 IMAP-Aktionen: {total_stats['actions']['commands']} Kommando(s) in "
+                f"{total_stats['actions']['flushes']} Batch(es) für "
+                f"{total_stats['actions']['moved'] + total_stats['actions']['seen']} E-Mail(s)"
+            )
+        
+        if header_stats['checked'] > 0:
+            print(
+                f"   🛰️  IP-Blacklist (Received): {header_stats['ip_blacklist']} SPAM "
+                f"({header_stats['external']}/{header_stats['checked']} E-Mail(s) mit externem Hop geprüft)"
+            )
+            logging.info(f"Received-Check: {header_stats}")
+        
+        cache = init_verdict_cache()
+        if cache is not None and (cache.stats['hits'] or cache.stats['misses']):
+            lookups = cache.stats['hits'] + cache.stats['misses']
+            print(
+                f"   💾 Verdict-Cache: {cache.stats['hits']} Treffer, {cache.stats['misses']} Fehlschläge "
+                f"({cache.stats['hits'] / lookups * 100:.1f}% Trefferquote)"
+            )
+        
+        index = init_simhash_index()
+        if index is not None and index.stats['hits']:
+            print(f"   🧬 Near-Duplicates: {index.stats['hits']} E-Mail(s) ohne LLM-Anfrage entschieden")
+        
+        classifier = init_local_classifier()
+        if classifier is not None and classifier.stats['scored']:
+            decided = classifier.stats['spam'] + classifier.stats['ham']
+            print(
+                f"   🧮 Lokaler Klassifikator: {decided}/{classifier.stats['scored']} E-Mail(s) ohne LLM entschieden "
+                f"({classifier.stats['spam']} SPAM, {classifier.stats['ham']} HAM)"
+            )
+        
+        embeddings = init_embedding_index()
+        if embeddings is not None and embeddings.stats['queries']:
+            print(
+                f"   🧭 Embedding-kNN: {embeddings.stats['decided']}/{embeddings.stats['queries']} E-Mail(s) "
+                f"ohne LLM entschieden ({len(embeddings)} Vektoren im Index)"
+            )
+        
+        if batch_stats['requests'] > 0:
+            print(
+                f"   📚 Batch-Anfragen: {batch_stats['requests']} für {batch_stats['mails']} E-Mail(s) "
+                f"(Ø {batch_stats['mails'] / batch_stats['requests']:.1f} pro Anfrage, "
+                f"{batch_stats['fallbacks']} Einzel-Fallback(s))"
+            )
+        
+        fast, large = cascade_stats['fast'], cascade_stats['large']
+        if fast['mails'] > 0:
+            print(
+                f"   🪜 Kaskade: {fast['decided']}/{fast['mails']} E-Mail(s) von {CASCADE_MODEL} entschieden "
+                f"(Ø {fast['seconds'] / fast['mails'] * 1000:.0f} ms)"
+            )
+            if large['mails'] > 0:
+                print(
+                    f"      {large['mails']} eskaliert an {SPAM_MODEL} "
+                    f"(Ø {large['seconds'] / large['mails'] * 1000:.0f} ms zusätzlich)"
+                )
+            logging.info(f"Kaskade: {cascade_stats}")
+        
+        if llm_timing['requests'] > 0:
+            print(
+                f"   ⏱️  Time-to-Verdict: Ø {llm_timing['verdict_seconds'] / llm_timing['requests'] * 1000:.0f} ms "
+                f"(Generierung Ø {llm_timing['total_seconds'] / llm_timing['requests'] * 1000:.0f} ms, "
+                f"{llm_timing['early_stops']} früh beendet)"
+            )
+        
+        if cleanup_stats['bodies'] > 0:
+            print(
+                f"   ✂️  Body-Bereinigung: Ø {cleanup_stats['tokens_before'] / cleanup_stats['bodies']:.0f} Tokens Rohtext → "
+                f"{cleanup_stats['tokens_after'] / cleanup_stats['bodies']:.0f} Tokens im Prompt pro E-Mail (geschätzt)"
+            )
+        
+        if llm_timing['prompt_evals'] > 0:
+            unmeasured = llm_timing['requests'] - llm_timing['prompt_evals']
+            print(
+                f"   🧮 Prompt-Auswertung: Ø {llm_timing['prompt_tokens'] / llm_timing['prompt_evals']:.0f} Tokens "
+                f"in Ø {llm_timing['prompt_eval_seconds'] / llm_timing['prompt_evals'] * 1000:.0f} ms pro Anfrage "
+                f"({llm_timing['prompt_evals']} Anfragen, gecachter Präfix zählt nicht mit"
+                f"{f', {unmeasured} ohne Messwerte (früh beendeter Stream)' if unmeasured else ''})"
+            )
+            logging.info(
+                f"Prompt-Auswertung: {llm_timing['prompt_tokens']} Tokens, "
+                f"{llm_timing['prompt_eval_seconds']:.1f}s in {llm_timing['prompt_evals']} Anfragen, "
+                f"Bereinigung: {cleanup_stats}"
+            )
+        
+        dispatcher = init_ollama_dispatcher()
+        trips = sum(host.breaker.stats['trips'] for host in dispatcher.hosts)
+        if trips:
+            print(
+                f"   🔌 Circuit Breaker: {trips}x ausgelöst, "
+                f"{dispatcher.get_stats()['rejected']} Anfrage(n) nicht gesendet"
+            )
+        
+        client_stats = [host.client.get_stats() for host in dispatcher.hosts]
+        requests_total = sum(stats['requests'] for stats in client_stats)
+        if requests_total > 0:
+            print(
+                f"   🔌 Ollama-Anfragen: {requests_total} über "
+                f"{sum(stats['connections'] for stats in client_stats)} Verbindung(en) "
+                f"({sum(stats['reused'] for stats in client_stats)} wiederverwendet)"
+            )
+        
+        # Durchsatz und Latenz pro Host (nur bei mehreren Hosts)
+        if len(dispatcher.hosts) > 1:
+            for host in dispatcher.host_stats():
+                print(
+                    f"      🖥️  {host['name']}: {host['requests']} Anfrage(n), Ø {host['avg_ms']:.0f} ms, "
+                    f"{host['per_minute']:.1f}/min, {host['errors']} Fehler"
+                )
+            failovers = dispatcher.get_stats()['failovers']
+            if failovers:
+                print(f"      ↪️  Failover: {failovers} Anfrage(n) auf anderem Host wiederholt")
+            logging.info(f"Ollama-Hosts: {dispatcher.host_stats()}")
+        
         # Zeige Spam-Absender Übersicht (Global)
         if total_stats.get('spam_senders'):
             print("\n" + "="*60)
@@ -626,6 +1892,23 @@ def main():
         print(f"\n❌ Unerwarteter Fehler: {e}")
         logging.error(f"Unerwarteter Fehler: {e}", exc_info=True)
         print(f"\n💡 Details in: {log_path}")
+    finally:
+        if _ollama_dispatcher is not None:
+            for host in _ollama_dispatcher.hosts:
+                logging.info(f"Ollama-Client ({host.name}): {host.client.get_stats()}")
+                if OLLAMA_UNLOAD_AFTER_RUN and host.breaker.allows():
+                    for model in filter(None, (CASCADE_MODEL, SPAM_MODEL)):
+                        if not host.has_model(model):
+                            continue
+                        try:
+                            host.client.unload(model)
+                            logging.info(f"LLM {model} entladen ({host.name})")
+                        except Exception as e:
+                            logging.warning(f"Entladen von {model} auf {host.name} fehlgeschlagen: {e}")
+                host.client.close()
+        if _verdict_cache is not None:
+            logging.info(f"Verdict-Cache: {_verdict_cache.stats}")
+            _verdict_cache.close()
 
 if __name__ == "__main__":
     main()
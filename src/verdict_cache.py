@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Verdict-Cache für Ollama Spam Guard
+Speichert LLM-Entscheidungen (SPAM/HAM + Begründung) in einer SQLite-Datenbank
+
+Newsletter, Benachrichtigungen und Spam-Kampagnen kommen über mehrere Läufe
+und Accounts hinweg immer wieder. Der Cache-Schlüssel ist ein Hash aus
+Modell, Absender, Betreff und normalisiertem Body-Anfang; bei einem Treffer
+entfällt die Ollama-Anfrage.
+
+- TTL: Einträge verfallen nach einer konfigurierbaren Zeit
+- LRU: Bei Überschreiten der Maximalgröße werden die am längsten
+  nicht genutzten Einträge gelöscht
+
+Autor: Ollama Spam Guard
+"""
+
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    """Normalisiert Text für den Cache-Schlüssel (Kleinschreibung, Whitespace)."""
+    return _WHITESPACE_RE.sub(' ', (text or '').lower()).strip()
+
+def cache_key(model: str, sender: str, subject: str, body: str) -> str:
+    """
+    Erzeugt den Cache-Schlüssel für eine E-Mail.
+    
+    Args:
+        model: LLM-Modell (andere Modelle → andere Entscheidungen)
+        sender: Absender-E-Mail
+        subject: Betreff
+        body: Body-Anfang (wie an das LLM gesendet)
+    
+    Returns:
+        str: SHA-256 Hex-Digest
+    """
+    parts = [model, normalize_text(sender), normalize_text(subject), normalize_text(body)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8', errors='ignore')).hexdigest()
+
+def new_cache_stats() -> Dict[str, int]:
+    """Erzeugt leere Cache-Statistik."""
+    return {'hits': 0, 'misses': 0, 'stored': 0, 'expired': 0, 'evicted': 0}
+
+# ============================================
+# Verdict Cache
+# ============================================
+
+class VerdictCache:
+    """
+    Persistenter Cache für LLM-Entscheidungen (SQLite).
+    
+    Verwendung:
+        cache = VerdictCache(Path("data/state/verdicts.sqlite"), ttl_hours=168, max_entries=10000)
+        key = cache_key(model, sender, subject, body)
+        cached = cache.get(key)        # (is_spam, reason) oder None
+        cache.put(key, model, True, "SPAM: Phishing")
+    """
+    
+    def __init__(self, path: Path, ttl_hours: float = 168, max_entries: int = 10000):
+        """
+        Öffnet (bzw. erstellt) die Cache-Datenbank.
+        
+        Args:
+            path: Pfad zur SQLite-Datei
+            ttl_hours: Gültigkeit eines Eintrags in Stunden (0 = unbegrenzt)
+            max_entries: Maximale Anzahl Einträge (LRU-Verdrängung)
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max(1, max_entries)
+        self.stats = new_cache_stats()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Eine Verbindung für alle Threads, serialisiert über Lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS verdicts ('
+            ' key TEXT PRIMARY KEY,'
+            ' model TEXT NOT NULL,'
+            ' is_spam INTEGER NOT NULL,'
+            ' reason TEXT NOT NULL,'
+            ' created REAL NOT NULL,'
+            ' last_used REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_verdicts_last_used ON verdicts (last_used)')
+        self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0]
+    
+    def get(self, key: str) -> Optional[Tuple[bool, str]]:
+        """
+        Sucht eine Entscheidung im Cache.
+        
+        Args:
+            key: Cache-Schlüssel (siehe cache_key)
+        
+        Returns:
+            (is_spam, reason) oder None bei Miss bzw. abgelaufenem Eintrag
+        """
+        now = time.time()
+        
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT is_spam, reason, created FROM verdicts WHERE key = ?', (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            
+            is_spam, reason, created = row
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                self._conn.execute('DELETE FROM verdicts WHERE key = ?', (key,))
+                self._conn.commit()
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            
+            self._conn.execute('UPDATE verdicts SET last_used = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.stats['hits'] += 1
+            return bool(is_spam), reason
+    
+    def put(self, key: str, model: str, is_spam: bool, reason: str) -> None:
+        """
+        Speichert eine Entscheidung und verdrängt ggf. alte Einträge (LRU).
+        
+        Args:
+            key: Cache-Schlüssel
+            model: LLM-Modell
+            is_spam: Entscheidung
+            reason: Begründung des LLM
+        """
+        now = time.time()
+        
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO verdicts (key, model, is_spam, reason, created, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, model, int(is_spam), reason, now, now)
+            )
+            self.stats['stored'] += 1
+            
+            count = self._conn.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0]
+            if count > self.max_entries:
+                cursor = self._conn.execute(
+                    'DELETE FROM verdicts WHERE key IN '
+                    '(SELECT key FROM verdicts ORDER BY last_used ASC LIMIT ?)',
+                    (count - self.max_entries,)
+                )
+                self.stats['evicted'] += cursor.rowcount
+            
+            self._conn.commit()
+    
+    def purge_expired(self) -> int:
+        """
+        Löscht alle abgelaufenen Einträge.
+        
+        Returns:
+            int: Anzahl gelöschter Einträge
+        """
+        if not self.ttl_seconds:
+            return 0
+        
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM verdicts WHERE created < ?', (time.time() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            self.stats['expired'] += cursor.rowcount
+            return cursor.rowcount
+    
+    def close(self) -> None:
+        """Schließt die Datenbank."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,61 @@
+"""
+Gemeinsame Test-Konfiguration: src/ in den Import-Pfad aufnehmen
+(die Module importieren sich gegenseitig flach, z.B. "from ip_index import ...").
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+
+class FakeMail:
+    """
+    Minimaler IMAP-Ersatz: zeichnet UID-Kommandos auf.
+    
+    UID FETCH liefert die nächste vorbereitete Antwort (Exceptions werden
+    geworfen), Kommandos aus `failing` antworten mit NO.
+    """
+    
+    def __init__(self, responses=(), capabilities=('IMAP4REV1',), failing=(), login_capabilities=None):
+        self.responses = list(responses)
+        self.capabilities = tuple(capabilities)
+        self.login_capabilities = login_capabilities
+        self.failing = set(failing)
+        self.commands = []
+    
+    def uid(self, command, *args):
+        self.commands.append((command,) + args)
+        if command in self.failing:
+            return 'NO', [b'failed']
+        if command == 'FETCH':
+            response = self.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return 'OK', [None]
+    
+    def capability(self):
+        # Nach dem Login angekündigte Fähigkeiten (wie Dovecot)
+        capabilities = self.login_capabilities or self.capabilities
+        return 'OK', [' '.join(capabilities).encode()]
+    
+    def expunge(self):
+        self.commands.append(('EXPUNGE',))
+        return 'OK', [None]
+    
+    def response(self, code):
+        return code, [None]
+    
+    def logout(self):
+        return 'BYE', [b'']
+
+
+@pytest.fixture
+def fake_mail():
+    """Fabrik für FakeMail-Objekte."""
+    return FakeMail
@@ -0,0 +1,43 @@
+"""Tests für die Body-Bereinigung vor dem Prompt (body_cleanup.py)."""
+
+from body_cleanup import clean_body, collapse_urls, new_cleanup_stats, strip_quoted, strip_signature, truncate_to_tokens
+
+
+def test_quoted_reply_is_removed():
+    text = "Danke, passt so.\n\nAm 01.10.2026 um 10:00 schrieb Max <max@example.com>:\n> Alte Nachricht\n> noch mehr"
+    assert strip_quoted(text).strip() == "Danke, passt so."
+    
+    interleaved = "Antwort\n> Zitat\nWeiter\n\nOn Mon, 1 Oct 2026, Max wrote:\n> Alt"
+    assert strip_quoted(interleaved).split('\n') == ["Antwort", "Weiter", ""]
+
+
+def test_quoted_lines_without_reply_header_are_kept():
+    spam = "> Exklusives Angebot: 90% Rabatt\n> Nur heute: https://shop.example/deal"
+    
+    assert strip_quoted(spam) == spam
+    assert clean_body(spam) == "> Exklusives Angebot: 90% Rabatt\n> Nur heute: [URL shop.example]"
+
+
+def test_signature_is_cut_only_after_text():
+    assert strip_signature("Hallo\n-- \nMax Mustermann\nTel. 123") == "Hallo\n"
+    assert strip_signature("-- \nnur Signatur") == "-- \nnur Signatur"
+    assert strip_signature("Kurz\nSent from my iPhone") == "Kurz\n"
+
+
+def test_urls_are_collapsed_to_domain():
+    text = "Hier klicken: https://user@Track.Example.com/path?id=123&utm=x oder www.shop.de"
+    assert collapse_urls(text) == "Hier klicken: [URL track.example.com] oder [URL shop.de]"
+
+
+def test_truncate_at_word_boundary():
+    assert truncate_to_tokens("kurz", 10) == "kurz"
+    assert truncate_to_tokens("eins zwei drei vier", 3) == "eins zwei …"
+
+
+def test_clean_body_counts_tokens():
+    stats = new_cleanup_stats()
+    body = "Gewinnen  Sie\r\n\r\n\r\n\r\njetzt! https://spam.example/x?a=1\n-- \nAbmelden"
+    
+    assert clean_body(body, token_budget=100, stats=stats) == "Gewinnen Sie\n\njetzt! [URL spam.example]"
+    assert stats['bodies'] == 1
+    assert stats['tokens_after'] < stats['tokens_before']
@@ -0,0 +1,42 @@
+"""Tests für den Checkpoint-Store (checkpoint_store.py)."""
+
+from checkpoint_store import CheckpointStore, filter_new_uids, limit_uids
+
+
+def test_filter_new_uids_drops_already_processed():
+    # "UID 11:*" liefert auch die höchste UID, wenn sie <= 10 ist
+    assert filter_new_uids([b'13', b'10', b'11'], 10) == [b'11', b'13']
+    assert filter_new_uids([b'10'], 10) == []
+
+
+def test_limit_uids_without_checkpoint_keeps_newest():
+    uids = [b'1', b'2', b'3', b'4', b'5']
+    assert limit_uids(uids, 2, resume=False) == [b'4', b'5']
+
+
+def test_limit_uids_with_checkpoint_keeps_oldest():
+    uids = [b'11', b'12', b'13', b'14']
+    assert limit_uids(uids, 3, resume=True) == [b'11', b'12', b'13']
+
+
+def test_limit_uids_within_limit_or_unlimited():
+    uids = [b'1', b'2']
+    assert limit_uids(uids, 5, resume=True) == uids
+    assert limit_uids(uids, 0, resume=False) == uids
+
+
+def test_checkpoint_moves_only_forward(tmp_path):
+    store = CheckpointStore(tmp_path / 'checkpoints.json')
+    store.update('acc/INBOX', 100, 20)
+    store.update('acc/INBOX', 100, 15)
+    assert store.get_last_uid('acc/INBOX', 100) == 20
+    
+    # Persistenz
+    assert CheckpointStore(tmp_path / 'checkpoints.json').get_last_uid('acc/INBOX', 100) == 20
+
+
+def test_uidvalidity_change_discards_checkpoint(tmp_path):
+    store = CheckpointStore(tmp_path / 'checkpoints.json')
+    store.update('acc/INBOX', 100, 20)
+    assert store.get_last_uid('acc/INBOX', 200) is None
+    assert store.get_last_uid('acc/INBOX', 100) is None
@@ -0,0 +1,78 @@
+"""Tests für die Account-Schleife des Daemon-Modus (daemon.py)."""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+# config.py lädt die Accounts beim Import
+_TEMP_DIR = Path(tempfile.mkdtemp(prefix="spam-guard-test-"))
+(_TEMP_DIR / "accounts.yaml").write_text(
+    "accounts:\n"
+    "  - name: Test\n"
+    "    enabled: true\n"
+    "    user: test@example.com\n"
+    "    password: geheim\n"
+    "    server: imap.example.com\n"
+    "    port: 993\n"
+    "    spam_folder: Spam\n",
+    encoding='utf-8'
+)
+os.environ.setdefault('ACCOUNTS_FILE', str(_TEMP_DIR / "accounts.yaml"))
+os.environ.setdefault('LOG_PATH', str(_TEMP_DIR / "spam_filter.log"))
+os.environ.setdefault('USE_LISTS', 'false')
+
+# list_manager.py legt blacklist_sources.yaml beim Import ggf. aus dem Template an
+_SOURCES_FILE = Path(__file__).resolve().parent.parent / "data" / "lists" / "blacklist_sources.yaml"
+_CREATED_SOURCES = not _SOURCES_FILE.exists()
+
+import daemon  # noqa: E402
+
+
+@pytest.fixture(scope='module', autouse=True)
+def cleanup_sources():
+    yield
+    if _CREATED_SOURCES:
+        _SOURCES_FILE.unlink(missing_ok=True)
+
+
+def run_daemon(monkeypatch, fake_mail, results, waits):
+    """Führt run_account mit vorbereiteten process_mailbox-Ergebnissen aus."""
+    stop_event = threading.Event()
+    passes = []
+    
+    def process_mailbox(mail, account, checkpoint_store=None):
+        passes.append(len(passes))
+        return dict({'spam': 0, 'ham': 0, 'deferred': 0}, **results[len(passes) - 1])
+    
+    def idle_wait(mail, timeout, stop):
+        # IDLE-Timeout ohne EXISTS; nach `waits` Zyklen beenden
+        waits['count'] += 1
+        if waits['count'] >= waits['limit']:
+            stop.set()
+        return False
+    
+    monkeypatch.setattr(daemon, 'connect_imap', lambda account: fake_mail(capabilities=('IDLE',)))
+    monkeypatch.setattr(daemon, 'process_mailbox', process_mailbox)
+    monkeypatch.setattr(daemon, 'idle_wait', idle_wait)
+    
+    daemon.run_account({'name': 'Test'}, None, stop_event)
+    return passes
+
+
+def test_deferred_mail_is_retried_without_new_mail(monkeypatch, fake_mail):
+    waits = {'count': 0, 'limit': 3}
+    passes = run_daemon(monkeypatch, fake_mail, [{'deferred': 1}, {'ham': 1}], waits)
+    
+    # Erster Lauf stellt zurück → nach dem IDLE-Timeout erneut, danach nicht mehr
+    assert len(passes) == 2
+    assert waits['count'] == 3
+
+
+def test_no_retry_without_deferred_mail(monkeypatch, fake_mail):
+    waits = {'count': 0, 'limit': 2}
+    passes = run_daemon(monkeypatch, fake_mail, [{'ham': 1}], waits)
+    
+    assert len(passes) == 1
@@ -0,0 +1,67 @@
+"""Tests für den Domain-Suffix-Index (domain_index.py)."""
+
+from domain_index import DomainIndex, domain_suffixes, parse_domain_entry
+
+
+def test_parse_entry_syntax():
+    assert parse_domain_entry("example.com") == ("example.com", False)
+    assert parse_domain_entry("*.Example.com") == ("example.com", False)
+    assert parse_domain_entry("@example.com") == ("example.com", False)
+    assert parse_domain_entry(".example.com.") == ("example.com", False)
+    assert parse_domain_entry("=example.com") == ("example.com", True)
+
+
+def test_bare_entries_exact_for_whitelist():
+    assert parse_domain_entry("example.com", bare_exact=True) == ("example.com", True)
+    assert parse_domain_entry("@example.com", bare_exact=True) == ("example.com", True)
+    assert parse_domain_entry("*.example.com", bare_exact=True) == ("example.com", False)
+    
+    index = DomainIndex()
+    index.add_entry("trusted.de", bare_exact=True)
+    index.add_entry("*.partner.de", bare_exact=True)
+    
+    assert index.match("trusted.de") == "=trusted.de"
+    assert index.match("shop.trusted.de") is None
+    assert index.match("news.partner.de") == "partner.de"
+
+
+def test_domain_suffixes():
+    assert list(domain_suffixes("mail.spammer.com")) == ["mail.spammer.com", "spammer.com", "com"]
+
+
+def test_suffix_entry_matches_subdomains():
+    index = DomainIndex()
+    index.add_entry("*.spammer.com")
+    
+    assert index.match("spammer.com") == "spammer.com"
+    assert index.match("Mail.News.Spammer.COM") == "spammer.com"
+    assert index.match("notspammer.com") is None
+
+
+def test_exact_entry_does_not_match_subdomains():
+    index = DomainIndex()
+    index.add_entry("=amazon.de")
+    
+    assert index.match("amazon.de") == "=amazon.de"
+    assert index.match("news.amazon.de") is None
+
+
+def test_most_specific_entry_wins():
+    index = DomainIndex()
+    index.add_entry("example.com")
+    index.add_entry("mail.example.com")
+    
+    assert index.match("a.mail.example.com") == "mail.example.com"
+    assert index.match("b.example.com") == "example.com"
+
+
+def test_update_counts_new_entries():
+    index = DomainIndex()
+    
+    assert index.update(["a.de", "A.de.", "", "b.de"]) == 2
+    assert index.update(["c.de"], exact=True) == 1
+    assert not index.add("  ")
+    assert len(index) == 3
+    assert "x.a.de" in index
+    assert "x.c.de" not in index
+    assert index.match("") is None
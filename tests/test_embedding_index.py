@@ -0,0 +1,51 @@
+"""Tests für den kNN-Embedding-Index (embedding_index.py)."""
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex, normalize_rows
+
+
+def test_normalize_rows():
+    rows = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert np.allclose(rows[0], [0.6, 0.8])
+    assert np.allclose(rows[1], [0.0, 0.0])
+
+
+def build_index(directory):
+    index = EmbeddingIndex(directory, model="embed")
+    for offset in (0.0, 0.01, 0.02):
+        index.add([1.0, offset, 0.0], is_spam=True)
+        index.add([0.0, offset, 1.0], is_spam=False)
+    assert index.flush() == 6
+    return index
+
+
+def test_vote_decides_clear_neighbourhoods(tmp_path):
+    index = build_index(tmp_path)
+    
+    votes = index.vote(np.array([[1.0, 0.0, 0.05], [0.05, 0.0, 1.0], [1.0, 0.0, 1.0]]), k=3)
+    
+    assert votes[0][0] is True and votes[0][1] == 1.0
+    assert votes[1][0] is False
+    # Gleich weit von beiden Gruppen: keine Nachbarn über min_similarity
+    assert votes[2] is None
+    assert index.stats == {'queries': 3, 'decided': 2, 'added': 6}
+
+
+def test_index_is_reopened_from_disk(tmp_path):
+    build_index(tmp_path)
+    
+    reopened = EmbeddingIndex(tmp_path, model="embed")
+    assert len(reopened) == 6
+    assert reopened.vote(np.array([[1.0, 0.0, 0.0]]), k=3)[0][0] is True
+    
+    # Falsche Dimension: keine Entscheidung
+    assert reopened.vote(np.array([[1.0, 0.0]])) == [None]
+
+
+def test_other_model_starts_new_index(tmp_path):
+    build_index(tmp_path)
+    
+    other = EmbeddingIndex(tmp_path, model="anderes-modell")
+    assert len(other) == 0
+    assert other.vote(np.array([[1.0, 0.0, 0.0]])) == [None]
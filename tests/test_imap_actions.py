@@ -0,0 +1,67 @@
+"""Tests für die gebündelten IMAP-Aktionen (imap_actions.py)."""
+
+from imap_actions import MailActions, refresh_capabilities
+
+
+def test_flush_batches_moves_and_flags(fake_mail):
+    mail = fake_mail(capabilities=('MOVE',))
+    checkpoints = []
+    actions = MailActions(mail, 'Spam', batch_size=10, on_flush=checkpoints.append)
+    actions.move_to_spam(b'3')
+    actions.move_to_spam(b'4')
+    actions.mark_seen(b'5')
+    actions.flush()
+    
+    assert mail.commands == [('MOVE', '3:4', 'Spam'), ('STORE', '5', '+FLAGS.SILENT', '(\\Seen)')]
+    assert checkpoints == [5]
+
+
+def test_checkpoint_stays_below_deferred_uid(fake_mail):
+    mail = fake_mail(capabilities=('MOVE',))
+    checkpoints = []
+    actions = MailActions(mail, 'Spam', batch_size=10, on_flush=checkpoints.append)
+    actions.defer(b'10')
+    actions.mark_seen(b'11')
+    actions.mark_seen(b'9')
+    actions.flush()
+    
+    assert checkpoints == [9]
+    assert actions.stats['deferred'] == 1
+
+
+def test_checkpoint_stays_below_failed_move(fake_mail):
+    mail = fake_mail(capabilities=('MOVE',), failing=('MOVE',))
+    checkpoints = []
+    actions = MailActions(mail, 'Spam', batch_size=10, on_flush=checkpoints.append)
+    actions.move_to_spam(b'7')
+    actions.mark_seen(b'8')
+    actions.flush()
+    
+    assert checkpoints == []
+    assert actions.stats['failed'] == 1
+    assert actions.failed_floor == 7
+
+
+def test_capabilities_are_refreshed_after_login(fake_mail):
+    mail = fake_mail(capabilities=('IMAP4REV1',), login_capabilities=('IMAP4rev1', 'MOVE', 'UIDPLUS', 'IDLE'))
+    
+    assert refresh_capabilities(mail) == ('IDLE', 'IMAP4REV1', 'MOVE', 'UIDPLUS')
+    
+    actions = MailActions(mail, 'Spam')
+    actions.move_to_spam(b'4')
+    actions.flush()
+    assert mail.commands == [('MOVE', '4', 'Spam')]
+
+
+def test_uid_expunge_without_move(fake_mail):
+    mail = fake_mail(capabilities=('UIDPLUS',))
+    actions = MailActions(mail, 'Spam')
+    actions.move_to_spam(b'4')
+    actions.flush()
+    
+    # Nur die eigenen UIDs löschen, kein globales EXPUNGE
+    assert mail.commands == [
+        ('COPY', '4', 'Spam'),
+        ('STORE', '4', '+FLAGS.SILENT', '(\\Deleted)'),
+        ('EXPUNGE', '4'),
+    ]
@@ -0,0 +1,84 @@
+"""Tests für die IMAP-Fetch-Stufe (imap_fetch.py)."""
+
+import imaplib
+
+from imap_fetch import compress_uid_set, fetch_messages, new_fetch_stats, parse_fetch_response
+
+
+def literal(seq, uid, body, item='BODY[HEADER]'):
+    return (f'{seq} (UID {uid} {item} {{{len(body)}}}'.encode(), body)
+
+
+def test_compress_uid_set_builds_ranges():
+    uids = [b'1', b'2', b'3', b'7', b'9', b'10']
+    assert compress_uid_set(uids) == '1:3,7,9:10'
+
+
+def test_compress_uid_set_sorts_and_deduplicates():
+    assert compress_uid_set([b'5', b'3', b'4', b'4']) == '3:5'
+    assert compress_uid_set([]) == ''
+
+
+def test_parse_fetch_response_multiple_messages():
+    data = [
+        literal(1, 42, b'Subject: a\r\n\r\n'),
+        b')',
+        literal(2, 43, b'Subject: b\r\n\r\n'),
+        b')',
+    ]
+    messages = parse_fetch_response(data)
+    assert set(messages) == {b'42', b'43'}
+    assert messages[b'43']['BODY[HEADER]'] == b'Subject: b\r\n\r\n'
+
+
+def test_parse_fetch_response_uid_after_literal():
+    # Gmail sendet die UID erst nach dem Literal
+    data = [
+        (b'1 (BODY[HEADER] {14}', b'Subject: a\r\n\r\n'),
+        b' UID 77)',
+    ]
+    assert parse_fetch_response(data) == {b'77': {'BODY[HEADER]': b'Subject: a\r\n\r\n'}}
+
+
+def test_parse_fetch_response_partial_items():
+    data = [
+        (b'1 (UID 5 BODY[HEADER] {14}', b'Subject: a\r\n\r\n'),
+        (b' BODY[TEXT]<0> {5}', b'hello'),
+        b')',
+    ]
+    items = parse_fetch_response(data)[b'5']
+    assert items == {'BODY[HEADER]': b'Subject: a\r\n\r\n', 'BODY[TEXT]<0>': b'hello'}
+
+
+def test_parse_fetch_response_ignores_unsolicited_flags():
+    data = [b'3 (FLAGS (\\Seen))', literal(1, 9, b'Subject: x\r\n\r\n'), b')']
+    assert list(parse_fetch_response(data)) == [b'9']
+
+
+def test_fetch_messages_one_round_trip_per_chunk(fake_mail):
+    mail = fake_mail([
+        ('OK', [literal(1, 1, b'Subject: a\r\n\r\n'), b')', literal(2, 2, b'Subject: b\r\n\r\n'), b')']),
+        ('OK', [literal(3, 3, b'Subject: c\r\n\r\n'), b')']),
+    ])
+    stats = new_fetch_stats()
+    result = list(fetch_messages(mail, [b'1', b'2', b'3'], chunk_size=2, stats=stats, mode='headers'))
+    
+    assert [uid for uid, _ in result] == [b'1', b'2', b'3']
+    assert result[2][1]['Subject'] == 'c'
+    assert [command[1] for command in mail.commands] == ['1:2', '3']
+    assert stats['round_trips'] == 2 and stats['messages'] == 3 and stats['missing'] == 0
+
+
+def test_fetch_messages_reports_failed_and_missing_uids(fake_mail):
+    mail = fake_mail([
+        imaplib.IMAP4.error('connection reset'),
+        ('NO', [b'failed']),
+        ('OK', [literal(5, 5, b'Subject: e\r\n\r\n'), b')']),
+    ])
+    stats = new_fetch_stats()
+    result = list(fetch_messages(mail, [b'1', b'2', b'3', b'4', b'5', b'6'], chunk_size=2, stats=stats, mode='headers'))
+    
+    # Jede UID wird genau einmal geliefert, fehlende mit None
+    assert [uid for uid, _ in result] == [b'1', b'2', b'3', b'4', b'5', b'6']
+    assert [uid for uid, msg in result if msg is None] == [b'1', b'2', b'3', b'4', b'6']
+    assert stats['missing'] == 5 and stats['messages'] == 1
@@ -0,0 +1,69 @@
+"""Tests für den IP-Intervall-Index (ip_index.py)."""
+
+import numpy as np
+
+from ip_index import IPRangeIndex, merge_intervals, merge_intervals_u32, parse_address, parse_range
+
+
+def test_parse_address_variants():
+    assert parse_address("192.0.2.1") == (4, 0xC0000201)
+    assert parse_address("[2001:db8::1]") == (6, 0x20010DB8000000000000000000000001)
+    assert parse_address("IPv6:2001:db8::1") == parse_address("2001:db8::1")
+    
+    # IPv4-gemappte IPv6-Adressen werden als IPv4 geprüft
+    assert parse_address("::ffff:192.0.2.1") == (4, 0xC0000201)
+    assert parse_address("kein.host") is None
+
+
+def test_parse_range_with_comment_and_cidr():
+    assert parse_range("198.51.100.0/24 ; SBL123") == (4, 0xC6336400, 0xC63364FF)
+    assert parse_range("198.51.100.7/24") == (4, 0xC6336400, 0xC63364FF)
+    assert parse_range("") is None
+    assert parse_range("1.2.3.0/33") is None
+
+
+def test_merge_overlapping_and_adjacent_intervals():
+    intervals = [(10, 20), (21, 25), (5, 12), (30, 40), (32, 35)]
+    expected = ([5, 30], [25, 40])
+    
+    assert merge_intervals(intervals) == expected
+    
+    starts, ends = merge_intervals_u32(
+        np.array([start for start, _ in intervals], dtype=np.uint64),
+        np.array([end for _, end in intervals], dtype=np.uint64)
+    )
+    assert (starts.tolist(), ends.tolist()) == expected
+
+
+def test_index_contains_networks_and_single_ips():
+    index = IPRangeIndex()
+    added = index.update([
+        "192.0.2.1",
+        "198.51.100.0/25",
+        "198.51.100.128/25",
+        "2001:db8::/32",
+        "kein Eintrag",
+    ])
+    
+    assert added == 4 and len(index) == 4 and index.invalid == 1
+    
+    # Die beiden /25-Netze grenzen aneinander und werden zusammengefasst
+    assert index.intervals == 3
+    assert "198.51.100.200" in index
+    assert "192.0.2.1" in index
+    assert "192.0.2.2" not in index
+    assert "2001:db8:ffff::1" in index
+    assert "2001:db9::1" not in index
+    assert "::ffff:198.51.100.5" in index
+    assert "ungültig" not in index
+
+
+def test_index_merges_later_additions():
+    index = IPRangeIndex()
+    index.add("10.0.0.0/24")
+    assert "10.0.1.1" not in index
+    
+    index.add("10.0.1.0/24")
+    assert "10.0.1.1" in index
+    starts, ends = index.ranges(4)
+    assert (list(starts), list(ends)) == ([0x0A000000], [0x0A0001FF])
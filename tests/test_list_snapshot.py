@@ -0,0 +1,84 @@
+"""Tests für den kompilierten Listen-Snapshot (list_snapshot.py)."""
+
+from ip_index import IPRangeIndex
+from list_snapshot import ListSnapshot, source_signature
+
+SIGNATURE = {'spamhaus': ['ip_cidr', 1234, 1], 'domains': ['domain', 99, 2]}
+
+
+def make_ips():
+    ips = IPRangeIndex()
+    ips.update(["192.0.2.1", "198.51.100.0/24", "2001:db8::/32", "2001:db8:1::5"])
+    return ips
+
+
+def compile_snapshot(path):
+    return ListSnapshot.compile(path, SIGNATURE, make_ips(), ["spammer.com", "bad.example.org"], ["x@evil.de"])
+
+
+def check_lookups(snapshot):
+    assert snapshot.contains_ip("192.0.2.1")
+    assert not snapshot.contains_ip("192.0.2.2")
+    assert snapshot.contains_ip("198.51.100.255")
+    assert snapshot.contains_ip("::ffff:198.51.100.1")
+    assert snapshot.contains_ip("2001:db8::")
+    assert snapshot.contains_ip("2001:db8:ffff:ffff::1")
+    assert not snapshot.contains_ip("2001:db9::")
+    assert not snapshot.contains_ip("kein.host")
+    
+    assert snapshot.match_domain("mail.Spammer.com") == "spammer.com"
+    assert snapshot.match_domain("example.org") is None
+    assert snapshot.contains_email(" X@Evil.de ")
+    assert not snapshot.contains_email("y@evil.de")
+
+
+def test_compile_and_reload(tmp_path):
+    path = tmp_path / "lists.snapshot"
+    snapshot = compile_snapshot(path)
+    
+    assert snapshot.mapped
+    assert snapshot.counts == {'ips': 4, 'domains': 2, 'emails': 1}
+    check_lookups(snapshot)
+    snapshot.close()
+    
+    reloaded = ListSnapshot.load(path, SIGNATURE)
+    assert reloaded is not None and reloaded.mapped
+    check_lookups(reloaded)
+    reloaded.close()
+
+
+def test_changed_sources_invalidate_snapshot(tmp_path):
+    path = tmp_path / "lists.snapshot"
+    compile_snapshot(path).close()
+    
+    assert ListSnapshot.load(path, dict(SIGNATURE, spamhaus=['ip_cidr', 1234, 3])) is None
+
+
+def test_missing_or_corrupt_file(tmp_path):
+    path = tmp_path / "lists.snapshot"
+    assert ListSnapshot.load(path, SIGNATURE) is None
+    
+    path.write_bytes(b"kein Snapshot")
+    assert ListSnapshot.load(path, SIGNATURE) is None
+
+
+def test_empty_lists(tmp_path):
+    snapshot = ListSnapshot.compile(tmp_path / "empty.snapshot", {}, IPRangeIndex(), [], [])
+    
+    assert not snapshot.contains_ip("192.0.2.1")
+    assert not snapshot.contains_ip("2001:db8::1")
+    assert snapshot.match_domain("spammer.com") is None
+    assert not snapshot.contains_email("x@evil.de")
+    snapshot.close()
+
+
+def test_source_signature_skips_missing_files(tmp_path):
+    cache_file = tmp_path / "spamhaus.txt"
+    cache_file.write_text("192.0.2.1\n")
+    
+    signature = source_signature({
+        'spamhaus': (cache_file, 'ip_cidr'),
+        'fehlt': (tmp_path / "fehlt.txt", 'domain')
+    })
+    assert list(signature) == ['spamhaus']
+    assert signature['spamhaus'][:2] == ['ip_cidr', len("192.0.2.1\n")]
@@ -0,0 +1,53 @@
+"""Tests für die Auswertung von Batch-Antworten (llm_verdict.py)."""
+
+import json
+
+from llm_verdict import build_batch_prompt, parse_batch_verdicts
+
+
+def verdicts(*items):
+    return json.dumps(list(items))
+
+
+def test_batch_prompt_numbers_mails():
+    prompt = build_batch_prompt([("a@x.de", "Hallo", "Text A"), ("b@y.de", "Gewinn", "B" * 900)], body_chars=10)
+    
+    assert "### E-Mail 1\nVon: a@x.de" in prompt
+    assert "### E-Mail 2\nVon: b@y.de" in prompt
+    assert "B" * 11 not in prompt
+
+
+def test_batch_verdicts_follow_index_not_position():
+    text = verdicts(
+        {"index": 2, "verdict": "HAM", "confidence": 0.8, "short_reason": "Newsletter"},
+        {"index": 1, "verdict": "spam", "confidence": 0.95, "short_reason": "Phishing"},
+    )
+    
+    assert parse_batch_verdicts(text, 2) == [(True, 0.95, "Phishing"), (False, 0.8, "Newsletter")]
+
+
+def test_batch_verdicts_without_index_use_position():
+    text = verdicts(
+        {"verdict": "SPAM", "confidence": 2, "short_reason": "a"},
+        {"verdict": "HAM", "confidence": "x", "short_reason": "b"},
+    )
+    
+    # Confidence wird auf 0..1 begrenzt, ungültige Werte zählen als 0.0
+    assert parse_batch_verdicts(text, 2) == [(True, 1.0, "a"), (False, 0.0, "b")]
+
+
+def test_batch_verdicts_wrapped_in_object():
+    text = json.dumps({"verdicts": [{"index": 1, "verdict": "HAM", "confidence": 0.5, "short_reason": ""}]})
+    
+    assert parse_batch_verdicts(text, 1) == [(False, 0.5, "")]
+
+
+def test_incomplete_or_invalid_batch_is_rejected():
+    ham = {"verdict": "HAM", "confidence": 0.5, "short_reason": ""}
+    
+    assert parse_batch_verdicts("kein JSON", 1) is None
+    assert parse_batch_verdicts(verdicts(ham), 2) is None
+    assert parse_batch_verdicts(verdicts(dict(ham, index=1), dict(ham, index=1)), 2) is None
+    assert parse_batch_verdicts(verdicts(dict(ham, index=3), ham), 2) is None
+    assert parse_batch_verdicts(verdicts(ham, dict(ham, verdict="VIELLEICHT")), 2) is None
+    assert parse_batch_verdicts(json.dumps({"a": [ham], "b": [ham]}), 1) is None
@@ -0,0 +1,49 @@
+"""Tests für den lokalen Naive-Bayes-Klassifikator (local_classifier.py)."""
+
+from local_classifier import LocalClassifier, mail_features
+
+SPAM_MAILS = [
+    ("win@lotto.example", "Gewinn sofort abholen", "Sie haben gewonnen, jetzt Gewinn abholen und Konto bestätigen"),
+    ("promo@pills.example", "Billige Pillen", "Billige Pillen ohne Rezept sofort bestellen und gewinnen"),
+]
+HAM_MAILS = [
+    ("chef@firma.de", "Besprechung morgen", "Die Besprechung zum Projektplan findet morgen um zehn Uhr statt"),
+    ("anna@familie.de", "Geburtstag", "Wir treffen uns am Samstag zum Geburtstag im Garten, bring Kuchen mit"),
+]
+
+
+def test_features_include_sender_domain_and_subject():
+    assert mail_features("a@x.de", "Hallo", "Text") == mail_features("b@X.de", "Hallo", "Text")
+    assert mail_features("a@x.de", "Hallo", "Text") != mail_features("a@y.de", "Hallo", "Text")
+
+
+def test_untrained_classifier_is_neutral():
+    classifier = LocalClassifier(min_docs=1)
+    
+    assert not classifier.ready
+    assert classifier.predict_proba(SPAM_MAILS).tolist() == [0.5, 0.5]
+    assert len(classifier.predict_proba([])) == 0
+
+
+def test_learn_and_predict(tmp_path):
+    path = tmp_path / "local_classifier.npz"
+    classifier = LocalClassifier(path, min_docs=2)
+    for mail in SPAM_MAILS:
+        classifier.learn(*mail, is_spam=True)
+    for mail in HAM_MAILS:
+        classifier.learn(*mail, is_spam=False)
+    
+    assert classifier.train_pending() == 4
+    assert classifier.ready
+    
+    probabilities = classifier.predict_proba([
+        ("neu@lotto.example", "Gewinn abholen", "Jetzt Gewinn sofort abholen"),
+        ("chef@firma.de", "Projektplan", "Besprechung zum Projektplan morgen"),
+    ])
+    assert probabilities[0] > 0.9 and probabilities[1] < 0.1
+    
+    # Gespeichertes Modell liefert dieselben Wahrscheinlichkeiten
+    classifier.save()
+    reloaded = LocalClassifier(path, min_docs=2)
+    assert reloaded.doc_counts.tolist() == [2.0, 2.0]
+    assert reloaded.predict_proba(SPAM_MAILS).tolist() == classifier.predict_proba(SPAM_MAILS).tolist()
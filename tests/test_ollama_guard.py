@@ -0,0 +1,89 @@
+"""Tests für Circuit Breaker und adaptive Timeouts (ollama_guard.py)."""
+
+import pytest
+
+import ollama_guard
+from ollama_guard import AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {'t': 1000.0}
+    monkeypatch.setattr(ollama_guard.time, 'monotonic', lambda: now['t'])
+    return now
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    
+    breaker.record_failure()
+    assert breaker.state == 'open' and breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert breaker.stats == {'trips': 1, 'rejected': 1}
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+
+def test_single_probe_after_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+    breaker.record_failure()
+    
+    clock['t'] += 60
+    assert breaker.allows()
+    breaker.before_request()
+    assert breaker.state == 'half_open'
+    
+    # Während die Probe läuft, werden weitere Anfragen abgewiesen
+    assert not breaker.allows()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allows()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    breaker.trip()
+    
+    clock['t'] += 61
+    breaker.before_request()
+    breaker.record_failure()
+    
+    assert breaker.state == 'open' and breaker.is_open
+    assert breaker.stats['trips'] == 2
+
+
+def test_disabled_breaker_never_opens(clock):
+    breaker = CircuitBreaker(failure_threshold=0)
+    
+    for _ in range(10):
+        breaker.record_failure()
+    breaker.trip()
+    breaker.before_request()
+    assert breaker.state == 'closed'
+
+
+def test_adaptive_timeout_uses_percentile_per_mail():
+    timeouts = AdaptiveTimeout(percentile=100, multiplier=3.0, minimum=10, min_samples=3)
+    
+    assert timeouts.timeout("m", ceiling=120) == 120
+    for seconds in (4, 6, 8):
+        timeouts.record("m", mails=2, seconds=seconds)
+    
+    # p100 = 4s pro E-Mail → 3 × 4s × 2 E-Mails
+    assert timeouts.timeout("m", mails=2, ceiling=120) == 24
+    assert timeouts.timeout("m", mails=20, ceiling=120) == 120
+    assert timeouts.timeout("m", mails=1, ceiling=120) == 12
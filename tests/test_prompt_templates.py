@@ -0,0 +1,33 @@
+"""Tests für die gemeinsamen Prompt-Vorlagen (prompt_templates.py)."""
+
+from llm_verdict import JSON_INSTRUCTION, VERDICT_SCHEMA
+from prompt_templates import SYSTEM_PROMPT, TEXT_INSTRUCTION, build_payload, build_prompt, prompt_eval_stats
+
+
+def test_prompt_starts_with_static_instruction():
+    first = build_prompt("a@x.de", "Hallo", "Text A")
+    second = build_prompt("b@y.de", "Gewinn", "Text B")
+    
+    # Gleicher Präfix für alle E-Mails (Prompt-Cache des Servers)
+    assert first.startswith(TEXT_INSTRUCTION) and second.startswith(TEXT_INSTRUCTION)
+    assert first.endswith("Von: a@x.de\nBetreff: Hallo\nInhalt: Text A")
+    
+    assert build_prompt("", "Hallo", "Text", structured=True) == f"{JSON_INSTRUCTION}Betreff: Hallo\nInhalt: Text"
+
+
+def test_payload_options():
+    payload = build_payload("p", "ministral-3:14b", 60, schema=VERDICT_SCHEMA)
+    
+    assert payload["system"] == SYSTEM_PROMPT
+    assert payload["think"] is False
+    assert payload["format"] == VERDICT_SCHEMA
+    assert payload["options"]["num_predict"] == 60
+    
+    thinking = build_payload("p", "qwen2.5:14b", 60, use_thinking=True)
+    assert "system" not in thinking and "think" not in thinking and "format" not in thinking
+    assert thinking["options"]["num_predict"] == 2000
+
+
+def test_prompt_eval_stats():
+    assert prompt_eval_stats({"prompt_eval_count": 120, "prompt_eval_duration": 250_000_000}) == (120, 0.25)
+    assert prompt_eval_stats({}) == (None, None)
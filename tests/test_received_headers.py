@@ -0,0 +1,55 @@
+"""Tests für die Auswertung der Received-Header (received_headers.py)."""
+
+from ip_index import IPRangeIndex
+from received_headers import extract_received_ip, first_external_hop, is_internal_address
+
+
+def test_postfix_comment_ip():
+    header = (
+        "from mail.example.com (mail.example.com [203.0.113.5])\r\n"
+        "\tby mx.provider.de (Postfix) with ESMTPS id 4F2"
+    )
+    assert extract_received_ip(header) == "203.0.113.5"
+
+
+def test_comment_preferred_over_from_literal():
+    header = "from [198.51.100.1] (unknown [203.0.113.5]) by mx.provider.de"
+    assert extract_received_ip(header) == "203.0.113.5"
+
+
+def test_helo_literal_is_ignored():
+    assert extract_received_ip("from host (HELO [1.2.3.4]) (5.6.7.8) by mx.provider.de") == "5.6.7.8"
+    assert extract_received_ip("from host ([5.6.7.8] helo=[1.2.3.4]) by mx.provider.de") == "5.6.7.8"
+    assert extract_received_ip("from host (EHLO [1.2.3.4]) by mx.provider.de") is None
+
+
+def test_ipv6_and_bare_ip():
+    assert extract_received_ip("from mx (mx [IPv6:2001:db8::25]) by mx.provider.de") == "2001:db8::25"
+    assert extract_received_ip("from 203.0.113.9 by mx.provider.de") == "203.0.113.9"
+
+
+def test_by_clause_is_not_evaluated():
+    assert extract_received_ip("from localhost by mx.provider.de ([192.0.2.1])") is None
+
+
+def test_internal_addresses():
+    assert is_internal_address("10.0.0.1")
+    assert is_internal_address("127.0.0.1")
+    assert is_internal_address("::ffff:192.168.1.1")
+    assert is_internal_address("kein.host")
+    assert not is_internal_address("8.8.8.8")
+
+
+def test_first_external_hop_skips_internal_and_trusted():
+    trusted = IPRangeIndex()
+    trusted.add("8.8.4.0/24")
+    headers = [
+        "from relay (relay [10.0.0.2]) by mx.provider.de",
+        "from mx-in (mx-in [8.8.4.4]) by relay",
+        "from sender.example (sender.example [8.8.8.8]) by mx-in",
+        "from forged (forged [9.9.9.9]) by sender.example",
+    ]
+    
+    assert first_external_hop(headers, trusted) == "8.8.8.8"
+    assert first_external_hop(headers) == "8.8.4.4"
+    assert first_external_hop(headers[:1]) is None
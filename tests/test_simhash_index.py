@@ -0,0 +1,58 @@
+"""Tests für den Near-Duplicate-Index (simhash_index.py)."""
+
+from simhash_index import SimHashIndex, hamming_distance, simhash
+
+TEXT = (
+    "Ihre Bestellung 12345 wurde versandt. Verfolgen Sie Ihr Paket jetzt "
+    "unter dem folgenden Link und bestätigen Sie Ihre Zahlungsdaten innerhalb von 24 Stunden"
+)
+
+
+def test_simhash_ignores_numbers():
+    assert simhash(TEXT) == simhash(TEXT.replace("12345", "98765").replace("24", "48"))
+
+
+def test_simhash_requires_minimum_text():
+    assert simhash("zu kurz") is None
+
+
+def test_near_duplicate_is_found():
+    index = SimHashIndex(max_distance=3)
+    fingerprint = simhash(TEXT)
+    index.add(fingerprint, True, "SPAM: Phishing")
+    
+    assert index.lookup(fingerprint) == (True, "SPAM: Phishing", 0)
+    
+    # Ein Bit abweichend liegt innerhalb der Distanz
+    is_spam, _, distance = index.lookup(fingerprint ^ 1)
+    assert is_spam is True and distance == 1
+
+
+def test_distant_fingerprint_misses():
+    index = SimHashIndex(max_distance=3)
+    fingerprint = simhash(TEXT)
+    index.add(fingerprint, True, "SPAM")
+    other = fingerprint ^ 0b11111
+    
+    assert hamming_distance(fingerprint, other) == 5
+    assert index.lookup(other) is None
+    assert index.stats['misses'] == 1
+
+
+def test_oldest_entries_are_evicted():
+    index = SimHashIndex(max_distance=0, max_entries=2)
+    for fingerprint in (1, 2, 3):
+        index.add(fingerprint, False, "HAM")
+    
+    assert len(index) == 2
+    assert index.lookup(1) is None
+    assert index.stats['evicted'] == 1
+
+
+def test_index_survives_save_and_load(tmp_path):
+    path = tmp_path / "simhash_index.json"
+    index = SimHashIndex(path)
+    index.add(simhash(TEXT), True, "SPAM")
+    index.save()
+    
+    assert SimHashIndex(path).lookup(simhash(TEXT))[0] is True
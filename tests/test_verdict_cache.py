@@ -0,0 +1,59 @@
+"""Tests für den Verdict-Cache (verdict_cache.py)."""
+
+import pytest
+
+import verdict_cache
+from verdict_cache import VerdictCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {'t': 1_000_000.0}
+    monkeypatch.setattr(verdict_cache.time, 'time', lambda: now['t'])
+    return now
+
+
+def test_cache_key_normalizes_whitespace_and_case():
+    assert cache_key("m", "A@X.de", "Hallo  Welt", "Text\n\nhier") == cache_key("m", "a@x.de", "hallo welt", " text hier ")
+    assert cache_key("m1", "a@x.de", "s", "b") != cache_key("m2", "a@x.de", "s", "b")
+
+
+def test_put_and_get_survive_reopen(tmp_path, clock):
+    cache = VerdictCache(tmp_path / "verdicts.sqlite")
+    cache.put("k", "m", True, "SPAM: Phishing")
+    cache.close()
+    
+    cache = VerdictCache(tmp_path / "verdicts.sqlite")
+    assert cache.get("k") == (True, "SPAM: Phishing")
+    assert cache.get("fehlt") is None
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+    cache.close()
+
+
+def test_expired_entries_are_dropped(tmp_path, clock):
+    cache = VerdictCache(tmp_path / "verdicts.sqlite", ttl_hours=1)
+    cache.put("alt", "m", False, "HAM")
+    cache.put("neu", "m", False, "HAM")
+    
+    clock['t'] += 3601
+    assert cache.get("alt") is None
+    assert cache.stats['expired'] == 1
+    assert cache.purge_expired() == 1
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = VerdictCache(tmp_path / "verdicts.sqlite", max_entries=2)
+    cache.put("a", "m", True, "A")
+    clock['t'] += 1
+    cache.put("b", "m", True, "B")
+    clock['t'] += 1
+    cache.get("a")
+    clock['t'] += 1
+    cache.put("c", "m", True, "C")
+    
+    assert len(cache) == 2 and cache.stats['evicted'] == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == (True, "A")
+    cache.close()